@@ -0,0 +1 @@
+"""Benchmarks for the simple agent (run with ``python -m benchmarks.<name>``)."""
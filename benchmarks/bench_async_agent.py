@@ -0,0 +1,55 @@
+"""Concurrent agent runs: one asyncio event loop vs one thread per conversation.
+
+Usage: python -m benchmarks.bench_async_agent [--runs 500] [--latency 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.chatgpt import AsyncChatGPTBackend, ChatGPTBackend
+
+from .stub_server import StubServer
+
+
+async def run_async(url: str, runs: int) -> float:
+    backend = AsyncChatGPTBackend("bench", "stub", base_url=url, pool_size=runs)
+    agent = SimpleAgent(backend=backend, tools=[], system_prompt="bench")
+    start = time.perf_counter()
+    await asyncio.gather(*(agent.arun(f"question {i}") for i in range(runs)))
+    elapsed = time.perf_counter() - start
+    await backend.aclose()
+    return elapsed
+
+
+def run_threaded(url: str, runs: int) -> float:
+    backend = ChatGPTBackend("bench", "stub", base_url=url, pool_size=runs)
+    agent = SimpleAgent(backend=backend, tools=[], system_prompt="bench")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=runs) as pool:
+        list(pool.map(agent.run, (f"question {i}" for i in range(runs))))
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated provider latency in seconds.")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as server:
+        threaded = run_threaded(server.url, args.runs)
+        asynchronous = asyncio.run(run_async(server.url, args.runs))
+
+    for label, elapsed in (("threads", threaded), ("asyncio", asynchronous)):
+        print(f"{label:<8} runs={args.runs} elapsed={elapsed:.3f}s throughput={args.runs / elapsed:.1f} runs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Conversation store cost at scale, and resuming a crashed run vs replaying it.
+
+Fills a store with `--conversations` conversations of four messages each,
+then times appends and loads of random conversations. It does the same
+with a thousand-conversation store to show that the cost stays flat. It
+then crashes a tool-heavy run on its last turn and compares resuming it
+from the store with rerunning it from scratch.
+
+Usage: python -m benchmarks.bench_conversations [--conversations 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.conversations import ConversationStore
+from simple_agent.tools.base import SimpleTool
+
+from .fake_backend import ScriptedBackend
+
+MESSAGE = "The quarterly numbers show revenue up 4% while costs held flat, so margins improved. " * 4
+TOOL_TURNS = 4
+
+
+class SlowTool(SimpleTool):
+    def __init__(self, delay: float) -> None:
+        super().__init__(name="fetch", description="Fetches a report.")
+        self.delay = delay
+        self.calls = 0
+
+    def run(self, query: str) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"report {query}: {MESSAGE}"
+
+
+def fill(store: ConversationStore, conversations: int) -> float:
+    start = time.perf_counter()
+    batch = 50_000
+    for first in range(0, conversations, batch):
+        rows = [
+            (f"conv-{index}", seq, "user" if seq % 2 == 0 else "assistant", MESSAGE)
+            for index in range(first, min(first + batch, conversations))
+            for seq in range(4)
+        ]
+        with store._lock:
+            store._conn.execute("BEGIN")
+            store._conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?)", rows)
+            store._conn.execute("COMMIT")
+    return time.perf_counter() - start
+
+
+def percentiles(timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p50 = ordered[len(ordered) // 2] * 1e6
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6
+    return f"p50={p50:7.1f}us p99={p99:7.1f}us"
+
+
+def time_store(store: ConversationStore, conversations: int, samples: int) -> tuple[list[float], list[float]]:
+    rng = random.Random(0)
+    appends, loads = [], []
+    for _ in range(samples):
+        conversation = f"conv-{rng.randrange(conversations)}"
+        start = time.perf_counter()
+        store.append(conversation, [{"role": "user", "content": MESSAGE}])
+        appends.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        store.load(conversation)
+        loads.append(time.perf_counter() - start)
+    return appends, loads
+
+
+def crashed_run(store: ConversationStore, tool: SimpleTool) -> None:
+    calls = [f'{{"tool": "fetch", "input": "q{turn}"}}' for turn in range(TOOL_TURNS)]
+    backend = ScriptedBackend(calls)
+    agent = SimpleAgent(backend=backend, tools=[tool], system_prompt="bench", conversation_store=store)
+    # The scripted backend repeats its last reply, so the final turn hits the turn limit instead of answering.
+    try:
+        agent.run("Summarize the reports.", max_turns=TOOL_TURNS, conversation="crashed")
+    except RuntimeError:
+        pass
+
+
+def compare_recovery(directory: Path, delay: float) -> None:
+    store = ConversationStore(directory / "recovery.sqlite")
+    tool = SlowTool(delay)
+    crashed_run(store, tool)
+
+    replies = [f'{{"tool": "fetch", "input": "q{turn}"}}' for turn in range(TOOL_TURNS)] + ["Done."]
+    tool.calls = 0
+    start = time.perf_counter()
+    SimpleAgent(backend=ScriptedBackend(replies), tools=[tool], system_prompt="bench").run(
+        "Summarize the reports.", max_turns=TOOL_TURNS + 1
+    )
+    replay, replay_calls = time.perf_counter() - start, tool.calls
+
+    tool.calls = 0
+    start = time.perf_counter()
+    agent = SimpleAgent(backend=ScriptedBackend(["Done."]), tools=[tool], system_prompt="bench", conversation_store=store)
+    agent.run("", conversation="crashed")
+    resume, resume_calls = time.perf_counter() - start, tool.calls
+    store.close()
+
+    print(f"replay from scratch {replay * 1000:8.1f}ms tool calls={replay_calls}")
+    print(f"resume from store   {resume * 1000:8.1f}ms tool calls={resume_calls}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=200_000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--tool-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (1000, args.conversations):
+            store = ConversationStore(Path(directory) / f"store-{size}.sqlite")
+            elapsed = fill(store, size)
+            appends, loads = time_store(store, size, args.samples)
+            print(f"{size:>9} conversations (filled in {elapsed:.1f}s)")
+            print(f"  append  {percentiles(appends)}")
+            print(f"  load    {percentiles(loads)}")
+            store.close()
+        compare_recovery(Path(directory), args.tool_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Latency percentiles and error rate with an unreliable primary provider.
+
+The primary stub answers `--error-rate` of requests with a 503 and stalls
+`--slow-rate` of them for `--slow-latency` seconds. The secondary stub is
+healthy but a little slower. Compares the primary alone, `FailoverBackend`
+without hedging and `FailoverBackend` with hedged requests.
+
+Usage: python -m benchmarks.bench_failover [--requests 400]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from simple_agent.backends.base import BackendError, LLMBackend
+from simple_agent.backends.chatgpt import ChatGPTBackend
+from simple_agent.backends.failover import FailoverBackend
+from simple_agent.backends.gemini import GeminiBackend
+
+from .stub_server import StubServer
+
+MESSAGES = [{"role": "system", "content": "bench"}, {"role": "user", "content": "ping"}]
+
+
+def measure(backend: LLMBackend, requests: int) -> tuple[list[float], int]:
+    timings, errors = [], 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            backend.generate(MESSAGES)
+        except BackendError:
+            errors += 1
+        timings.append(time.perf_counter() - start)
+    backend.close()
+    return timings, errors
+
+
+def report(label: str, timings: list[float], errors: int) -> None:
+    ordered = sorted(timings)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    print(f"{label:<18} p50={p50:7.1f}ms p99={p99:7.1f}ms errors={errors / len(timings):6.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    faults = dict(error_rate=args.error_rate, slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    for label, hedge in (("primary only", None), ("failover", False), ("failover + hedge", True)):
+        with StubServer(latency=args.latency, **faults) as primary_stub, StubServer(latency=args.latency * 1.5) as fallback_stub:
+            # urllib3 retries are disabled so every attempt is visible to the failover layer.
+            primary = ChatGPTBackend("bench", "stub", base_url=primary_stub.url, max_retries=0)
+            if hedge is None:
+                backend: LLMBackend = primary
+            else:
+                fallback = GeminiBackend("bench", "stub", base_url=fallback_stub.url, max_retries=0)
+                backend = FailoverBackend([primary, fallback], hedge=hedge, hedge_delay=args.latency * 5)
+            timings, errors = measure(backend, args.requests)
+            report(label, timings, errors)
+            if isinstance(backend, FailoverBackend):
+                stats = backend.stats
+                print(f"{'':<18} failovers={stats.failovers} hedges={stats.hedges} hedge_wins={stats.hedge_wins}")
+
+
+if __name__ == "__main__":
+    main()
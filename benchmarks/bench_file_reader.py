@@ -0,0 +1,82 @@
+"""file_reader latency and memory for deep line windows into large files.
+
+For each size a log file is generated, then a 40-line window near the end is
+read cold (index built on the way), warm (index cached) and at a random
+position. `legacy` is the previous read_text() + splitlines() approach.
+Peak memory is Python heap allocation measured with tracemalloc.
+
+Usage: python -m benchmarks.bench_file_reader [--sizes 1,64,512] [--no-legacy]
+       python -m benchmarks.bench_file_reader --sizes 1024,4096 --no-legacy   # several GB
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from simple_agent.tools.file_read_tool import FileReadTool
+
+LINE = "2024-01-01T00:00:00Z INFO request {index:>10} served in 12ms from worker-07\n"
+
+
+def generate(path: Path, size_mb: int) -> int:
+    line_bytes = len(LINE.format(index=0))
+    count = size_mb * 1024 * 1024 // line_bytes
+    block = 10_000
+    with open(path, "w", encoding="utf-8") as handle:
+        for start in range(0, count, block):
+            handle.write("".join(LINE.format(index=index) for index in range(start, min(start + block, count))))
+    return count
+
+
+def timed(operation: Callable[[], str]) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    operation()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def legacy_read(path: Path, start: int, end: int) -> str:
+    lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    return "\n".join(lines[start - 1 : end])
+
+
+def report(label: str, elapsed: float, peak: float) -> None:
+    print(f"  {label:<8} {elapsed * 1000:>10.2f} ms   peak={peak / 1024 / 1024:>8.2f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,64,512", help="Comma separated file sizes in MB.")
+    parser.add_argument("--no-legacy", action="store_true", help="Skip the whole-file baseline.")
+    parser.add_argument("--dir", type=Path, help="Where to write the generated files (default: a temp dir).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        base = Path(directory)
+        for size_mb in (int(size) for size in args.sizes.split(",")):
+            path = base / f"big-{size_mb}.log"
+            count = generate(path, size_mb)
+            start, end = count - 100, count - 60
+            query = f"{path.name}:{start}-{end}"
+            tool = FileReadTool(base_dir=base)
+            print(f"{size_mb} MB, {count} lines, window {start}-{end}")
+            report("cold", *timed(lambda: tool.run(query)))
+            report("warm", *timed(lambda: tool.run(query)))
+            middle = random.randint(1, count)
+            report("random", *timed(lambda: tool.run(f"{path.name}:{middle}-{middle + 40}")))
+            if not args.no_legacy:
+                report("legacy", *timed(lambda: legacy_read(path, start, end)))
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""file_search latency on a generated source tree: indexed search vs a full scan.
+
+A tree of small Python-like files is generated, then the trigram index is
+built (first pass), refreshed with nothing changed (what a new process pays),
+and refreshed after touching a few files. Searches are timed once the index
+is fresh, against `scan`, which reads every file and runs the regex, as a
+search without an index would.
+
+Usage: python -m benchmarks.bench_file_search [--files 20000] [--dir PATH]
+       python -m benchmarks.bench_file_search --files 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from simple_agent.tools.file_search_tool import FileSearchTool
+
+WORDS = ["request", "handler", "session", "worker", "cache", "token", "stream", "parser", "budget", "span"]
+QUERIES = ["def handler_417_cache", "/class Worker\\d+Stream/", "/token_budget_(19|23)/i", "never_present_text"]
+
+
+def generate(root: Path, count: int) -> None:
+    for index in range(count):
+        directory = root / f"pkg{index // 500:03d}"
+        directory.mkdir(exist_ok=True)
+        first, second = WORDS[index % 10], WORDS[(index // 10) % 10]
+        body = "\n".join(
+            [
+                f'"""Module {index}: {first} {second} helpers."""',
+                "import os",
+                f"class {first.title()}{index}{second.title()}:",
+                f"    def {first}_{index}_{second}(self, value):",
+                f"        return value * {index}  # {second}_{first}_{index % 97}",
+                "",
+            ]
+            * 8
+        )
+        (directory / f"mod{index}.py").write_text(body, encoding="utf-8")
+
+
+def scan(root: Path, pattern: re.Pattern[str]) -> int:
+    matches = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            text = Path(directory, name).read_text(encoding="utf-8", errors="replace")
+            matches += sum(1 for line in text.split("\n") if pattern.search(line))
+    return matches
+
+
+def timed(operation) -> float:
+    start = time.perf_counter()
+    operation()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--dir", type=Path, help="Where to generate the tree (default: a temp dir).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        root = Path(directory) / "tree"
+        root.mkdir()
+        generate(root, args.files)
+        index_path = Path(directory) / "index.sqlite"
+        print(f"{args.files} files")
+
+        tool = FileSearchTool(base_dir=root, index_path=index_path, refresh_interval=0)
+        print(f"  first index       {timed(tool._fresh_index):>9.3f} s")
+        print(f"  refresh, clean    {timed(tool._fresh_index):>9.3f} s")
+        for index in range(0, args.files, max(args.files // 10, 1)):
+            path = root / f"pkg{index // 500:03d}" / f"mod{index}.py"
+            path.write_text(path.read_text(encoding="utf-8") + "# edited\n", encoding="utf-8")
+        print(f"  refresh, 10 edits {timed(tool._fresh_index):>9.3f} s")
+
+        tool.refresh_interval = float("inf")
+        for query in QUERIES:
+            tool.run(query)
+            indexed = min(timed(lambda: tool.run(query)) for _ in range(5))
+            body = query[1:].rsplit("/", 1) if query.startswith("/") else (re.escape(query), "")
+            pattern = re.compile(body[0], re.IGNORECASE if body[1] else 0)
+            full = timed(lambda: scan(root, pattern))
+            print(f"  {query:<28} indexed {indexed * 1000:>8.2f} ms   scan {full * 1000:>9.1f} ms")
+        tool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Bytes and estimated tokens sent per turn on a long tool-heavy run.
+
+Replays a model that reads a large file on every turn, with and without a
+token-budgeted `HistoryManager`.
+
+Usage: python -m benchmarks.bench_history [--turns 12] [--budget 4000] [--output-chars 4000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.history import HistoryManager, TurnStats
+from simple_agent.tools.base import SimpleTool
+
+from .fake_backend import ScriptedBackend
+
+
+class LargeOutputTool(SimpleTool):
+    def __init__(self, chars: int) -> None:
+        super().__init__(name="file_reader", description="Stand-in returning a large file chunk.")
+        self.chars = chars
+
+    def run(self, query: str) -> str:
+        return (f"{query}: " + "lorem ipsum " * self.chars)[: self.chars]
+
+
+def measure(label: str, turns: int, output_chars: int, manager: HistoryManager | None) -> list[TurnStats]:
+    stats: list[TurnStats] = []
+    # Without a budget, record stats through an unbounded manager.
+    manager = manager or HistoryManager()
+    manager.on_turn = stats.append
+    responses = [json.dumps({"tool": "file_reader", "input": f"part{turn}.txt"}) for turn in range(turns)]
+    backend = ScriptedBackend([*responses, "final answer"])
+    agent = SimpleAgent(
+        backend=backend,
+        tools=[LargeOutputTool(output_chars)],
+        system_prompt="bench",
+        history_manager=manager,
+    )
+    agent.run("Summarize all parts.", max_turns=turns + 1)
+    total_bytes = sum(stat.bytes for stat in stats)
+    total_tokens = sum(stat.tokens for stat in stats)
+    print(
+        f"{label:<9} turns={len(stats)} last_turn_bytes={stats[-1].bytes} max_turn_tokens={max(s.tokens for s in stats)} "
+        f"total_bytes={total_bytes} total_tokens={total_tokens}"
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--budget", type=int, default=4000, help="Token budget for the managed run.")
+    parser.add_argument("--output-chars", type=int, default=4000, help="Characters returned by each tool call.")
+    args = parser.parse_args()
+
+    measure("full", args.turns, args.output_chars, None)
+    measure("budgeted", args.turns, args.output_chars, HistoryManager(token_budget=args.budget))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Per-turn latency with a cold connection per request vs a warm pooled session.
+
+Usage: python -m benchmarks.bench_http_session [--turns 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from simple_agent.backends.chatgpt import ChatGPTBackend
+
+from .stub_server import StubServer
+
+MESSAGES = [{"role": "system", "content": "bench"}, {"role": "user", "content": "ping"}]
+
+
+def measure(backend: ChatGPTBackend, turns: int) -> list[float]:
+    timings = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        backend.generate(MESSAGES)
+        timings.append(time.perf_counter() - start)
+    backend.close()
+    return timings
+
+
+def report(label: str, timings: list[float]) -> None:
+    ordered = sorted(timings)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+    print(f"{label:<6} mean={statistics.mean(timings) * 1000:.3f}ms p50={p50:.3f}ms p99={p99:.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        cold = ChatGPTBackend("bench", "stub", base_url=server.url, keep_alive=False)
+        warm = ChatGPTBackend("bench", "stub", base_url=server.url, keep_alive=True)
+        report("cold", measure(cold, args.turns))
+        report("warm", measure(warm, args.turns))
+
+
+if __name__ == "__main__":
+    main()
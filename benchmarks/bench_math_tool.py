@@ -0,0 +1,81 @@
+"""Calculator cost: compiled cached expressions vs re-parsing, batches vs the python tool.
+
+`legacy` re-parses and walks the AST on every call like the old calculator.
+`compiled` is `MathTool.run` with the expression cache warm. The batch rows
+compare one calculator call over N bindings (vectorized when NumPy is
+installed) with the same loop sent to the spawn-per-call python tool.
+
+Usage: python -m benchmarks.bench_math_tool [--rows 10000] [--no-sandbox]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import operator as op
+import time
+from typing import Any, Callable
+
+from simple_agent.tools.math_tool import MathTool, compile_expression
+from simple_agent.tools.python_tool import PythonSandboxTool
+
+EXPRESSION = "(3.5 * 2 - 1) ** 2 / (4 + 0.25) - 7 % 3"
+LEGACY_OPERATORS = {
+    ast.Add: op.add,
+    ast.Sub: op.sub,
+    ast.Mult: op.mul,
+    ast.Div: op.truediv,
+    ast.Pow: op.pow,
+    ast.Mod: op.mod,
+    ast.USub: op.neg,
+}
+
+
+def legacy_eval(expression: str) -> Any:
+    def walk(node: ast.AST) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.UnaryOp):
+            return LEGACY_OPERATORS[type(node.op)](walk(node.operand))
+        if isinstance(node, ast.BinOp):
+            return LEGACY_OPERATORS[type(node.op)](walk(node.left), walk(node.right))
+        raise ValueError("Unsupported expression.")
+
+    return walk(ast.parse(expression, mode="eval").body)
+
+
+def per_call(operation: Callable[[], object], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        operation()
+    return (time.perf_counter() - start) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--no-sandbox", action="store_true", help="Skip the python tool comparison.")
+    args = parser.parse_args()
+
+    tool = MathTool()
+    print("scalar expression")
+    print(f"  legacy    {per_call(lambda: legacy_eval(EXPRESSION), 20_000) * 1e6:>10.2f} us/call")
+    print(f"  compiled  {per_call(lambda: tool.run(EXPRESSION), 20_000) * 1e6:>10.2f} us/call")
+
+    values = list(range(1, args.rows + 1))
+    query = json.dumps({"expression": "sqrt(x ** 2 + 1) * sin(x / 100)", "batch": {"x": values}})
+    vectorized = compile_expression("sqrt(x ** 2 + 1) * sin(x / 100)").vectorizable
+    print(f"batch of {args.rows} rows (vectorizable expression: {vectorized})")
+    print(f"  calculator {per_call(lambda: tool.run(query), 5) * 1000:>9.2f} ms/call")
+    if not args.no_sandbox:
+        code = (
+            "import math, json\n"
+            f"print(json.dumps([math.sqrt(x ** 2 + 1) * math.sin(x / 100) for x in range(1, {args.rows + 1})]))"
+        )
+        sandbox = PythonSandboxTool()
+        print(f"  python     {per_call(lambda: sandbox.run(code), 3) * 1000:>9.2f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Round trips and prompt size per task: text-JSON tool calls vs native function calling.
+
+A simulated model needs two tool calls before answering. In text mode a
+fraction of its tool requests come back malformed (prose around the JSON,
+single quotes), which ends the run with a useless answer and forces a retry;
+native tool calls arrive structured and cannot be malformed that way.
+
+Usage: python -m benchmarks.bench_native_tools [--tasks 500] [--malformed 0.15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from typing import List, Sequence
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.base import BackendResult, LLMBackend, Message, ToolCall, ToolSpec
+from simple_agent.tools.base import SimpleTool
+
+STEPS = [("time", ""), ("calculator", "2 * (3 + 4)")]
+FINAL = "final answer"
+
+
+class EchoTool(SimpleTool):
+    def run(self, query: str) -> str:
+        return f"{self.name} ok"
+
+
+class SimulatedModel(LLMBackend):
+    def __init__(self, *, native: bool, malformed: float, seed: int = 7) -> None:
+        self.supports_native_tools = native
+        self.malformed = malformed
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.chars_sent = 0
+
+    def generate(self, messages: List[Message]) -> str:
+        return self._reply(messages, native=False).text
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        return self._reply(messages, native=True)
+
+    def _reply(self, messages: List[Message], *, native: bool) -> BackendResult:
+        self.calls += 1
+        self.chars_sent += sum(len(message["content"]) for message in messages)
+        step = sum(1 for message in messages if message["role"] == "assistant")
+        if step >= len(STEPS):
+            return BackendResult(FINAL)
+        name, tool_input = STEPS[step]
+        if native:
+            return BackendResult("", [ToolCall(name, tool_input)])
+        if self.random.random() < self.malformed:
+            return BackendResult(f"Sure, I'll call it: {{'tool': '{name}', 'input': '{tool_input}'}}")
+        return BackendResult(json.dumps({"tool": name, "input": tool_input}))
+
+
+def measure(label: str, *, native: bool, tasks: int, malformed: float, max_attempts: int = 5) -> None:
+    backend = SimulatedModel(native=native, malformed=malformed)
+    tools = [
+        EchoTool(name="time", description="Returns the current UTC time in ISO-8601 format."),
+        EchoTool(name="calculator", description="Evaluates basic arithmetic expressions like '2 * (3 + 4)'."),
+    ]
+    agent = SimpleAgent(backend=backend, tools=tools, system_prompt="bench", native_tools=native)
+    completed = 0
+    for index in range(tasks):
+        for _ in range(max_attempts):
+            if agent.run(f"task {index}") == FINAL:
+                completed += 1
+                break
+    print(
+        f"{label:<7} tasks={tasks} completed={completed} round_trips={backend.calls} "
+        f"round_trips_per_task={backend.calls / max(completed, 1):.2f} "
+        f"prompt_chars_per_call={backend.chars_sent / backend.calls:.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--malformed", type=float, default=0.15, help="Share of malformed text tool requests.")
+    args = parser.parse_args()
+
+    measure("text", native=False, tasks=args.tasks, malformed=args.malformed)
+    measure("native", native=True, tasks=args.tasks, malformed=args.malformed)
+
+
+if __name__ == "__main__":
+    main()
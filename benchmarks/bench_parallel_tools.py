@@ -0,0 +1,61 @@
+"""Backend calls, prompt size and wall-clock for a multi-tool task.
+
+Compares a model that asks for one tool per turn with one that batches all
+tool requests into a single JSON array.
+
+Usage: python -m benchmarks.bench_parallel_tools [--tool-delay 0.1] [--latency 0.2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.tools.base import SimpleTool
+
+from .fake_backend import ScriptedBackend
+
+REQUESTS = [
+    {"tool": "time", "input": ""},
+    {"tool": "file_reader", "input": "README.md"},
+    {"tool": "calculator", "input": "2 * (3 + 4)"},
+]
+
+
+class DelayedTool(SimpleTool):
+    def __init__(self, name: str, delay: float) -> None:
+        super().__init__(name=name, description=f"Stand-in for {name}.")
+        self.delay = delay
+
+    def run(self, query: str) -> str:
+        time.sleep(self.delay)
+        return f"{self.name} result " + "x" * 400
+
+
+def measure(label: str, responses: list[str], tool_delay: float, latency: float) -> None:
+    backend = ScriptedBackend(responses, latency=latency)
+    tools = [DelayedTool(request["tool"], tool_delay) for request in REQUESTS]
+    agent = SimpleAgent(backend=backend, tools=tools, system_prompt="bench")
+    start = time.perf_counter()
+    agent.run("What time is it, what is in README.md and what is 2 * (3 + 4)?")
+    elapsed = time.perf_counter() - start
+    agent.close()
+    print(f"{label:<11} backend_calls={backend.calls} chars_sent={backend.chars_sent} elapsed={elapsed:.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tool-delay", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated backend latency per call.")
+    args = parser.parse_args()
+
+    sequential = [json.dumps(request) for request in REQUESTS] + ["final answer"]
+    batched = [json.dumps(REQUESTS), "final answer"]
+    measure("sequential", sequential, args.tool_delay, args.latency)
+    measure("batched", batched, args.tool_delay, args.latency)
+
+
+if __name__ == "__main__":
+    main()
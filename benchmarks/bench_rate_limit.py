@@ -0,0 +1,109 @@
+"""Fan-out against a provider quota with and without the client-side limiter.
+
+The stub answers 429 to requests over `--quota` per second. `--processes`
+workers, each with `--threads` threads, send `--requests` calls in total:
+first straight at the stub, then through a `RateLimiter` whose state files
+all workers share. Reports throughput, the 429 rate and queue-wait
+percentiles.
+
+Usage: python -m benchmarks.bench_rate_limit [--requests 600 --processes 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from simple_agent.backends.base import BackendError, LLMBackend
+from simple_agent.backends.chatgpt import ChatGPTBackend
+from simple_agent.backends.ratelimit import RateLimitedBackend, RateLimiter
+from simple_agent.metrics import MetricsRegistry
+
+from .stub_server import StubServer
+
+MESSAGES = [{"role": "system", "content": "bench"}, {"role": "user", "content": "ping"}]
+
+
+def worker(url: str, requests: int, threads: int, quota: int, state_dir: str | None) -> tuple[int, list[float]]:
+    backend: LLMBackend = ChatGPTBackend("bench", "stub", base_url=url, max_retries=0, pool_size=threads)
+    waits: list[float] = []
+    if state_dir is not None:
+        # The stub counts fixed one-second windows, which a bucket can hit with its burst
+        # plus a second of refill: 80% of the quota plus a quarter-second burst fits.
+        limiter = RateLimiter(
+            "chatgpt:stub",
+            requests_per_minute=quota * 60 * 0.8,
+            max_concurrency=threads,
+            state_dir=state_dir,
+            burst_seconds=0.25,
+            registry=MetricsRegistry(),
+        )
+        backend = RateLimitedBackend(backend, limiter)
+
+        # Record each call's queue wait alongside the histogram.
+        observe = limiter.queue_wait.observe
+
+        def record(value: float, **labels: object) -> None:
+            waits.append(value)
+            observe(value, **labels)
+
+        limiter.queue_wait.observe = record  # type: ignore[method-assign]
+
+    def call(_: int) -> bool:
+        try:
+            backend.generate(MESSAGES)
+        except BackendError:
+            return False
+        return True
+
+    with ThreadPoolExecutor(threads) as pool:
+        failures = sum(not ok for ok in pool.map(call, range(requests)))
+    backend.close()
+    return failures, waits
+
+
+def run(url: str, args: argparse.Namespace, state_dir: str | None) -> tuple[float, int, list[float]]:
+    share = args.requests // args.processes
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.processes) as pool:
+        futures = [
+            pool.submit(worker, url, share, args.threads, args.quota, state_dir) for _ in range(args.processes)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(failures for failures, _ in results), [wait for _, waits in results for wait in waits]
+
+
+def report(label: str, total: int, elapsed: float, failures: int, waits: list[float]) -> None:
+    line = f"{label:<10} {(total - failures) / elapsed:7.1f} ok/s  429s={failures / total:6.1%}"
+    if waits:
+        ordered = sorted(waits)
+        p50 = ordered[len(ordered) // 2] * 1000
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+        line += f"  queue wait p50={p50:.0f}ms p99={p99:.0f}ms"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--quota", type=int, default=100, help="requests per second the stub accepts")
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    total = args.requests // args.processes * args.processes
+
+    with StubServer(latency=args.latency, max_requests_per_second=args.quota) as server:
+        elapsed, failures, _ = run(server.url, args, None)
+        report("unlimited", total, elapsed, failures, [])
+        time.sleep(1.0)  # let the stub's quota window roll over
+        with tempfile.TemporaryDirectory() as state_dir:
+            elapsed, failures, waits = run(server.url, args, state_dir)
+        report("limited", total, elapsed, failures, waits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Python tool throughput and latency: spawn-per-call vs a warm worker pool.
+
+Usage: python -m benchmarks.bench_sandbox_pool [--calls 100] [--concurrency 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_agent.tools.python_tool import PythonSandboxTool
+from simple_agent.tools.sandbox_pool import SandboxWorkerPool
+
+SNIPPET = "import json, psutil, bs4\nprint(json.dumps({'total': sum(range(1000))}))"
+
+
+def measure(label: str, tool: PythonSandboxTool, calls: int, concurrency: int) -> None:
+    def timed(_: int) -> float:
+        start = time.perf_counter()
+        tool.run(SNIPPET)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(timed, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<6} throughput={calls / elapsed:.1f} calls/s p50={p50:.1f}ms p99={p99:.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    measure("spawn", PythonSandboxTool(), args.calls, args.concurrency)
+
+    pool = SandboxWorkerPool(args.concurrency, warm_imports=["json", "psutil", "bs4"])
+    pooled = PythonSandboxTool(pool=pool)
+    # Let every worker finish its warm-up imports before timing.
+    with ThreadPoolExecutor(max_workers=args.concurrency) as warmup:
+        list(warmup.map(lambda _: pooled.run("pass"), range(args.concurrency)))
+    measure("pool", pooled, args.calls, args.concurrency)
+    pooled.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Multi-step data analysis in the python tool: stateless calls vs a run-scoped session.
+
+Each step builds on the previous ones: load a dataset, define helpers, then
+query it. Stateless execution has to resend and re-run every earlier step
+(the model would paste the setup code again); a session only runs the new
+snippet. Reports wall time and characters of code sent (~4 per token).
+
+Usage: python -m benchmarks.bench_sandbox_session [--rows 200000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from simple_agent.tools.python_tool import PythonSandboxTool
+from simple_agent.tools.run_context import CURRENT_RUN, RunContext
+
+STEPS = [
+    "import random, statistics\n"
+    "random.seed(7)\n"
+    "rows = [{{'id': i, 'group': i % 7, 'value': random.gauss(100, 15)}} for i in range({rows})]",
+    "def by_group(rows):\n"
+    "    groups = {{}}\n"
+    "    for row in rows:\n"
+    "        groups.setdefault(row['group'], []).append(row['value'])\n"
+    "    return groups\n"
+    "groups = by_group(rows)",
+    "print({{g: round(statistics.mean(v), 2) for g, v in sorted(groups.items())}})",
+    "print({{g: round(statistics.pstdev(v), 2) for g, v in sorted(groups.items())}})",
+    "outliers = [row['id'] for row in rows if abs(row['value'] - 100) > 60]\nprint(len(outliers))",
+    "print(sorted(outliers)[:5])",
+]
+
+
+def run_steps(tool: PythonSandboxTool, steps: list[str], *, cumulative: bool) -> tuple[float, int]:
+    sent = 0
+    start = time.perf_counter()
+    for index in range(len(steps)):
+        code = "\n".join(steps[: index + 1]) if cumulative else steps[index]
+        sent += len(code)
+        output = tool.run(code)
+        if "[Error]" in output or "timed out" in output:
+            raise RuntimeError(output)
+    return time.perf_counter() - start, sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    steps = [step.format(rows=args.rows) for step in STEPS]
+
+    stateless = PythonSandboxTool(timeout=60)
+    elapsed, sent = run_steps(stateless, steps, cumulative=True)
+    print(f"stateless  {elapsed:>7.2f} s   {sent:>6} chars of code sent")
+
+    session_tool = PythonSandboxTool(timeout=60, sessions=True)
+    run = RunContext()
+    token = CURRENT_RUN.set(run)
+    try:
+        elapsed, sent = run_steps(session_tool, steps, cumulative=False)
+    finally:
+        CURRENT_RUN.reset(token)
+        run.close()
+    print(f"session    {elapsed:>7.2f} s   {sent:>6} chars of code sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Load test for `main.py --serve` against the local stub LLM server.
+
+Each client thread keeps one HTTP/1.1 connection open and posts prompts back
+to back. Clients beyond the server's concurrency limit show up as 429s.
+
+Usage: python -m benchmarks.bench_server [--requests 2000] [--clients 16] [--server-concurrency 16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.chatgpt import ChatGPTBackend
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.server import AgentServer
+
+from .stub_server import StubServer
+
+
+def client(url: str, count: int, latencies: list[float], statuses: Counter) -> None:
+    host, port = url.removeprefix("http://").split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=30)
+    body = json.dumps({"prompt": "ping"})
+    for _ in range(count):
+        start = time.perf_counter()
+        connection.request("POST", "/run", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status] += 1
+    connection.close()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return statistics.quantiles(values, n=100)[round(fraction * 100) - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--server-concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated provider latency in seconds.")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency) as stub:
+        backend = ChatGPTBackend("bench", "stub", base_url=stub.url, pool_size=args.server_concurrency)
+        agent = SimpleAgent(backend=backend, tools=[], system_prompt="bench")
+        with AgentServer(agent, port=0, max_concurrency=args.server_concurrency, registry=MetricsRegistry()) as server:
+            latencies: list[float] = []
+            statuses: Counter = Counter()
+            per_client = args.requests // args.clients
+            threads = [
+                threading.Thread(target=client, args=(server.url, per_client, latencies, statuses))
+                for _ in range(args.clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        backend.close()
+
+    ok = statuses.get(200, 0)
+    print(
+        f"requests={sum(statuses.values())} clients={args.clients} server_concurrency={args.server_concurrency} "
+        f"elapsed={elapsed:.2f}s ok_rps={ok / elapsed:.1f} statuses={dict(statuses)}"
+    )
+    print(
+        f"latency p50={percentile(latencies, 0.5) * 1000:.1f}ms p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
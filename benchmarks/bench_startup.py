@@ -0,0 +1,118 @@
+"""CLI cold-start cost: `import simple_agent` and `main.py --list-tools` in fresh interpreters.
+
+Each measurement runs a new `python -X importtime` process and reads the
+cumulative import time of the top-level module from its report, so numbers
+are not skewed by interpreter start-up. The slowest imported modules are
+listed to show where the time goes.
+
+`--check` turns the run into a CI gate: it exits with status 1 when
+`import simple_agent` pulls in any of the heavy optional modules, or when
+`main.py --list-tools` imports a backend or a tool module. It checks
+which modules load rather than how long they take, since wall-clock times
+on shared CI runners vary too much for a fixed budget. `--budget-ms` adds
+a timing limit for local runs on a known machine.
+
+Usage: python -m benchmarks.bench_startup [--runs 7] [--check [--budget-ms 50]]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Modules a bare `import simple_agent` must not load; each costs tens of milliseconds.
+HEAVY_MODULES = (
+    "aiohttp",
+    "requests",
+    "dotenv",
+    "sqlite3",
+    "simple_agent.backends.chatgpt",
+    "simple_agent.tools.python_tool",
+)
+# `--list-tools` describes tools from the catalog and plugin metadata, so it must not import any of them.
+_TOOL_MODULE = re.compile(r"^simple_agent\.(backends\.(?!base$)\w+|tools\.\w+_tool)$")
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_report(args: list[str]) -> dict[str, tuple[int, int]]:
+    """Run `python -X importtime ARGS` and map each imported module to (self, cumulative) microseconds."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report: dict[str, tuple[int, int]] = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            report[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return report
+
+
+def measure_import(runs: int) -> tuple[float, dict[str, tuple[int, int]]]:
+    samples = []
+    report: dict[str, tuple[int, int]] = {}
+    for _ in range(runs):
+        report = import_report(["-c", "import simple_agent"])
+        samples.append(report["simple_agent"][1] / 1000)
+    return statistics.median(samples), report
+
+
+def measure_command(args: list[str], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list for --list-tools.")
+    parser.add_argument("--check", action="store_true", help="Fail on heavy imports (or a blown --budget-ms).")
+    parser.add_argument("--budget-ms", type=float, default=None, help="With --check, also cap the median import time.")
+    args = parser.parse_args(argv)
+
+    import_ms, report = measure_import(args.runs)
+    heavy = [name for name in HEAVY_MODULES if name in report]
+    print(f"import simple_agent     median={import_ms:.1f}ms heavy modules={', '.join(heavy) or 'none'}")
+
+    interpreter_ms = measure_command(["-c", "pass"], args.runs)
+    list_tools_ms = measure_command(["main.py", "--list-tools"], args.runs)
+    print(f"python -c pass          median={interpreter_ms:.1f}ms")
+    print(f"main.py --list-tools    median={list_tools_ms:.1f}ms (+{list_tools_ms - interpreter_ms:.1f}ms over a bare interpreter)")
+
+    list_tools_report = import_report(["main.py", "--list-tools"])
+    slowest = sorted(list_tools_report.items(), key=lambda item: item[1][0], reverse=True)
+    print("slowest modules (self time) for --list-tools:")
+    for name, (own, cumulative) in slowest[: args.top]:
+        print(f"  {name:<40} self={own / 1000:6.1f}ms cumulative={cumulative / 1000:6.1f}ms")
+
+    if not args.check:
+        return 0
+    failures = []
+    if heavy:
+        failures.append(f"import simple_agent loaded {', '.join(heavy)}")
+    eager = sorted(name for name in list_tools_report if _TOOL_MODULE.match(name))
+    if eager:
+        failures.append(f"main.py --list-tools loaded {', '.join(eager)}")
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        failures.append(f"import simple_agent took {import_ms:.1f}ms (budget {args.budget_ms:g}ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Time-to-first-token for direct answers: streaming vs waiting for the full reply.
+
+Usage: python -m benchmarks.bench_streaming [--words 50] [--ttft 0.2] [--token-delay 0.01]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.chatgpt import ChatGPTBackend
+from simple_agent.backends.gemini import GeminiBackend
+
+from .stub_server import StubServer
+
+
+def measure(agent: SimpleAgent, *, stream: bool) -> tuple[float, float]:
+    start = time.perf_counter()
+    if not stream:
+        agent.run("question")
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    first = None
+    for _ in agent.stream("question"):
+        if first is None:
+            first = time.perf_counter() - start
+    return first or 0.0, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--words", type=int, default=50)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Simulated provider time-to-first-token.")
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    reply = " ".join(f"word{i}" for i in range(args.words))
+    with StubServer(reply=reply, latency=args.ttft, token_delay=args.token_delay) as server:
+        backends = {
+            "chatgpt": ChatGPTBackend("bench", "stub", base_url=server.url),
+            "gemini": GeminiBackend("bench", "stub", base_url=server.url),
+        }
+        for name, backend in backends.items():
+            agent = SimpleAgent(backend=backend, tools=[], system_prompt="bench")
+            for stream in (False, True):
+                ttft, total = measure(agent, stream=stream)
+                label = f"{name}/{'stream' if stream else 'run'}"
+                print(f"{label:<16} ttft={ttft * 1000:.1f}ms total={total * 1000:.1f}ms")
+            backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Repeated tool calls with and without `MemoizedTool`.
+
+Each tool gets `--calls` queries drawn with a skewed distribution from
+`--distinct` distinct ones, which is how agents repeat themselves across
+turns and runs. The file reader reads windows of a generated log, and
+halfway through the file is rewritten, so memoized reads have to notice
+the change. The python tool spawns an interpreter per uncached call.
+
+Usage: python -m benchmarks.bench_tool_cache [--calls 400] [--distinct 20] [--no-sandbox]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.tools.base import Tool
+from simple_agent.tools.file_read_tool import FileReadTool
+from simple_agent.tools.math_tool import MathTool
+from simple_agent.tools.memo import MemoizedTool
+from simple_agent.tools.python_tool import PythonSandboxTool
+
+
+def skewed(queries: List[str], calls: int) -> List[str]:
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(len(queries))]
+    return rng.choices(queries, weights=weights, k=calls)
+
+
+def timed(tool: Tool, workload: List[str], change: Callable[[bool], None] | None) -> float:
+    """Seconds spent in `tool.run`; `change(False)` resets the input, `change(True)` modifies it midway."""
+
+    if change is not None:
+        change(False)
+    elapsed = 0.0
+    for index, query in enumerate(workload):
+        if change is not None and index == len(workload) // 2:
+            change(True)
+        start = time.perf_counter()
+        tool.run(query)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def compare(label: str, build: Callable[[], Tool], workload: List[str], change: Callable[[bool], None] | None = None) -> None:
+    plain = build()
+    memo = MemoizedTool(build(), registry=MetricsRegistry())
+    baseline = timed(plain, workload, change)
+    memoized = timed(memo, workload, change)
+    # Outputs must match call for call, including reads after the file changed.
+    for query in workload[-5:]:
+        assert memo.run(query) == plain.run(query), query
+    calls = len(workload)
+    print(
+        f"{label:<12} plain {baseline / calls * 1e6:9.1f}us/call  memoized {memoized / calls * 1e6:9.1f}us/call  "
+        f"speedup {baseline / memoized:6.1f}x  hit rate {memo.hit_rate:.0%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--distinct", type=int, default=20)
+    parser.add_argument("--no-sandbox", action="store_true", help="Skip the python tool.")
+    args = parser.parse_args()
+
+    expressions = [f"sqrt({n}) * log({n} + 1, 2) + factorial({n % 12})" for n in range(args.distinct)]
+    compare("calculator", MathTool, skewed(expressions, args.calls))
+
+    with tempfile.TemporaryDirectory() as directory:
+        log = Path(directory) / "app.log"
+        lines = [f"2024-05-01T12:{index % 60:02d}:00 INFO request {index} served in {index % 97}ms" for index in range(200_000)]
+        original = "\n".join(lines) + "\n"
+        changed = original.replace("INFO", "WARN")
+
+        def rewrite(midway: bool) -> None:
+            log.write_text(changed if midway else original, encoding="utf-8")
+
+        windows = [f"app.log:{start}-{start + 60}" for start in range(1, 200_000, 200_000 // args.distinct)]
+        compare("file_reader", lambda: FileReadTool(base_dir=Path(directory)), skewed(windows, args.calls), rewrite)
+
+    if not args.no_sandbox:
+        snippets = [f"import math\nprint(sum(math.sqrt(i) for i in range({n * 1000})))" for n in range(args.distinct)]
+        compare("python", PythonSandboxTool, skewed(snippets, max(args.calls // 4, args.distinct)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Tool-call extraction on realistic replies: old regex-and-retry vs the single-pass scanner.
+
+The corpus mixes what models actually send back: short and long prose
+answers, markdown answers with non-JSON code fences, bare and fenced tool
+calls, tool-call arrays and a call embedded in prose. The old extractor is
+reproduced inline as the baseline.
+
+Usage: python -m benchmarks.bench_tool_parsing [--number 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import timeit
+
+from simple_agent.toolcalls import as_tool_requests, extract_tool_requests
+
+TOOL_CALL = json.dumps({"tool": "python", "input": "import psutil\nprint(psutil.cpu_percent(interval=0.1))"})
+PROSE = (
+    "The quarterly numbers show revenue up 4% while costs held flat, so margins improved. "
+    "Most of the gain came from the subscription tier; one-off sales were down slightly. "
+)
+MARKDOWN = (
+    "## Steps\n\n1. Install the package.\n2. Run the command below:\n\n"
+    "```bash\npip install -e .\npython main.py --list-tools\n```\n\n"
+    "Then check the output `{name}: {description}` for each tool.\n\n"
+)
+
+CORPUS = {
+    "short answer": "Warsaw",
+    "prose 20KB": PROSE * 120,
+    "prose 200KB": PROSE * 1200,
+    "markdown 50KB": MARKDOWN * 250,
+    "bare call": TOOL_CALL,
+    "fenced call after 50KB": PROSE * 300 + "\n```json\n" + TOOL_CALL + "\n```",
+    "call array": json.dumps([json.loads(TOOL_CALL)] * 3),
+    "call in prose": "Let me measure that first. " + TOOL_CALL + " I'll report back.",
+}
+
+
+def regex_extract(text: str) -> list | None:
+    """The previous extractor: whole-text `json.loads`, then every fenced block."""
+
+    text = text.strip()
+    candidates = [text]
+    fenced = re.findall(r"```(?:json)?\s*(.*?)```", text, flags=re.DOTALL)
+    candidates.extend(content.strip() for content in fenced if content.strip())
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        requests = as_tool_requests(data)
+        if requests:
+            return requests
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'reply':<24} {'regex':>10} {'scanner':>10} {'speedup':>8}  found")
+    for label, text in CORPUS.items():
+        old = min(timeit.repeat(lambda: regex_extract(text), number=args.number, repeat=5)) / args.number
+        new = min(timeit.repeat(lambda: extract_tool_requests(text), number=args.number, repeat=5)) / args.number
+        found = f"{regex_extract(text) is not None}/{extract_tool_requests(text) is not None}"
+        print(f"{label:<24} {old * 1e6:8.1f}us {new * 1e6:8.1f}us {old / new:7.1f}x  {found}")
+
+
+if __name__ == "__main__":
+    main()
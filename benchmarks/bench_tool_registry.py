@@ -0,0 +1,104 @@
+"""Agent construction and plugin discovery cost with many tools.
+
+Generates `--tools` plugin distributions in a temporary site directory, then
+measures discovery with an empty metadata cache (scan entry points, import
+and instantiate every plugin) against a warm cache (no imports at all), and
+`SimpleAgent` construction with the prepared prompt rebuilt every time
+against the memoized one.
+
+Usage: python -m benchmarks.bench_tool_registry [--tools 150]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from simple_agent import agent as agent_module
+from simple_agent.agent import SimpleAgent
+from simple_agent.tools.registry import ToolRegistry
+
+from .fake_backend import ScriptedBackend
+
+PLUGIN_SOURCE = '''
+from simple_agent.tools.base import SimpleTool
+
+
+class Plugin(SimpleTool):
+    def __init__(self):
+        super().__init__(name="plugin_{index}", description="Plugin tool {index}: looks up records by id and returns them as JSON.")
+
+    def run(self, query):
+        return query
+'''
+
+
+def write_plugins(site: Path, count: int) -> None:
+    for index in range(count):
+        (site / f"bench_plugin_{index}.py").write_text(PLUGIN_SOURCE.format(index=index))
+        dist_info = site / f"bench_plugin_{index}-1.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: bench-plugin-{index}\nVersion: 1.0\n")
+        (dist_info / "entry_points.txt").write_text(f"[simple_agent.tools]\nplugin_{index} = bench_plugin_{index}:Plugin\n")
+
+
+def forget_plugins() -> None:
+    for name in [name for name in sys.modules if name.startswith("bench_plugin_")]:
+        del sys.modules[name]
+
+
+def time_discovery(cache: Path) -> tuple[float, int]:
+    forget_plugins()
+    start = time.perf_counter()
+    ToolRegistry(cache).tools()
+    elapsed = time.perf_counter() - start
+    imported = sum(name.startswith("bench_plugin_") for name in sys.modules)
+    return elapsed, imported
+
+
+def time_construction(tools: list, runs: int) -> float:
+    backend = ScriptedBackend(["unused"])
+    start = time.perf_counter()
+    for _ in range(runs):
+        SimpleAgent(backend=backend, tools=tools, system_prompt="bench")
+    return (time.perf_counter() - start) / runs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, default=150)
+    parser.add_argument("--runs", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        site = Path(directory) / "site"
+        site.mkdir()
+        write_plugins(site, args.tools)
+        sys.path.insert(0, str(site))
+        cache = Path(directory) / "tool-metadata.json"
+        try:
+            cold, cold_imports = time_discovery(cache)
+            warm, warm_imports = time_discovery(cache)
+            print(f"discovery cold  {cold * 1000:8.1f}ms imported={cold_imports}")
+            print(f"discovery warm  {warm * 1000:8.1f}ms imported={warm_imports} ({cold / warm:.0f}x faster)")
+
+            tools = ToolRegistry(cache).tools()
+            memoized = time_construction(tools, args.runs)
+            prepare = agent_module._prepare_prompts
+            agent_module._prepare_prompts = prepare.__wrapped__  # the old behaviour: format on every construction
+            try:
+                rebuilt = time_construction(tools, args.runs)
+            finally:
+                agent_module._prepare_prompts = prepare
+            print(f"agent init rebuilt   {rebuilt * 1e6:8.1f}us with {len(tools)} tools")
+            print(f"agent init memoized  {memoized * 1e6:8.1f}us ({rebuilt / memoized:.1f}x faster)")
+        finally:
+            sys.path.remove(str(site))
+            forget_plugins()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Per-run overhead of tracing on a zero-latency scripted run.
+
+Each run makes one tool call and one final answer (two turns, seven spans
+when tracing is on). Compares no tracer, a tracer without exporters, and
+the built-in exporters.
+
+Usage: python -m benchmarks.bench_tracing [--runs 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.tools.base import SimpleTool
+from simple_agent.tracing import InMemoryExporter, JsonLinesExporter, PrometheusExporter, Tracer, maybe_span
+
+from .fake_backend import ScriptedBackend
+
+SPANS_PER_RUN = 7  # run, 2 turns, 2 backend, 2 parse; the tool span is skipped when disabled
+
+
+class NoopTool(SimpleTool):
+    def run(self, query: str) -> str:
+        return "ok"
+
+
+def measure(label: str, tracer: Tracer | None, runs: int, baseline: float | None) -> float:
+    backend = ScriptedBackend([json.dumps({"tool": "noop", "input": ""}), "done"])
+    agent = SimpleAgent(
+        backend=backend,
+        tools=[NoopTool(name="noop", description="Does nothing.")],
+        system_prompt="bench",
+        tracer=tracer,
+    )
+    for _ in range(min(runs, 500)):
+        agent.run("warm up")
+    start = time.perf_counter()
+    for _ in range(runs):
+        agent.run("question")
+    per_run = (time.perf_counter() - start) / runs
+    agent.close()
+    overhead = "" if baseline is None else f" overhead={(per_run - baseline) * 1e6:+.1f}us ({per_run / baseline - 1:+.1%})"
+    print(f"{label:<12} per_run={per_run * 1e6:.1f}us{overhead}")
+    return per_run
+
+
+def disabled_span_cost(iterations: int = 1_000_000) -> float:
+    """Seconds per `maybe_span` with tracing off, net of the bare loop."""
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    empty = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with maybe_span(None, "turn", None):
+            pass
+    return (time.perf_counter() - start - empty) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20000)
+    args = parser.parse_args()
+
+    baseline = measure("disabled", None, args.runs, None)
+    per_span = disabled_span_cost()
+    print(
+        f"{'':<12} disabled span cost={per_span * 1e9:.0f}ns x {SPANS_PER_RUN} per run = "
+        f"{SPANS_PER_RUN * per_span * 1e6:.1f}us ({SPANS_PER_RUN * per_span / (baseline + 0.1):.4%} of a run "
+        "with a 50ms backend call per turn)"
+    )
+    measure("no-exporter", Tracer(), args.runs, baseline)
+    measure("in-memory", Tracer([InMemoryExporter()]), args.runs, baseline)
+    measure("prometheus", Tracer([PrometheusExporter(MetricsRegistry())]), args.runs, baseline)
+    with tempfile.TemporaryDirectory() as directory:
+        measure("json-lines", Tracer([JsonLinesExporter(Path(directory) / "trace.jsonl")]), args.runs, baseline)
+
+
+if __name__ == "__main__":
+    main()
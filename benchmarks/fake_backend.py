@@ -0,0 +1,45 @@
+"""Deterministic scripted backend for benchmarks."""
+
+from __future__ import annotations
+
+import time
+from typing import Iterable, List, Sequence
+
+from simple_agent.backends.base import BackendResult, LLMBackend, Message, ToolSpec
+
+
+class ScriptedBackend(LLMBackend):
+    """Replays canned responses in order and records what it was sent.
+
+    Responses may be plain strings or `BackendResult`s with structured tool
+    calls; the latter are only meaningful with `native_tools=True`.
+    """
+
+    def __init__(
+        self,
+        responses: Iterable[str | BackendResult],
+        *,
+        latency: float = 0.0,
+        native_tools: bool = False,
+    ) -> None:
+        self.responses = list(responses)
+        self.latency = latency
+        self.supports_native_tools = native_tools
+        self.calls = 0
+        self.chars_sent = 0
+        self._cursor = 0
+
+    def generate(self, messages: List[Message]) -> str:
+        return self._next(messages).text
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        return self._next(messages)
+
+    def _next(self, messages: List[Message]) -> BackendResult:
+        self.calls += 1
+        self.chars_sent += sum(len(message["content"]) for message in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        response = self.responses[self._cursor % len(self.responses)]
+        self._cursor += 1
+        return BackendResult(response) if isinstance(response, str) else response
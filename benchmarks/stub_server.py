@@ -0,0 +1,174 @@
+"""Local HTTP stub that mimics the OpenAI and Gemini completion endpoints."""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every completion request with a canned reply."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.server.admit():
+            self._send_error(429, retry_after=1)
+            return
+        fault, slow = self.server.roll()
+        if self.server.latency or slow:
+            time.sleep(self.server.slow_latency if slow else self.server.latency)
+        if fault:
+            self._send_error(self.server.error_status, retry_after=self.server.retry_after)
+            return
+
+        reply = self.server.reply
+        gemini = ":generateContent" in self.path or ":streamGenerateContent" in self.path
+        if request.get("stream") or ":streamGenerateContent" in self.path:
+            self._send_sse(reply, gemini=gemini)
+            return
+
+        # Non-streaming clients wait until the whole completion is generated.
+        time.sleep(self.server.token_delay * len(_tokens(reply)))
+        if gemini:
+            body = {"candidates": [{"content": {"parts": [{"text": reply}]}}]}
+        else:
+            body = {"choices": [{"message": {"role": "assistant", "content": reply}}]}
+        self._send_json(200, body)
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, *, retry_after: float | None = None) -> None:
+        data = json.dumps({"error": {"message": "injected fault"}}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_sse(self, reply: str, *, gemini: bool) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, token in enumerate(_tokens(reply)):
+            if index:
+                time.sleep(self.server.token_delay)
+            if gemini:
+                event = {"candidates": [{"content": {"parts": [{"text": token}]}}]}
+            else:
+                event = {"choices": [{"delta": {"content": token}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+        if not gemini:
+            self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server bound to an ephemeral localhost port.
+
+    `latency` models time-to-first-token and `token_delay` the gap between
+    streamed tokens (whitespace-separated words of `reply`).
+
+    For fault injection, `error_rate` of requests are answered with
+    `error_status` (plus a `Retry-After` header when `retry_after` is set)
+    and `slow_rate` of requests take `slow_latency` instead of `latency`.
+    Faults are drawn from a generator seeded with `seed`. With
+    `max_requests_per_second` set, requests over that many in the current
+    one-second window get a 429, like a provider quota.
+    """
+
+    daemon_threads = True
+    request_queue_size = 4096
+
+    def __init__(
+        self,
+        *,
+        reply: str = "ok",
+        latency: float = 0.0,
+        token_delay: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: float | None = None,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.0,
+        max_requests_per_second: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.reply = reply
+        self.latency = latency
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.max_requests_per_second = max_requests_per_second
+        self.admitted = 0
+        self.rejected = 0
+        self._window = (0, 0)  # (second, requests admitted in it)
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def roll(self) -> tuple[bool, bool]:
+        """Decide whether the next request fails and whether it is slow."""
+
+        with self._random_lock:
+            return self._random.random() < self.error_rate, self._random.random() < self.slow_rate
+
+    def admit(self) -> bool:
+        """Count the request against the quota; False when it is over."""
+
+        with self._random_lock:
+            if self.max_requests_per_second is not None:
+                second, count = self._window
+                now = int(time.monotonic())
+                count = count + 1 if now == second else 1
+                self._window = (now, count)
+                if count > self.max_requests_per_second:
+                    self.rejected += 1
+                    return False
+            self.admitted += 1
+            return True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def _tokens(reply: str) -> list[str]:
+    words = reply.split(" ")
+    return [word if index == 0 else f" {word}" for index, word in enumerate(words)]
@@ -0,0 +1,239 @@
+"""Agent overhead benchmark suite with saved baselines and regression checks.
+
+Every case reports seconds per operation (lower is better), taking the
+median over several repeats. Results are written as JSON so they can be
+kept as baselines and compared later:
+
+    python -m benchmarks.suite run --output .benchmarks/main.json
+    python -m benchmarks.suite compare .benchmarks/main.json            # runs the suite now
+    python -m benchmarks.suite compare .benchmarks/main.json new.json --threshold 0.15
+
+`compare` exits with status 1 when any case is slower than the baseline by
+more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.tools.base import SimpleTool
+from simple_agent.tools.file_read_tool import FileReadTool
+from simple_agent.tools.python_tool import PythonSandboxTool
+
+from .fake_backend import ScriptedBackend
+
+DEFAULT_OUTPUT = Path(".benchmarks/latest.json")
+TOOL_CALL = json.dumps({"tool": "noop", "input": "x"})
+
+
+@dataclass(slots=True)
+class CaseResult:
+    seconds_per_op: float
+    ops_per_repeat: int
+    repeats: int
+
+
+class NoopTool(SimpleTool):
+    def __init__(self) -> None:
+        super().__init__(name="noop", description="Returns immediately.")
+
+    def run(self, query: str) -> str:
+        return "ok"
+
+
+def _measure(operation: Callable[[], object], *, number: int, repeats: int) -> CaseResult:
+    operation()  # warm caches, pools and lazily built state
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        samples.append((time.perf_counter() - start) / number)
+    return CaseResult(statistics.median(samples), number, repeats)
+
+
+def bench_agent_run(latency: float, quick: bool) -> CaseResult:
+    """One tool call plus a final answer through `SimpleAgent.run`."""
+
+    backend = ScriptedBackend([TOOL_CALL, "final answer"], latency=latency)
+    agent = SimpleAgent(backend=backend, tools=[NoopTool()], system_prompt="bench")
+    number = 20 if latency else (500 if quick else 5000)
+    result = _measure(lambda: agent.run("question"), number=number, repeats=5)
+    agent.close()
+    return result
+
+
+def bench_tool_dispatch(latency: float, quick: bool) -> CaseResult:
+    """Agent-side cost of dispatching one call to a no-op tool and recording its result."""
+
+    agent = SimpleAgent(backend=ScriptedBackend(["unused"]), tools=[NoopTool()], system_prompt="bench")
+    requests = [{"tool": "noop", "input": "x"}]
+
+    def dispatch() -> None:
+        history = [{"role": "system", "content": "s"}, {"role": "user", "content": "q"}]
+        agent._record_tool_results(history, requests, agent._run_tools(requests))
+
+    result = _measure(dispatch, number=2000 if quick else 20000, repeats=5)
+    agent.close()
+    return result
+
+
+def bench_tool_dispatch_batch(latency: float, quick: bool) -> CaseResult:
+    """Three tool calls from one JSON array, dispatched on the thread pool."""
+
+    agent = SimpleAgent(backend=ScriptedBackend(["unused"]), tools=[NoopTool()], system_prompt="bench")
+    requests = [{"tool": "noop", "input": str(index)} for index in range(3)]
+    result = _measure(lambda: agent._run_tools(requests), number=500 if quick else 5000, repeats=5)
+    agent.close()
+    return result
+
+
+def bench_parse_large_answer(latency: float, quick: bool) -> CaseResult:
+    """Tool-call extraction on a ~200 KB prose answer with no tool call."""
+
+    text = "The quick brown fox jumps over the lazy dog. " * 4500
+    return _measure(
+        lambda: SimpleAgent._maybe_extract_tool_request(text),
+        number=20 if quick else 200,
+        repeats=5,
+    )
+
+
+def bench_parse_large_fenced(latency: float, quick: bool) -> CaseResult:
+    """Tool-call extraction on a ~200 KB answer ending in a fenced JSON request."""
+
+    text = "Let me think about this. " * 8000 + "\n```json\n" + TOOL_CALL + "\n```"
+    return _measure(
+        lambda: SimpleAgent._maybe_extract_tool_request(text),
+        number=20 if quick else 200,
+        repeats=5,
+    )
+
+
+def bench_sandbox_spawn(latency: float, quick: bool) -> CaseResult:
+    """Spawn-per-call python tool round trip."""
+
+    tool = PythonSandboxTool()
+    return _measure(lambda: tool.run("print(1)"), number=3 if quick else 10, repeats=3)
+
+
+def bench_file_reader_large(latency: float, quick: bool) -> CaseResult:
+    """A 40-line window near the end of a large log file."""
+
+    lines = 200_000 if quick else 2_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "big.log"
+        with open(path, "w", encoding="utf-8") as handle:
+            for index in range(lines):
+                handle.write(f"2024-01-01T00:00:00Z INFO request {index} served in 12ms\n")
+        tool = FileReadTool(base_dir=Path(directory))
+        query = f"big.log:{lines - 100}-{lines - 60}"
+        return _measure(lambda: tool.run(query), number=3 if quick else 5, repeats=3)
+
+
+CASES: Dict[str, Callable[[float, bool], CaseResult]] = {
+    "agent_run": bench_agent_run,
+    "tool_dispatch": bench_tool_dispatch,
+    "tool_dispatch_batch": bench_tool_dispatch_batch,
+    "parse_large_answer": bench_parse_large_answer,
+    "parse_large_fenced": bench_parse_large_fenced,
+    "sandbox_spawn": bench_sandbox_spawn,
+    "file_reader_large": bench_file_reader_large,
+}
+
+
+def run_suite(*, only: list[str] | None = None, latency: float = 0.0, quick: bool = False) -> dict:
+    results = {}
+    for name, case in CASES.items():
+        if only and name not in only:
+            continue
+        result = case(latency, quick)
+        results[name] = asdict(result)
+        print(f"{name:<22} {result.seconds_per_op * 1e6:>14.1f} us/op", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "latency": latency,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, *, threshold: float) -> list[str]:
+    """Print a comparison table and return the names of regressed cases."""
+
+    regressions = []
+    print(f"{'case':<22} {'baseline us':>14} {'current us':>14} {'change':>9}")
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        change = after["seconds_per_op"] / before["seconds_per_op"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<22} {before['seconds_per_op'] * 1e6:>14.1f} "
+            f"{after['seconds_per_op'] * 1e6:>14.1f} {change:>+9.1%}{flag}"
+        )
+    return regressions
+
+
+def _load(path: str | Path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and save the results.")
+    run_parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a saved baseline.")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path, nargs="?", help="Saved results; the suite runs if omitted.")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%).")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--only", nargs="+", choices=sorted(CASES), help="Run a subset of cases.")
+        sub.add_argument("--latency", type=float, default=0.0, help="Simulated backend latency for agent_run.")
+        sub.add_argument("--quick", action="store_true", help="Fewer iterations and smaller inputs.")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(only=args.only, latency=args.latency, quick=args.quick)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved results to {args.output}", file=sys.stderr)
+        return 0
+
+    baseline = _load(args.baseline)
+    if args.current is not None:
+        current = _load(args.current)
+    else:
+        only = args.only or list(baseline["results"])
+        current = run_suite(only=only, latency=args.latency, quick=args.quick)
+    regressions = compare(baseline, current, threshold=args.threshold)
+    if regressions:
+        print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import argparse
 import logging
+import sys
 from dataclasses import replace
 
 from simple_agent import SimpleAgent, get_backend, load_default_tools
-from simple_agent.config import get_settings
+from simple_agent.config import Settings, get_settings
+from simple_agent.history import BackendSummarizer, HistoryManager
+from simple_agent.tracing import JsonLinesExporter, PrometheusExporter, SpanExporter, Tracer
+from simple_agent.tools import Tool
 
 
 def configure_logging(verbosity: int, quiet: bool) -> None:
@@ -31,6 +35,20 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--max-turns", type=int, default=5, help="Maximum number of tool loops before giving up.")
     parser.add_argument("--no-tools", action="store_true", help="Disable tool usage and respond directly.")
     parser.add_argument("--list-tools", action="store_true", help="List available tools and exit.")
+    parser.add_argument("--stream", action="store_true", help="Print the answer as it is generated.")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the response cache for this run.")
+    parser.add_argument("--batch", metavar="INPUT", help="Run every prompt in a JSONL file instead of a single prompt.")
+    parser.add_argument("--output", metavar="OUTPUT", help="JSONL file for --batch results (resumed if it exists).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent prompts in --batch mode.")
+    parser.add_argument("--trace", metavar="FILE", help="Append JSON-lines spans for each run to FILE.")
+    parser.add_argument(
+        "--conversation",
+        metavar="ID",
+        help="Continue the stored conversation ID; without a prompt, resume its unfinished run.",
+    )
+    parser.add_argument("--serve", action="store_true", help="Run an HTTP server instead of a single prompt.")
+    parser.add_argument("--host", help="Interface for --serve (defaults to SERVER_HOST).")
+    parser.add_argument("--port", type=int, help="Port for --serve (defaults to SERVER_PORT).")
     parser.add_argument(
         "-v",
         "--verbose",
@@ -47,6 +65,79 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def build_agent(settings: Settings, tools: list[Tool]) -> SimpleAgent:
+    backend = get_backend(settings)
+    history_manager = None
+    if settings.history_token_budget is not None:
+        history_manager = HistoryManager(
+            token_budget=settings.history_token_budget,
+            keep_turns=settings.history_keep_turns,
+            tool_output_chars=settings.history_tool_output_chars,
+            summarizer=BackendSummarizer(backend) if settings.history_summarize else None,
+        )
+    return SimpleAgent(
+        backend=backend,
+        tools=tools,
+        system_prompt=settings.system_prompt,
+        max_parallel_tools=settings.max_parallel_tools,
+        tool_timeout=settings.tool_timeout,
+        history_manager=history_manager,
+        native_tools=settings.native_tools,
+        tracer=build_tracer(settings),
+    )
+
+
+def build_tracer(settings: Settings) -> Tracer | None:
+    exporters: list[SpanExporter] = []
+    if settings.trace_file:
+        exporters.append(JsonLinesExporter(settings.trace_file))
+    if settings.trace_metrics:
+        exporters.append(PrometheusExporter())
+    return Tracer(exporters) if exporters else None
+
+
+def run_batch_mode(args: argparse.Namespace, settings: Settings, tools: list[Tool]) -> None:
+    from simple_agent.batch import run_batch
+
+    agent = build_agent(settings, tools)
+    try:
+        summary = run_batch(
+            agent,
+            args.batch,
+            args.output,
+            concurrency=args.concurrency,
+            max_turns=args.max_turns,
+        )
+    finally:
+        agent.close()
+    print(
+        f"Processed {summary.processed} prompts ({summary.failed} failed, {summary.skipped} already done).",
+        file=sys.stderr,
+    )
+
+
+def run_server_mode(args: argparse.Namespace, settings: Settings, tools: list[Tool]) -> None:
+    from simple_agent.server import AgentServer
+
+    agent = build_agent(settings, tools)
+    server = AgentServer(
+        agent,
+        host=args.host or settings.server_host,
+        port=args.port if args.port is not None else settings.server_port,
+        max_concurrency=settings.server_max_concurrency,
+        max_body_bytes=settings.server_max_body_bytes,
+        max_turns=args.max_turns,
+    )
+    print(f"Serving on {server.url} (POST /run, GET /metrics, GET /healthz).", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        agent.close()
+
+
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
@@ -55,6 +146,10 @@ def main() -> None:
     settings = get_settings()
     if args.backend:
         settings = replace(settings, backend=args.backend)  # type: ignore[arg-type]
+    if args.no_cache:
+        settings = replace(settings, response_cache=False)
+    if args.trace:
+        settings = replace(settings, trace_file=args.trace)
 
     tools = [] if args.no_tools else load_default_tools(settings)
 
@@ -66,22 +161,51 @@ def main() -> None:
                 print(f"{tool.name}: {tool.description}")
         return
 
+    if args.conversation and (args.batch or args.serve):
+        parser.error("--conversation applies to a single prompt, not --batch or --serve.")
+
+    if args.batch:
+        if not args.output:
+            parser.error("--batch requires --output.")
+        run_batch_mode(args, settings, tools)
+        return
+
+    if args.serve:
+        run_server_mode(args, settings, tools)
+        return
+
+    store = None
+    if args.conversation:
+        from simple_agent.conversations import ConversationStore
+
+        store = ConversationStore(settings.conversation_store)
+
     prompt = args.prompt
-    if not prompt:
+    resume = not prompt and store is not None and store.pending(args.conversation)
+    if not prompt and not resume:
         try:
             prompt = input("Prompt: ").strip()
         except EOFError:
             prompt = ""
 
-    if not prompt:
+    if not prompt and not resume:
         parser.error("A prompt is required.")
 
-    backend = get_backend(settings)
-    agent = SimpleAgent(backend=backend, tools=tools, system_prompt=settings.system_prompt)
+    agent = build_agent(settings, tools)
+    agent.conversation_store = store
     try:
-        result = agent.run(prompt, max_turns=args.max_turns)
-    except RuntimeError as exc:
+        if args.stream:
+            for chunk in agent.stream(prompt or "", max_turns=args.max_turns, conversation=args.conversation):
+                print(chunk, end="", flush=True)
+            print()
+            return
+        result = agent.run(prompt or "", max_turns=args.max_turns, conversation=args.conversation)
+    except (RuntimeError, ValueError) as exc:
         parser.exit(1, f"Error: {exc}\n")
+    finally:
+        agent.close()
+        if store is not None:
+            store.close()
     print(result)
 
 
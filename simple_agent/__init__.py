@@ -1,11 +1,42 @@
-"""Top level exports for the simple agent package."""
+"""Top level exports for the simple agent package.
 
-from .agent import SimpleAgent
-from .backends.factory import get_backend
-from .tools import load_default_tools
+Exports are resolved on first access, so `import simple_agent` stays cheap
+and only the pieces a caller touches (and their HTTP clients) get imported.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .agent import SimpleAgent
+    from .backends.factory import get_async_backend, get_backend
+    from .tools import load_default_tools
+
+_EXPORTS = {
+    "SimpleAgent": ".agent",
+    "get_async_backend": ".backends.factory",
+    "get_backend": ".backends.factory",
+    "load_default_tools": ".tools",
+}
 
 __all__ = [
     "SimpleAgent",
+    "get_async_backend",
     "get_backend",
     "load_default_tools",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
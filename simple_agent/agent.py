@@ -2,14 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import closing
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
 
-from .backends.base import LLMBackend
+from .backends.base import AsyncLLMBackend, BackendResult, LLMBackend, ToolSpec
+from .history import HistoryManager, HistorySession
+from .streaming import StreamingResponseParser
+from .toolcalls import extract_tool_requests
 from .tools.base import Tool
+from .tools.run_context import CURRENT_RUN, RunContext
+from .tracing import Span, Tracer, maybe_span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .conversations import ConversationStore
 
 SYSTEM_PROMPT_TEMPLATE = """{user_prompt}
 
@@ -18,6 +32,8 @@ You have access to the following tools:
 
 If a tool is necessary, respond with ONLY a JSON object that looks like:
 {{"tool": "<tool name>", "input": "<plain text request for the tool>"}}
+If several independent tools are needed, respond with ONLY a JSON array of such objects;
+they run concurrently and all results come back in one message.
 Do not wrap the JSON in backticks or add commentary.
 If no tool is needed, answer the user directly in natural language.
 <IMPORTANT>
@@ -25,88 +41,471 @@ If no explicit tool try to use python tool to execute code in it!
 </IMPORTANT>
 """
 
+NATIVE_TOOLS_SYSTEM_PROMPT_TEMPLATE = """{user_prompt}
+
+Call the provided functions when a tool is necessary; independent calls may be made together.
+If no tool is needed, answer the user directly in natural language.
+<IMPORTANT>
+If no explicit tool try to use python tool to execute code in it!
+</IMPORTANT>
+"""
+
+
+@lru_cache(maxsize=128)
+def _prepare_prompts(system_prompt: str, catalog: tuple[tuple[str, str], ...]) -> tuple[str, str, tuple[ToolSpec, ...]]:
+    """System prompts and tool specs for one tool set, shared by every agent built with it.
+
+    Servers that build an agent per request reuse the same few tool sets, so
+    the formatted prompt is looked up rather than rebuilt.
+    """
+
+    descriptions = "\n".join(f"- {name}: {description}" for name, description in catalog) or "- (no tools available)"
+    prepared = SYSTEM_PROMPT_TEMPLATE.format(user_prompt=system_prompt, tool_descriptions=descriptions)
+    # With native function calling the tool descriptions travel as schemas instead.
+    native = NATIVE_TOOLS_SYSTEM_PROMPT_TEMPLATE.format(user_prompt=system_prompt)
+    return prepared, native, tuple(ToolSpec(name, description) for name, description in catalog)
+
 
 @dataclass(slots=True)
 class SimpleAgent:
-    """Minimal tool-using agent with pluggable backends."""
+    """Minimal tool-using agent with pluggable backends.
+
+    `tool_timeout` and `tool_timeouts` bound how long a turn waits for a
+    tool, not the tool itself: Python threads cannot be interrupted, so a
+    timed-out call keeps its pool thread (one of `max_parallel_tools`)
+    until it returns. Each such call is logged as a warning.
+    """
 
-    backend: LLMBackend
+    backend: LLMBackend | AsyncLLMBackend
     tools: Iterable[Tool]
     system_prompt: str
+    max_parallel_tools: int = 4
+    tool_timeout: float | None = None
+    tool_timeouts: Dict[str, float] = field(default_factory=dict)
+    history_manager: HistoryManager | None = None
+    native_tools: bool = False
+    tracer: Tracer | None = None
+    conversation_store: ConversationStore | None = None
     tool_map: Dict[str, Tool] = field(init=False)
     _prepared_system_prompt: str = field(init=False)
+    _native_system_prompt: str = field(init=False)
+    _tool_specs: tuple[ToolSpec, ...] = field(init=False)
     _logger: logging.Logger = field(init=False, repr=False)
+    _executor: ThreadPoolExecutor | None = field(init=False, default=None, repr=False)
+    _executor_lock: threading.Lock = field(init=False, default_factory=threading.Lock, repr=False)
 
     def __post_init__(self) -> None:
         self.tool_map: Dict[str, Tool] = {tool.name: tool for tool in self.tools}
-        descriptions = "\n".join(f"- {tool.name}: {tool.description}" for tool in self.tools) or "- (no tools available)"
-        self._prepared_system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
-            user_prompt=self.system_prompt,
-            tool_descriptions=descriptions,
+        catalog = tuple((tool.name, tool.description) for tool in self.tool_map.values())
+        self._prepared_system_prompt, self._native_system_prompt, self._tool_specs = _prepare_prompts(
+            self.system_prompt, catalog
         )
         self._logger = logging.getLogger(self.__class__.__name__)
 
-    def run(self, user_input: str, max_turns: int = 5) -> str:
-        history: List[dict[str, str]] = [
-            {"role": "system", "content": self._prepared_system_prompt},
-            {"role": "user", "content": user_input.strip()},
+    def run(self, user_input: str, max_turns: int = 5, *, conversation: str | None = None) -> str:
+        """Answer `user_input`, calling tools for up to `max_turns` turns.
+
+        With `conversation`, the run continues that conversation in
+        `conversation_store`, and every completed tool turn and the answer are
+        appended to it. An empty `user_input` resumes a run that stopped
+        before the model answered. Its finished tool calls are not run again.
+        """
+
+        if isinstance(self.backend, AsyncLLMBackend):
+            raise TypeError("Async backends require SimpleAgent.arun().")
+
+        native = self._uses_native_tools()
+        history, saved = self._start_history(user_input, conversation, native=native)
+        window = self._history_session()
+
+        with closing(RunContext()) as context, maybe_span(
+            self.tracer, "run", backend=type(self.backend).__name__
+        ) as run_span:
+            for turn in range(1, max_turns + 1):
+                with maybe_span(self.tracer, "turn", run_span, turn=turn) as turn_span:
+                    payload = self._prepare_payload(history, window, turn_span)
+                    with maybe_span(self.tracer, "backend", turn_span, native=native):
+                        if native:
+                            result = self.backend.generate_with_tools(payload, self._tool_specs)
+                            response = result.text
+                        else:
+                            response = self.backend.generate(payload)
+                    with maybe_span(self.tracer, "parse", turn_span):
+                        tool_requests = (
+                            self._result_tool_requests(result) if native else self._next_tool_requests(response)
+                        )
+                    if tool_requests is None:
+                        return self._finish(history, saved, conversation, response)
+
+                    results = self._run_tools(tool_requests, turn_span, context)
+                    self._record_tool_results(history, tool_requests, results)
+                    saved = self._save(history, saved, conversation)
+
+            raise RuntimeError("Agent hit the maximum tool loop depth without producing an answer.")
+
+    async def arun(self, user_input: str, max_turns: int = 5, *, conversation: str | None = None) -> str:
+        """Asyncio variant of `run`.
+
+        Async backends are awaited directly; sync backends and all tools run in
+        the default executor so the event loop is never blocked.
+        """
+
+        native = self._uses_native_tools()
+        history, saved = self._start_history(user_input, conversation, native=native)
+        window = self._history_session()
+
+        with closing(RunContext()) as context, maybe_span(
+            self.tracer, "run", backend=type(self.backend).__name__
+        ) as run_span:
+            for turn in range(1, max_turns + 1):
+                with maybe_span(self.tracer, "turn", run_span, turn=turn) as turn_span:
+                    if window is not None and window.manager.summarizer is not None:
+                        # A summarizer makes a blocking backend call of its own.
+                        payload = await asyncio.to_thread(self._prepare_payload, history, window, turn_span)
+                    else:
+                        payload = self._prepare_payload(history, window, turn_span)
+                    with maybe_span(self.tracer, "backend", turn_span, native=native):
+                        if native:
+                            if isinstance(self.backend, AsyncLLMBackend):
+                                result = await self.backend.agenerate_with_tools(payload, self._tool_specs)
+                            else:
+                                result = await asyncio.to_thread(
+                                    self.backend.generate_with_tools, list(payload), self._tool_specs
+                                )
+                            response = result.text
+                        elif isinstance(self.backend, AsyncLLMBackend):
+                            response = await self.backend.agenerate(payload)
+                        else:
+                            response = await asyncio.to_thread(self.backend.generate, list(payload))
+                    with maybe_span(self.tracer, "parse", turn_span):
+                        tool_requests = (
+                            self._result_tool_requests(result) if native else self._next_tool_requests(response)
+                        )
+                    if tool_requests is None:
+                        return self._finish(history, saved, conversation, response)
+
+                    results = await self._arun_tools(tool_requests, turn_span, context)
+                    self._record_tool_results(history, tool_requests, results)
+                    saved = self._save(history, saved, conversation)
+
+            raise RuntimeError("Agent hit the maximum tool loop depth without producing an answer.")
+
+    def stream(self, user_input: str, max_turns: int = 5, *, conversation: str | None = None) -> Iterator[str]:
+        """Like `run`, but yield the final answer in chunks as the backend streams it.
+
+        Tool calls are detected incrementally and dispatched as soon as the
+        JSON value closes; the rest of that reply is discarded. A reply that
+        starts as prose streams up to its first `{`, and the rest is held
+        until it ends. If it then holds a tool call, the tools run like in
+        `run`, but the prose before the call has already been yielded.
+        """
+
+        if isinstance(self.backend, AsyncLLMBackend):
+            raise TypeError("Async backends require SimpleAgent.arun().")
+
+        history, saved = self._start_history(user_input, conversation)
+        window = self._history_session()
+
+        with closing(RunContext()) as context, maybe_span(
+            self.tracer, "run", backend=type(self.backend).__name__, stream=True
+        ) as run_span:
+            for turn in range(1, max_turns + 1):
+                with maybe_span(self.tracer, "turn", run_span, turn=turn) as turn_span:
+                    parser = StreamingResponseParser()
+                    chunks = self.backend.stream(self._prepare_payload(history, window, turn_span))
+                    with maybe_span(self.tracer, "backend", turn_span, stream=True):
+                        try:
+                            for chunk in chunks:
+                                yield from parser.feed(chunk)
+                                if parser.tool_requests is not None:
+                                    break
+                        finally:
+                            close = getattr(chunks, "close", None)
+                            if close is not None:
+                                close()
+                    yield from parser.finish()
+
+                    self._logger.debug("Model response: %s", _truncate(parser.text))
+                    tool_requests = parser.tool_requests
+                    if tool_requests is None:
+                        self._logger.info("Responding without tool use.")
+                        self._finish(history, saved, conversation, parser.text)
+                        return
+
+                    results = self._run_tools(tool_requests, turn_span, context)
+                    self._record_tool_results(history, tool_requests, results)
+                    saved = self._save(history, saved, conversation)
+
+            raise RuntimeError("Agent hit the maximum tool loop depth without producing an answer.")
+
+    def close(self) -> None:
+        """Shut down the tool thread pool, release the backend and tools, and flush trace exporters.
+
+        Every tool with a `close` method is closed, so tools shared with
+        another agent must outlive neither. Async backends are closed by
+        `aclose` instead, since that needs the event loop.
+        """
+
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if isinstance(self.backend, LLMBackend):
+            self.backend.close()
+        for tool in self.tool_map.values():
+            close = getattr(tool, "close", None)
+            if close is not None:
+                close()
+        if self.tracer is not None:
+            self.tracer.close()
+
+    async def aclose(self) -> None:
+        """`close`, plus closing an async backend's session on the running loop."""
+
+        if isinstance(self.backend, AsyncLLMBackend):
+            await self.backend.aclose()
+        self.close()
+
+    def _initial_history(self, user_input: str, *, native: bool = False) -> List[dict[str, str]]:
+        return [self._system_message(native), {"role": "user", "content": user_input.strip()}]
+
+    def _system_message(self, native: bool) -> dict[str, str]:
+        return {"role": "system", "content": self._native_system_prompt if native else self._prepared_system_prompt}
+
+    def _start_history(
+        self,
+        user_input: str,
+        conversation: str | None,
+        *,
+        native: bool = False,
+    ) -> tuple[List[dict[str, str]], int]:
+        """The history to run from, and how many of its messages are already stored."""
+
+        if conversation is None:
+            return self._initial_history(user_input, native=native), 0
+        if self.conversation_store is None:
+            raise ValueError("Continuing a conversation requires a conversation_store.")
+
+        history = [self._system_message(native), *self.conversation_store.load(conversation)]
+        saved = len(history)
+        if user_input.strip():
+            history.append({"role": "user", "content": user_input.strip()})
+        elif history[-1]["role"] != "user":
+            raise ValueError(f"Conversation '{conversation}' has no unfinished run to resume; a prompt is required.")
+        else:
+            self._logger.info("Resuming conversation '%s' after %d stored messages.", conversation, saved - 1)
+        return history, self._save(history, saved, conversation)
+
+    def _save(self, history: List[dict[str, str]], saved: int, conversation: str | None) -> int:
+        """Append the messages added since the last save; returns the new stored length."""
+
+        if conversation is not None and self.conversation_store is not None and len(history) > saved:
+            self.conversation_store.append(conversation, history[saved:])
+        return len(history)
+
+    def _finish(self, history: List[dict[str, str]], saved: int, conversation: str | None, response: str) -> str:
+        answer = response.strip()
+        if conversation is not None:
+            history.append({"role": "assistant", "content": answer})
+            self._save(history, saved, conversation)
+        return answer
+
+    def _prepare_payload(
+        self,
+        history: List[dict[str, str]],
+        window: HistorySession | None,
+        turn_span: Span | None,
+    ) -> List[dict[str, str]]:
+        if window is None:
+            payload = history
+        else:
+            with maybe_span(self.tracer, "history", turn_span):
+                payload = window.prepare(history)
+        if turn_span is not None:
+            turn_span.attributes["history_messages"] = len(history)
+            turn_span.attributes["payload_chars"] = sum(len(message.get("content") or "") for message in payload)
+        return payload
+
+    def _history_session(self) -> HistorySession | None:
+        return self.history_manager.session() if self.history_manager is not None else None
+
+    def _uses_native_tools(self) -> bool:
+        return self.native_tools and bool(self.tool_map) and self.backend.supports_native_tools
+
+    def _result_tool_requests(self, result: BackendResult) -> List[dict] | None:
+        if not result.tool_calls:
+            # Models may still answer with text JSON; keep parsing it as a fallback.
+            return self._next_tool_requests(result.text)
+        self._logger.debug("Model requested %d native tool call(s).", len(result.tool_calls))
+        return [{"tool": call.name, "input": call.input} for call in result.tool_calls]
+
+    def _next_tool_requests(self, response: str) -> List[dict] | None:
+        self._logger.debug("Model response: %s", _truncate(response))
+        tool_requests = self._maybe_extract_tool_requests(response)
+        if not tool_requests:
+            self._logger.info("Responding without tool use.")
+            return None
+        return tool_requests
+
+    def _resolve_tool(self, tool_request: dict) -> Tool | None:
+        tool_name = tool_request.get("tool")
+        tool = self.tool_map.get(tool_name or "")
+        if not tool:
+            self._logger.warning("Model requested unknown tool '%s'.", tool_name)
+            return None
+
+        self._logger.info("Running tool '%s'.", tool_name)
+        tool_input = tool_request.get("input", "")
+        if tool_input:
+            self._logger.debug("Tool '%s' input: %s", tool_name, _truncate(tool_input))
+        return tool
+
+    def _tool_timeout(self, tool: Tool) -> float | None:
+        return self.tool_timeouts.get(tool.name, self.tool_timeout)
+
+    def _invoke_tool(self, tool: Tool, tool_input: str, parent: Span | None, context: RunContext | None = None) -> str:
+        # Tools only receive the query, so per-run state travels through a context variable.
+        token = CURRENT_RUN.set(context)
+        try:
+            if self.tracer is None:
+                return tool.run(tool_input)
+            with self.tracer.span("tool", parent, tool=tool.name):
+                return tool.run(tool_input)
+        finally:
+            CURRENT_RUN.reset(token)
+
+    def _run_tools(
+        self,
+        tool_requests: List[dict],
+        parent: Span | None = None,
+        context: RunContext | None = None,
+    ) -> List[str | None]:
+        """Run the requested tools, concurrently when there is more than one.
+
+        Returns one output per request; `None` marks an unknown tool.
+        """
+
+        calls = [(request, self._resolve_tool(request)) for request in tool_requests]
+        if len(calls) == 1:
+            request, tool = calls[0]
+            if tool is None:
+                return [None]
+            if self._tool_timeout(tool) is None:
+                return [self._invoke_tool(tool, request.get("input", ""), parent, context)]
+
+        executor = self._tool_executor()
+        started = time.monotonic()
+        futures = [
+            executor.submit(self._invoke_tool, tool, request.get("input", ""), parent, context) if tool else None
+            for request, tool in calls
         ]
 
-        for _ in range(max_turns):
-            response = self.backend.generate(history)
-            self._logger.debug("Model response: %s", _truncate(response))
-            tool_request = self._maybe_extract_tool_request(response)
-            if not tool_request:
-                self._logger.info("Responding without tool use.")
-                return response.strip()
-
-            tool_name = tool_request.get("tool")
-            tool_input = tool_request.get("input", "")
-
-            tool = self.tool_map.get(tool_name or "")
-            if not tool:
-                self._logger.warning("Model requested unknown tool '%s'.", tool_name)
-                history.append(
-                    {
-                        "role": "user",
-                        "content": f"[Tool error] '{tool_name}' is not a known tool. Try responding to the user instead.",
-                    }
-                )
+        results: List[str | None] = []
+        for (request, tool), future in zip(calls, futures):
+            if tool is None or future is None:
+                results.append(None)
                 continue
+            timeout = self._tool_timeout(tool)
+            remaining = None if timeout is None else max(timeout - (time.monotonic() - started), 0)
+            try:
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                if not future.cancel():
+                    self._log_abandoned(tool.name, timeout)
+                results.append(_timeout_message(tool.name, timeout))
+        return results
+
+    def _tool_executor(self) -> ThreadPoolExecutor:
+        # Agents are shared between threads (e.g. by the server), so two turns may get here at once.
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_parallel_tools,
+                    thread_name_prefix="simple-agent-tool",
+                )
+            return self._executor
+
+    def _log_abandoned(self, tool_name: str, timeout: float | None) -> None:
+        self._logger.warning(
+            "Tool '%s' timed out after %gs and is still running; its thread stays busy until it returns.",
+            tool_name,
+            timeout,
+        )
+
+    async def _arun_tools(
+        self,
+        tool_requests: List[dict],
+        parent: Span | None = None,
+        context: RunContext | None = None,
+    ) -> List[str | None]:
+        limit = asyncio.Semaphore(self.max_parallel_tools)
 
-            self._logger.info("Running tool '%s'.", tool_name)
-            if tool_input:
-                self._logger.debug("Tool '%s' input: %s", tool_name, _truncate(tool_input))
-            tool_output = tool.run(tool_input)
-            self._logger.debug("Tool '%s' output: %s", tool_name, _truncate(tool_output))
+        async def invoke(request: dict) -> str | None:
+            tool = self._resolve_tool(request)
+            if tool is None:
+                return None
+            timeout = self._tool_timeout(tool)
+            async with limit:
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(self._invoke_tool, tool, request.get("input", ""), parent, context),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self._log_abandoned(tool.name, timeout)
+                    return _timeout_message(tool.name, timeout)
 
-            history.append({"role": "assistant", "content": json.dumps(tool_request)})
+        return list(await asyncio.gather(*(invoke(request) for request in tool_requests)))
+
+    def _record_tool_results(
+        self,
+        history: List[dict[str, str]],
+        tool_requests: List[dict],
+        results: List[str | None],
+    ) -> None:
+        if all(result is None for result in results):
+            names = ", ".join(f"'{request.get('tool')}'" for request in tool_requests)
+            verb = "is not a known tool" if len(tool_requests) == 1 else "are not known tools"
             history.append(
-                {"role": "user", "content": f"[Tool:{tool_name}] {tool_output}"},
+                {
+                    "role": "user",
+                    "content": f"[Tool error] {names} {verb}. Try responding to the user instead.",
+                }
             )
+            return
+
+        entries = []
+        for request, result in zip(tool_requests, results):
+            tool_name = request.get("tool")
+            if result is None:
+                entries.append(f"[Tool error] '{tool_name}' is not a known tool.")
+                continue
+            self._logger.debug("Tool '%s' output: %s", tool_name, _truncate(result))
+            entries.append(f"[Tool:{tool_name}] {result}")
 
-        raise RuntimeError("Agent hit the maximum tool loop depth without producing an answer.")
+        echoed = tool_requests[0] if len(tool_requests) == 1 else tool_requests
+        history.append({"role": "assistant", "content": json.dumps(echoed)})
+        history.append({"role": "user", "content": "\n\n".join(entries)})
 
     @staticmethod
-    def _maybe_extract_tool_request(text: str) -> dict | None:
-        """Attempt to parse a JSON tool request out of a model response."""
+    def _maybe_extract_tool_requests(text: str) -> List[dict] | None:
+        """Parse one JSON tool request, or a JSON array of them, out of a model response."""
 
-        text = text.strip()
-        candidates = [text]
+        return extract_tool_requests(text)
 
-        fenced = re.findall(r"```(?:json)?\s*(.*?)```", text, flags=re.DOTALL)
-        candidates.extend(content.strip() for content in fenced if content.strip())
+    @staticmethod
+    def _maybe_extract_tool_request(text: str) -> dict | None:
+        """Attempt to parse a JSON tool request out of a model response.
 
-        for candidate in candidates:
-            try:
-                data = json.loads(candidate)
-            except json.JSONDecodeError:
-                continue
+        When the response holds an array of requests, the first one is returned.
+        """
+
+        requests = SimpleAgent._maybe_extract_tool_requests(text)
+        return requests[0] if requests else None
 
-            if isinstance(data, dict) and "tool" in data:
-                return data
 
-        return None
+def _timeout_message(tool_name: str, timeout: float | None) -> str:
+    return f"[Tool error] '{tool_name}' timed out after {timeout:g}s."
 
 
 def _truncate(value: str, limit: int = 500) -> str:
@@ -2,12 +2,84 @@
 
 from __future__ import annotations
 
+import json
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Sequence
 
 
 Message = dict[str, str]
 
+RETRYABLE_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class BackendError(RuntimeError):
+    """A provider request that failed.
+
+    `status_code` is None when no HTTP response arrived (connection errors and
+    timeouts). `retry_after` is the delay in seconds the provider asked for,
+    if it sent a `Retry-After` header.
+    """
+
+    def __init__(self, message: str, *, status_code: int | None = None, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Whether the same request may succeed later (rate limits, overload, network trouble)."""
+
+        return self.status_code is None or self.status_code in RETRYABLE_STATUSES
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    """Tool declaration sent to backends with native function calling.
+
+    Every tool takes one plain-text `input`, matching `Tool.run(query)`.
+    """
+
+    name: str
+    description: str
+
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {"input": {"type": "string", "description": "Plain text request for the tool."}},
+            "required": ["input"],
+        }
+
+
+@dataclass(slots=True)
+class ToolCall:
+    """A structured tool request returned by the backend."""
+
+    name: str
+    input: str = ""
+
+    @classmethod
+    def from_arguments(cls, name: str, arguments: Any) -> "ToolCall":
+        """Build a call from provider arguments (a JSON string or an object)."""
+
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except json.JSONDecodeError:
+                return cls(name, arguments)
+        if isinstance(arguments, dict):
+            value = arguments.get("input", "")
+            return cls(name, value if isinstance(value, str) else json.dumps(value))
+        return cls(name, "" if arguments is None else str(arguments))
+
+
+@dataclass(slots=True)
+class BackendResult:
+    """Assistant text plus any structured tool calls from one completion."""
+
+    text: str
+    tool_calls: List[ToolCall] = field(default_factory=list)
+
 
 class LLMBackend(ABC):
     """Abstract language model backend."""
@@ -17,3 +89,51 @@ class LLMBackend(ABC):
         """Return the assistant content for the given chat history."""
 
         raise NotImplementedError
+
+    supports_native_tools = False
+    """Whether `generate_with_tools` declares tools to the provider."""
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        """Return the completion with structured tool calls, when supported.
+
+        Backends without native function calling return plain text and leave
+        tool-call detection to the agent's JSON parsing.
+        """
+
+        return BackendResult(self.generate(messages))
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        """Yield the assistant content in chunks as it is produced.
+
+        Backends without native streaming yield the full completion at once.
+        """
+
+        yield self.generate(messages)
+
+    def cache_identity(self) -> dict[str, Any]:
+        """Describe everything besides the messages that shapes a completion."""
+
+        return {"backend": type(self).__name__, "model": getattr(self, "model", None)}
+
+    def close(self) -> None:
+        """Release any pooled resources held by the backend."""
+
+
+class AsyncLLMBackend(ABC):
+    """Abstract language model backend for use on an asyncio event loop."""
+
+    @abstractmethod
+    async def agenerate(self, messages: List[Message]) -> str:
+        """Return the assistant content for the given chat history."""
+
+        raise NotImplementedError
+
+    supports_native_tools = False
+
+    async def agenerate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        """Async counterpart of `LLMBackend.generate_with_tools`."""
+
+        return BackendResult(await self.agenerate(messages))
+
+    async def aclose(self) -> None:
+        """Release any pooled resources held by the backend."""
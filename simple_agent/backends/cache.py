@@ -0,0 +1,248 @@
+"""Response caching wrapper for backends."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, List, Sequence
+
+from .base import BackendResult, LLMBackend, Message, ToolCall, ToolSpec
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Counters shared by the cache tiers."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+
+class MemoryCache:
+    """Thread-safe LRU with a per-entry time-to-live."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float | None = 3600) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float | None, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk tier that several processes can share through one SQLite file.
+
+    `max_entries` is enforced every `PRUNE_EVERY` writes rather than on each
+    insert, so the table may briefly overshoot.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str | Path, *, ttl: float | None = 3600, max_entries: int | None = None) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            self._writes += 1
+            if self.max_entries is not None and self._writes % self.PRUNE_EVERY == 0:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self.evictions += max(cursor.rowcount, 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingBackend(LLMBackend):
+    """Serves repeated prompts from an LRU and an optional shared SQLite file.
+
+    Keys are a SHA-256 over the wrapped backend's `cache_identity()` (model and
+    sampling parameters) and the whitespace-normalised messages.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        *,
+        memory: MemoryCache | None = None,
+        disk: SQLiteCache | None = None,
+    ) -> None:
+        self.backend = backend
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        evictions = self.memory.evictions + (self.disk.evictions if self.disk else 0)
+        return CacheStats(
+            memory_hits=self._stats.memory_hits,
+            disk_hits=self._stats.disk_hits,
+            misses=self._stats.misses,
+            evictions=evictions,
+        )
+
+    @property
+    def supports_native_tools(self) -> bool:  # type: ignore[override]
+        return self.backend.supports_native_tools
+
+    def cache_identity(self) -> dict[str, Any]:
+        return self.backend.cache_identity()
+
+    def generate(self, messages: List[Message]) -> str:
+        key = self.key_for(messages)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = self.backend.generate(messages)
+        self._store(key, response)
+        return response
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        key = self.key_for(messages, tools)
+        cached = self._lookup(key)
+        if cached is not None:
+            data = json.loads(cached)
+            return BackendResult(data["text"], [ToolCall(**call) for call in data["tool_calls"]])
+
+        result = self.backend.generate_with_tools(messages, tools)
+        calls = [{"name": call.name, "input": call.input} for call in result.tool_calls]
+        self._store(key, json.dumps({"text": result.text, "tool_calls": calls}))
+        return result
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        key = self.key_for(messages)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks: list[str] = []
+        inner = self.backend.stream(messages)
+        try:
+            for chunk in inner:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            close = getattr(inner, "close", None)
+            if close is not None:
+                close()
+        # Only fully consumed streams are cached; callers that stop early
+        # (e.g. on a tool call) never reach this point.
+        self._store(key, "".join(chunks).strip())
+
+    def close(self) -> None:
+        self.backend.close()
+        if self.disk is not None:
+            self.disk.close()
+
+    def key_for(self, messages: List[Message], tools: Sequence[ToolSpec] = ()) -> str:
+        normalized = [
+            {"role": message.get("role", "user"), "content": (message.get("content") or "").strip()}
+            for message in messages
+        ]
+        material: dict[str, Any] = {"backend": self.backend.cache_identity(), "messages": normalized}
+        if tools:
+            # Tool-calling results are stored as JSON, so they never share a key with plain text.
+            material["tools"] = [[tool.name, tool.description] for tool in tools]
+        blob = json.dumps(material, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._count("disk_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def _store(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self._stats, counter, getattr(self._stats, counter) + 1)
@@ -2,17 +2,34 @@
 
 from __future__ import annotations
 
+import json
 import os
-from typing import List
+from typing import TYPE_CHECKING, Any, Iterator, List, Sequence
 
 import requests
 
-from .base import LLMBackend, Message
+from .base import AsyncLLMBackend, BackendError, BackendResult, LLMBackend, Message, ToolCall, ToolSpec
+from .session import (
+    AsyncResponse,
+    build_async_session,
+    build_session,
+    iter_sse_data,
+    parse_retry_after,
+    post_json,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    import aiohttp
+
+
+TEMPERATURE = 0.2
 
 
 class ChatGPTBackend(LLMBackend):
     """Thin wrapper over the OpenAI Chat Completions API."""
 
+    supports_native_tools = True
+
     def __init__(
         self,
         api_key: str,
@@ -20,6 +37,11 @@ class ChatGPTBackend(LLMBackend):
         *,
         timeout: float = 30,
         base_url: str | None = None,
+        connect_timeout: float | None = None,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        max_retries: int = 2,
+        session: requests.Session | None = None,
     ) -> None:
         if not api_key:
             raise ValueError("OPENAI_API_KEY is required for the ChatGPT backend.")
@@ -27,41 +49,199 @@ class ChatGPTBackend(LLMBackend):
         self.api_key = api_key
         self.model = model
         self.timeout = timeout
+        self.connect_timeout = connect_timeout if connect_timeout is not None else timeout
         self.base_url = base_url or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.session = session or build_session(
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            max_retries=max_retries,
+        )
 
     def generate(self, messages: List[Message]) -> str:
-        payload = {
-            "model": self.model,
-            "messages": messages,
-            "temperature": 0.2,
-        }
+        response = self._post(_build_payload(self.model, messages))
+        return _parse_response(response.json())
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        response = self._post(_build_payload(self.model, messages, tools))
+        return _parse_result(response.json())
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        payload = {**_build_payload(self.model, messages), "stream": True}
+        with self._post(payload, stream=True) as response:
+            try:
+                for data in iter_sse_data(response.iter_lines()):
+                    chunk = _parse_stream_chunk(json.loads(data))
+                    if chunk:
+                        yield chunk
+            except requests.RequestException as exc:
+                # Dropped connections and read timeouts mid-stream are transient, so leave them retryable.
+                raise BackendError(f"OpenAI stream failed: {exc}") from exc
+            except ValueError as exc:
+                raise BackendError(
+                    f"OpenAI sent a malformed stream event: {exc}", status_code=response.status_code
+                ) from exc
+
+    def cache_identity(self) -> dict[str, Any]:
+        return {**super().cache_identity(), "temperature": TEMPERATURE}
 
+    def _post(self, payload: dict[str, Any], *, stream: bool = False) -> requests.Response:
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
+                headers=_headers(self.api_key),
                 json=payload,
-                timeout=self.timeout,
+                timeout=(self.connect_timeout, self.timeout),
+                stream=stream,
             )
         except requests.RequestException as exc:
-            raise RuntimeError(f"OpenAI request failed: {exc}") from exc
+            raise BackendError(f"OpenAI request failed: {exc}") from exc
         try:
             response.raise_for_status()
         except requests.HTTPError as exc:
             detail = _extract_error_detail(response)
-            raise RuntimeError(f"OpenAI request failed: {detail}") from exc
+            raise BackendError(
+                f"OpenAI request failed: {detail}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            ) from exc
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncChatGPTBackend(AsyncLLMBackend):
+    """Asyncio flavour of `ChatGPTBackend` built on a pooled `aiohttp.ClientSession`."""
+
+    supports_native_tools = True
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        timeout: float = 30,
+        base_url: str | None = None,
+        connect_timeout: float | None = None,
+        pool_size: int = 100,
+        keep_alive: bool = True,
+        max_retries: int = 2,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY is required for the ChatGPT backend.")
+
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self._session = session
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions bind to the running loop, so build lazily on first use.
+        if self._session is None:
+            self._session = build_async_session(
+                timeout=self.timeout,
+                connect_timeout=self.connect_timeout,
+                pool_size=self.pool_size,
+                keep_alive=self.keep_alive,
+            )
+        return self._session
+
+    async def agenerate(self, messages: List[Message]) -> str:
+        response = await self._post(_build_payload(self.model, messages))
+        return _parse_response(response.json())
+
+    async def agenerate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        response = await self._post(_build_payload(self.model, messages, tools))
+        return _parse_result(response.json())
+
+    async def _post(self, payload: dict[str, Any]) -> AsyncResponse:
+        import aiohttp
 
-        data = response.json()
         try:
-            return data["choices"][0]["message"]["content"].strip()
-        except (KeyError, IndexError, TypeError) as exc:
-            raise RuntimeError(f"Unexpected response from OpenAI: {data}") from exc
+            response = await post_json(
+                self.session,
+                f"{self.base_url}/chat/completions",
+                payload,
+                headers=_headers(self.api_key),
+                max_retries=self.max_retries,
+            )
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            raise BackendError(f"OpenAI request failed: {exc}") from exc
+        if response.is_error:
+            detail = _extract_error_detail(response)
+            raise BackendError(
+                f"OpenAI request failed: {detail}",
+                status_code=response.status,
+                retry_after=parse_retry_after(response.retry_after),
+            )
+        return response
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+def _headers(api_key: str) -> dict[str, str]:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+
+
+def _build_payload(model: str, messages: List[Message], tools: Sequence[ToolSpec] = ()) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": TEMPERATURE,
+    }
+    if tools:
+        payload["tools"] = [
+            {
+                "type": "function",
+                "function": {"name": tool.name, "description": tool.description, "parameters": tool.parameters()},
+            }
+            for tool in tools
+        ]
+    return payload
+
+
+def _parse_response(data: Any) -> str:
+    try:
+        return data["choices"][0]["message"]["content"].strip()
+    except (KeyError, IndexError, TypeError) as exc:
+        raise RuntimeError(f"Unexpected response from OpenAI: {data}") from exc
+
+
+def _parse_result(data: Any) -> BackendResult:
+    try:
+        message = data["choices"][0]["message"]
+        calls = [
+            ToolCall.from_arguments(call["function"]["name"], call["function"].get("arguments"))
+            for call in message.get("tool_calls") or []
+        ]
+        return BackendResult((message.get("content") or "").strip(), calls)
+    except (KeyError, IndexError, TypeError, AttributeError) as exc:
+        raise RuntimeError(f"Unexpected response from OpenAI: {data}") from exc
+
+
+def _parse_stream_chunk(data: Any) -> str:
+    try:
+        choices = data.get("choices") or []
+        if not choices:
+            return ""
+        return (choices[0].get("delta") or {}).get("content") or ""
+    except AttributeError as exc:
+        raise RuntimeError(f"Unexpected stream chunk from OpenAI: {data}") from exc
 
 
-def _extract_error_detail(response: requests.Response) -> str:
+def _extract_error_detail(response: requests.Response | AsyncResponse) -> str:
     try:
         payload = response.json()
         return payload.get("error", {}).get("message") or str(payload)
@@ -2,27 +2,150 @@
 
 from __future__ import annotations
 
-from ..config import Settings
-from .base import LLMBackend
-from .chatgpt import ChatGPTBackend
-from .gemini import GeminiBackend
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from .base import AsyncLLMBackend, LLMBackend
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..config import Settings
+    from .ratelimit import RateLimiter
+
+# Provider modules (and the HTTP clients behind them) are imported inside the
+# branches below, so a process only pays for the backend it actually uses.
 
 
 def get_backend(settings: Settings) -> LLMBackend:
-    """Instantiate the backend described by the provided settings."""
+    """Instantiate the backend described by the provided settings.
+
+    With `backend_fallbacks` set, the configured backend becomes the first of
+    several wrapped in a `FailoverBackend`, which then owns retries: member
+    sessions are built without `http_max_retries`. With client-side limits
+    set, each provider and model is queued against its own quota.
+    """
+
+    if settings.backend_fallbacks:
+        from .failover import FailoverBackend
 
+        # FailoverBackend retries timeouts, 429 and 5xx itself; session retries would multiply its attempts.
+        members = []
+        for name in (settings.backend, *settings.backend_fallbacks):
+            member_settings = replace(settings, backend=name, http_max_retries=0)
+            members.append(_limited(_build_backend(member_settings), member_settings))
+        backend: LLMBackend = FailoverBackend(
+            members,
+            hedge=settings.backend_hedge,
+            hedge_delay=settings.backend_hedge_delay,
+            max_retries=settings.backend_max_retries,
+            failure_threshold=settings.backend_breaker_failures,
+            reset_timeout=settings.backend_breaker_reset,
+        )
+    else:
+        backend = _limited(_build_backend(settings), settings)
+    if settings.response_cache:
+        from .cache import CachingBackend, MemoryCache, SQLiteCache
+
+        disk = None
+        if settings.response_cache_path:
+            disk = SQLiteCache(
+                settings.response_cache_path,
+                ttl=settings.response_cache_ttl,
+                max_entries=settings.response_cache_max_entries,
+            )
+        memory = MemoryCache(settings.response_cache_max_entries, ttl=settings.response_cache_ttl)
+        backend = CachingBackend(backend, memory=memory, disk=disk)
+    return backend
+
+
+def _build_backend(settings: Settings) -> LLMBackend:
     if settings.backend == "chatgpt":
+        from .chatgpt import ChatGPTBackend
+
         return ChatGPTBackend(
             api_key=settings.openai_api_key or "",
             model=settings.openai_model,
             timeout=settings.request_timeout,
+            **_http_options(settings),
         )
 
     if settings.backend == "gemini":
+        from .gemini import GeminiBackend
+
         return GeminiBackend(
             api_key=settings.gemini_api_key or "",
             model=settings.gemini_model,
             timeout=settings.request_timeout,
+            **_http_options(settings),
+        )
+
+    raise ValueError(f"Unsupported backend '{settings.backend}'.")
+
+
+def get_async_backend(settings: Settings) -> AsyncLLMBackend:
+    """Instantiate the asyncio backend described by the provided settings."""
+
+    backend = _build_async_backend(settings)
+    limiter = _limiter(settings)
+    if limiter is None:
+        return backend
+    from .ratelimit import AsyncRateLimitedBackend
+
+    return AsyncRateLimitedBackend(backend, limiter)
+
+
+def _build_async_backend(settings: Settings) -> AsyncLLMBackend:
+    if settings.backend == "chatgpt":
+        from .chatgpt import AsyncChatGPTBackend
+
+        return AsyncChatGPTBackend(
+            api_key=settings.openai_api_key or "",
+            model=settings.openai_model,
+            timeout=settings.request_timeout,
+            **_http_options(settings, asynchronous=True),
+        )
+
+    if settings.backend == "gemini":
+        from .gemini import AsyncGeminiBackend
+
+        return AsyncGeminiBackend(
+            api_key=settings.gemini_api_key or "",
+            model=settings.gemini_model,
+            timeout=settings.request_timeout,
+            **_http_options(settings, asynchronous=True),
         )
 
     raise ValueError(f"Unsupported backend '{settings.backend}'.")
+
+
+def _limited(backend: LLMBackend, settings: Settings) -> LLMBackend:
+    limiter = _limiter(settings)
+    if limiter is None:
+        return backend
+    from .ratelimit import RateLimitedBackend
+
+    return RateLimitedBackend(backend, limiter)
+
+
+def _limiter(settings: Settings) -> RateLimiter | None:
+    if not (settings.backend_rpm or settings.backend_tpm or settings.backend_max_concurrency):
+        return None
+    from .ratelimit import shared_limiter
+
+    model = settings.openai_model if settings.backend == "chatgpt" else settings.gemini_model
+    # Sync and async backends for the same model share one limiter and, via the state files, one quota.
+    return shared_limiter(
+        f"{settings.backend}:{model}",
+        settings.backend_rpm,
+        settings.backend_tpm,
+        settings.backend_max_concurrency,
+        settings.backend_rate_limit_dir,
+    )
+
+
+def _http_options(settings: Settings, *, asynchronous: bool = False) -> dict:
+    return {
+        "connect_timeout": settings.connect_timeout,
+        "pool_size": settings.http_async_pool_size if asynchronous else settings.http_pool_size,
+        "keep_alive": settings.http_keep_alive,
+        "max_retries": settings.http_max_retries,
+    }
@@ -0,0 +1,358 @@
+"""Composite backend with priority failover, hedged requests and circuit breakers."""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterator, List, Sequence, TypeVar
+
+from .base import BackendError, BackendResult, LLMBackend, Message, ToolSpec
+
+T = TypeVar("T")
+
+MIN_LATENCY_SAMPLES = 20  # below this the configured hedge delay is used instead of the observed quantile
+
+
+@dataclass(slots=True)
+class FailoverStats:
+    """Counters for one `FailoverBackend`."""
+
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    failovers: int = 0
+    retries: int = 0
+    short_circuits: int = 0
+
+
+class CircuitBreaker:
+    """Stops calling a backend after `failure_threshold` consecutive retryable failures.
+
+    While open, calls are refused for `reset_timeout` seconds. After that one
+    trial call is let through (half-open): a success closes the breaker, a
+    failure opens it for another `reset_timeout`, and an outcome that says
+    nothing about the backend's health releases the trial for the next call.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a trial call through."""
+
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def release_trial(self) -> None:
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls, kept sorted for quantiles."""
+
+    def __init__(self, size: int = 256) -> None:
+        self._recent: deque[float] = deque(maxlen=size)
+        self._sorted: List[float] = []
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            if len(self._recent) == self._recent.maxlen:
+                oldest = self._recent[0]
+                del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+            self._recent.append(seconds)
+            bisect.insort(self._sorted, seconds)
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            if len(self._sorted) < MIN_LATENCY_SAMPLES:
+                return None
+            return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+@dataclass(slots=True)
+class _Member:
+    backend: LLMBackend
+    breaker: CircuitBreaker
+    latencies: LatencyWindow = field(default_factory=LatencyWindow)
+
+    @property
+    def name(self) -> str:
+        return type(self.backend).__name__
+
+
+class FailoverBackend(LLMBackend):
+    """Tries `backends` in priority order and returns the first success.
+
+    With `hedge` on, a request still unanswered after the leading backend's
+    observed `hedge_quantile` latency (or `hedge_delay` until enough calls
+    have been seen) is also sent to the next backend. The first success wins
+    and the slower call is left to finish in the background. An error moves
+    the request to the next backend straight away.
+
+    Each backend has a circuit breaker that opens after `failure_threshold`
+    consecutive retryable errors (timeouts, connection errors, 408/409/429
+    and 5xx). When every backend has failed with a retryable error, the
+    whole round is retried up to `max_retries` times. Retries use jittered
+    exponential backoff, and a longer `Retry-After` from the provider is
+    honoured. A `Retry-After` longer than `max_backoff` ends the retries.
+    Other errors (bad requests, auth) are not retried but still fail over.
+
+    Streams fail over only before their first chunk and are never hedged.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[LLMBackend],
+        *,
+        hedge: bool = True,
+        hedge_quantile: float = 0.95,
+        hedge_delay: float = 2.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not backends:
+            raise ValueError("FailoverBackend needs at least one backend.")
+        self._members = [_Member(backend, CircuitBreaker(failure_threshold, reset_timeout)) for backend in backends]
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_delay = hedge_delay
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self._stats = FailoverStats()
+        self._stats_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def backends(self) -> List[LLMBackend]:
+        return [member.backend for member in self._members]
+
+    @property
+    def stats(self) -> FailoverStats:
+        with self._stats_lock:
+            return replace(self._stats)
+
+    @property
+    def supports_native_tools(self) -> bool:  # type: ignore[override]
+        return all(member.backend.supports_native_tools for member in self._members)
+
+    def breaker(self, index: int) -> CircuitBreaker:
+        return self._members[index].breaker
+
+    def cache_identity(self) -> dict[str, Any]:
+        return {"backend": type(self).__name__, "members": [m.backend.cache_identity() for m in self._members]}
+
+    def generate(self, messages: List[Message]) -> str:
+        return self._call(lambda backend: backend.generate(messages), hedge=self.hedge)
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        return self._call(lambda backend: backend.generate_with_tools(messages, tools), hedge=self.hedge)
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        def first_chunk(backend: LLMBackend) -> tuple[str | None, Iterator[str]]:
+            chunks = iter(backend.stream(messages))
+            return next(chunks, None), chunks
+
+        first, chunks = self._call(first_chunk, hedge=False)
+        if first is not None:
+            yield first
+            yield from chunks
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        for member in self._members:
+            member.backend.close()
+
+    def _call(self, operation: Callable[[LLMBackend], T], *, hedge: bool) -> T:
+        self._count("requests")
+        error: BaseException | None = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = self._retry_delay(attempt, error)
+                if delay is None:
+                    break
+                self._count("retries")
+                self._logger.info("All backends failed (%s); retrying in %.2fs.", error, delay)
+                self._sleep(delay)
+            try:
+                return self._race(operation) if hedge else self._in_order(operation)
+            except BackendError as exc:
+                error = exc
+                if not exc.retryable:
+                    raise
+        assert error is not None
+        raise error
+
+    def _in_order(self, operation: Callable[[LLMBackend], T]) -> T:
+        errors: List[BaseException] = []
+        for member in self._members:
+            if not member.breaker.allow():
+                self._count("short_circuits")
+                continue
+            if errors:
+                self._count("failovers")
+            try:
+                return self._timed(member, operation)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+        raise self._round_error(errors)
+
+    def _race(self, operation: Callable[[LLMBackend], T]) -> T:
+        pending: Dict[Future[T], _Member] = {}
+        hedged: set[Future[T]] = set()
+        queue = iter(self._members)
+        errors: List[BaseException] = []
+        executor = self._pool()
+
+        def launch() -> Future[T] | None:
+            for member in queue:
+                if member.breaker.allow():
+                    future = executor.submit(self._timed, member, operation)
+                    pending[future] = member
+                    return future
+                self._count("short_circuits")
+            return None
+
+        leader = launch()
+        while pending:
+            timeout = None
+            if leader is not None and leader in pending:
+                timeout = pending[leader].latencies.quantile(self.hedge_quantile) or self.hedge_delay
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The leader is slower than usual: race it against the next backend.
+                leader = launch()
+                if leader is not None:
+                    hedged.add(leader)
+                    self._count("hedges")
+                continue
+            for future in done:
+                pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    errors.append(exc)
+                    continue
+                if future in hedged:
+                    self._count("hedge_wins")
+                return result
+            if not pending:
+                leader = launch()
+                if leader is not None:
+                    self._count("failovers")
+        raise self._round_error(errors)
+
+    def _timed(self, member: _Member, operation: Callable[[LLMBackend], T]) -> T:
+        start = time.perf_counter()
+        try:
+            result = operation(member.backend)
+        except BackendError as exc:
+            if exc.retryable:
+                member.breaker.record_failure()
+            else:
+                # The backend answered; it refused this request, which says nothing about its health.
+                member.breaker.record_success()
+            self._logger.debug("%s failed: %s", member.name, exc)
+            raise
+        except BaseException:
+            # Unclassified errors (e.g. an unparseable reply) must not leave a half-open trial pending forever.
+            member.breaker.release_trial()
+            raise
+        member.breaker.record_success()
+        member.latencies.add(time.perf_counter() - start)
+        return result
+
+    def _round_error(self, errors: List[BaseException]) -> BaseException:
+        """The error to surface once every backend in a round has failed."""
+
+        if not errors:
+            retry_in = min(member.breaker.retry_in() for member in self._members)
+            return BackendError("All backends are unavailable (circuit breakers open).", retry_after=retry_in)
+        retryable = [exc for exc in errors if isinstance(exc, BackendError) and exc.retryable]
+        if retryable:
+            # Wait as long as the most demanding provider asked for.
+            return max(retryable, key=lambda exc: exc.retry_after or 0.0)
+        return errors[0]
+
+    def _retry_delay(self, attempt: int, error: BaseException | None) -> float | None:
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            if retry_after > self.max_backoff:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=8 * len(self._members),
+                    thread_name_prefix="failover",
+                )
+            return self._executor
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self._stats, name, getattr(self._stats, name) + 1)
@@ -2,17 +2,31 @@
 
 from __future__ import annotations
 
+import json
 import os
-from typing import List
+from typing import TYPE_CHECKING, Any, Iterator, List, Sequence
 
 import requests
 
-from .base import LLMBackend, Message
+from .base import AsyncLLMBackend, BackendError, BackendResult, LLMBackend, Message, ToolCall, ToolSpec
+from .session import (
+    AsyncResponse,
+    build_async_session,
+    build_session,
+    iter_sse_data,
+    parse_retry_after,
+    post_json,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    import aiohttp
 
 
 class GeminiBackend(LLMBackend):
     """Calls the Gemini `generateContent` endpoint through requests."""
 
+    supports_native_tools = True
+
     def __init__(
         self,
         api_key: str,
@@ -20,6 +34,11 @@ class GeminiBackend(LLMBackend):
         *,
         timeout: float = 30,
         base_url: str | None = None,
+        connect_timeout: float | None = None,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        max_retries: int = 2,
+        session: requests.Session | None = None,
     ) -> None:
         if not api_key:
             raise ValueError("GEMINI_API_KEY is required for the Gemini backend.")
@@ -27,71 +46,225 @@ class GeminiBackend(LLMBackend):
         self.api_key = api_key
         self.model = model
         self.timeout = timeout
+        self.connect_timeout = connect_timeout if connect_timeout is not None else timeout
         self.base_url = base_url or os.getenv(
             "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1"
         )
+        self.session = session or build_session(
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            max_retries=max_retries,
+        )
 
     def generate(self, messages: List[Message]) -> str:
-        system_instruction = ""
-        converted_messages = []
-
-        for message in messages:
-            role = message.get("role", "user")
-            content = message.get("content", "")
-
-            if role == "system":
-                system_instruction = content
-                continue
+        response = self._post("generateContent", _build_payload(messages))
+        return _parse_response(response.json())
 
-            converted_messages.append(
-                {
-                    "role": "user" if role == "user" else "model",
-                    "parts": [{"text": content}],
-                }
-            )
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        response = self._post("generateContent", _build_payload(messages, tools))
+        return _parse_result(response.json())
 
-        if system_instruction:
-            if converted_messages:
-                parts = converted_messages[0].get("parts") or []
-                if not parts:
-                    parts = [{"text": ""}]
-                    converted_messages[0]["parts"] = parts
-                parts[0]["text"] = f"{system_instruction}\n\n{parts[0].get('text', '')}".strip()
-            else:
-                converted_messages.append(
-                    {
-                        "role": "user",
-                        "parts": [{"text": system_instruction}],
-                    }
-                )
-
-        payload: dict = {"contents": converted_messages}
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        with self._post("streamGenerateContent", _build_payload(messages), stream=True) as response:
+            try:
+                for data in iter_sse_data(response.iter_lines()):
+                    chunk = _parse_stream_chunk(json.loads(data))
+                    if chunk:
+                        yield chunk
+            except requests.RequestException as exc:
+                # Dropped connections and read timeouts mid-stream are transient, so leave them retryable.
+                raise BackendError(f"Gemini stream failed: {exc}") from exc
+            except ValueError as exc:
+                raise BackendError(
+                    f"Gemini sent a malformed stream event: {exc}", status_code=response.status_code
+                ) from exc
 
+    def _post(self, method: str, payload: dict[str, Any], *, stream: bool = False) -> requests.Response:
+        query = f"alt=sse&key={self.api_key}" if stream else f"key={self.api_key}"
         try:
-            response = requests.post(
-                f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}",
+            response = self.session.post(
+                f"{self.base_url}/models/{self.model}:{method}?{query}",
                 json=payload,
-                timeout=self.timeout,
+                timeout=(self.connect_timeout, self.timeout),
+                stream=stream,
             )
         except requests.RequestException as exc:
-            raise RuntimeError(f"Gemini request failed: {exc}") from exc
+            raise BackendError(f"Gemini request failed: {exc}") from exc
         try:
             response.raise_for_status()
         except requests.HTTPError as exc:
             detail = _extract_error_detail(response)
-            raise RuntimeError(f"Gemini request failed: {detail}") from exc
-        data = response.json()
+            raise BackendError(
+                f"Gemini request failed: {detail}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            ) from exc
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncGeminiBackend(AsyncLLMBackend):
+    """Asyncio flavour of `GeminiBackend` built on a pooled `aiohttp.ClientSession`."""
+
+    supports_native_tools = True
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        timeout: float = 30,
+        base_url: str | None = None,
+        connect_timeout: float | None = None,
+        pool_size: int = 100,
+        keep_alive: bool = True,
+        max_retries: int = 2,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required for the Gemini backend.")
+
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url or os.getenv(
+            "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1"
+        )
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self._session = session
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions bind to the running loop, so build lazily on first use.
+        if self._session is None:
+            self._session = build_async_session(
+                timeout=self.timeout,
+                connect_timeout=self.connect_timeout,
+                pool_size=self.pool_size,
+                keep_alive=self.keep_alive,
+            )
+        return self._session
+
+    async def agenerate(self, messages: List[Message]) -> str:
+        response = await self._post(_build_payload(messages))
+        return _parse_response(response.json())
+
+    async def agenerate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        response = await self._post(_build_payload(messages, tools))
+        return _parse_result(response.json())
+
+    async def _post(self, payload: dict[str, Any]) -> AsyncResponse:
+        import aiohttp
 
         try:
-            candidates = data["candidates"]
-            first = candidates[0]
-            part = first["content"]["parts"][0]
-            return part["text"].strip()
-        except (KeyError, IndexError, TypeError) as exc:
-            raise RuntimeError(f"Unexpected response from Gemini: {data}") from exc
+            response = await post_json(
+                self.session,
+                f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}",
+                payload,
+                max_retries=self.max_retries,
+            )
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            raise BackendError(f"Gemini request failed: {exc}") from exc
+        if response.is_error:
+            detail = _extract_error_detail(response)
+            raise BackendError(
+                f"Gemini request failed: {detail}",
+                status_code=response.status,
+                retry_after=parse_retry_after(response.retry_after),
+            )
+        return response
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+def _build_payload(messages: List[Message], tools: Sequence[ToolSpec] = ()) -> dict[str, Any]:
+    system_instruction = ""
+    converted_messages = []
+
+    for message in messages:
+        role = message.get("role", "user")
+        content = message.get("content", "")
+
+        if role == "system":
+            system_instruction = content
+            continue
+
+        converted_messages.append(
+            {
+                "role": "user" if role == "user" else "model",
+                "parts": [{"text": content}],
+            }
+        )
+
+    if system_instruction:
+        if converted_messages:
+            parts = converted_messages[0].get("parts") or []
+            if not parts:
+                parts = [{"text": ""}]
+                converted_messages[0]["parts"] = parts
+            parts[0]["text"] = f"{system_instruction}\n\n{parts[0].get('text', '')}".strip()
+        else:
+            converted_messages.append(
+                {
+                    "role": "user",
+                    "parts": [{"text": system_instruction}],
+                }
+            )
+
+    payload: dict[str, Any] = {"contents": converted_messages}
+    if tools:
+        payload["tools"] = [
+            {
+                "functionDeclarations": [
+                    {"name": tool.name, "description": tool.description, "parameters": tool.parameters()}
+                    for tool in tools
+                ]
+            }
+        ]
+    return payload
+
+
+def _parse_response(data: Any) -> str:
+    try:
+        candidates = data["candidates"]
+        first = candidates[0]
+        part = first["content"]["parts"][0]
+        return part["text"].strip()
+    except (KeyError, IndexError, TypeError) as exc:
+        raise RuntimeError(f"Unexpected response from Gemini: {data}") from exc
+
+
+def _parse_result(data: Any) -> BackendResult:
+    try:
+        parts = data["candidates"][0]["content"]["parts"]
+        text = "".join(part.get("text", "") for part in parts)
+        calls = [
+            ToolCall.from_arguments(part["functionCall"]["name"], part["functionCall"].get("args"))
+            for part in parts
+            if "functionCall" in part
+        ]
+        return BackendResult(text.strip(), calls)
+    except (KeyError, IndexError, TypeError, AttributeError) as exc:
+        raise RuntimeError(f"Unexpected response from Gemini: {data}") from exc
+
+
+def _parse_stream_chunk(data: Any) -> str:
+    try:
+        candidates = data.get("candidates") or []
+        content = (candidates[0].get("content") or {}) if candidates else {}
+        return "".join(part.get("text", "") for part in content.get("parts") or [])
+    except AttributeError as exc:
+        raise RuntimeError(f"Unexpected stream chunk from Gemini: {data}") from exc
 
 
-def _extract_error_detail(response: requests.Response) -> str:
+def _extract_error_detail(response: requests.Response | AsyncResponse) -> str:
     try:
         payload = response.json()
         if isinstance(payload, dict):
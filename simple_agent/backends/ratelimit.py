@@ -0,0 +1,363 @@
+"""Client-side request/token rate limits and concurrency caps for backends."""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import os
+import re
+import struct
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, List, Sequence
+
+from ..history import estimate_message_tokens
+from ..metrics import REGISTRY, MetricsRegistry
+from .base import AsyncLLMBackend, BackendError, BackendResult, LLMBackend, Message, ToolSpec
+
+QUEUE_WAIT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SLOT_POLL_MIN = 0.001
+SLOT_POLL_MAX = 0.02
+_STATE = struct.Struct("dd")  # tokens available, monotonic time of the last refill
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute, holding at most `burst` (default a minute's worth).
+
+    `reserve` always succeeds: it takes the units, letting the level go
+    negative, and returns how long the caller must wait before spending them.
+    Callers therefore queue in arrival order instead of polling.
+    A request larger than the bucket simply waits longer.
+
+    With `path` the level lives in a small file guarded by `flock`, so every
+    process on the host that opens the same path shares one budget. The
+    monotonic clock is system-wide on Linux and macOS, so timestamps written
+    by one process are valid in another.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        *,
+        burst: float | None = None,
+        path: str | Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive.")
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else per_minute)
+        self.path = Path(path) if path is not None else None
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self._fd: int | None = None
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units and return the seconds to wait before using them."""
+
+        def take(level: float, elapsed: float) -> tuple[float, float]:
+            level = min(self.capacity, level + elapsed * self.rate) - amount
+            return level, max(0.0, -level / self.rate)
+
+        return self._update(take)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. after the provider answered 429."""
+
+        def drain(level: float, elapsed: float) -> tuple[float, float]:
+            return min(level + elapsed * self.rate, -seconds * self.rate), 0.0
+
+        self._update(drain)
+
+    def _update(self, step: Callable[[float, float], tuple[float, float]]) -> float:
+        with self._lock:
+            if self.path is None:
+                now = self._clock()
+                self._level, wait = step(self._level, max(0.0, now - self._updated))
+                self._updated = now
+                return wait
+            fd = self._open()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                # Read the clock only once the lock is held, so timestamps in the file never go backwards.
+                now = self._clock()
+                data = os.pread(fd, _STATE.size, 0)
+                level, updated = _STATE.unpack(data) if len(data) == _STATE.size else (self.capacity, now)
+                level, wait = step(level, max(0.0, now - updated))
+                os.pwrite(fd, _STATE.pack(level, now), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            return wait
+
+    def _open(self) -> int:
+        if self._fd is None:
+            assert self.path is not None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        return self._fd
+
+
+class ConcurrencyLimit:
+    """At most `limit` holders at once.
+
+    In-process limits are a semaphore. With `path` each slot is a lock file
+    (`<path>.<n>`) held with a non-blocking `flock`, so the cap covers every
+    process on the host and a crashed process frees its slots automatically.
+    """
+
+    def __init__(self, limit: int, *, path: str | Path | None = None) -> None:
+        if limit < 1:
+            raise ValueError("limit must be at least 1.")
+        self.limit = limit
+        self.path = Path(path) if path is not None else None
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._fds: List[int | None] = [None] * limit
+        self._held: set[int] = set()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> int | None:
+        """Return a slot number, or None when every slot is taken."""
+
+        if self.path is None:
+            return 0 if self._semaphore.acquire(blocking=False) else None
+        with self._lock:
+            for slot in range(self.limit):
+                # flock is per open file, so threads of this process must also skip slots it holds.
+                if slot in self._held:
+                    continue
+                fd = self._slot_fd(slot)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                self._held.add(slot)
+                return slot
+        return None
+
+    def acquire(self) -> int:
+        if self.path is None:
+            self._semaphore.acquire()
+            return 0
+        delay = SLOT_POLL_MIN
+        while (slot := self.try_acquire()) is None:
+            time.sleep(delay)
+            delay = min(SLOT_POLL_MAX, delay * 2)
+        return slot
+
+    async def aacquire(self) -> int:
+        delay = SLOT_POLL_MIN
+        while (slot := self.try_acquire()) is None:
+            await asyncio.sleep(delay)
+            delay = min(SLOT_POLL_MAX, delay * 2)
+        return slot
+
+    def release(self, slot: int) -> None:
+        if self.path is None:
+            self._semaphore.release()
+            return
+        with self._lock:
+            self._held.discard(slot)
+            fd = self._fds[slot]
+            if fd is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _slot_fd(self, slot: int) -> int:
+        fd = self._fds[slot]
+        if fd is None:
+            assert self.path is not None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = self._fds[slot] = os.open(f"{self.path}.{slot}", os.O_RDWR | os.O_CREAT, 0o600)
+        return fd
+
+
+class RateLimiter:
+    """Queues backend calls to stay under request, token and concurrency limits.
+
+    A call first takes a concurrency slot, then reserves one request and its
+    estimated tokens. It sleeps until both buckets allow it. The time spent
+    queued is observed on `simple_agent_backend_queue_wait_seconds`, labelled
+    with `name`. `burst_seconds` is how much unused quota an idle limiter
+    saves up. Lower it for providers that also enforce short windows.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_concurrency: int | None = None,
+        state_dir: str | Path | None = None,
+        burst_seconds: float = 60.0,
+        registry: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        base = Path(state_dir) / _slug(name) if state_dir is not None else None
+
+        def at(suffix: str) -> Path | None:
+            return base.with_name(f"{base.name}.{suffix}") if base is not None else None
+
+        def bucket(per_minute: float | None, suffix: str) -> TokenBucket | None:
+            if not per_minute:
+                return None
+            return TokenBucket(per_minute, burst=per_minute * burst_seconds / 60, path=at(suffix), clock=clock)
+
+        self.requests = bucket(requests_per_minute, "rpm")
+        self.tokens = bucket(tokens_per_minute, "tpm")
+        self.concurrency = ConcurrencyLimit(max_concurrency, path=at("slot")) if max_concurrency else None
+        registry = registry if registry is not None else REGISTRY
+        self.queue_wait = registry.histogram(
+            "simple_agent_backend_queue_wait_seconds",
+            "Time backend calls spent queued by the client-side rate limiter.",
+            ("backend",),
+            buckets=QUEUE_WAIT_BUCKETS,
+        )
+
+    @contextmanager
+    def limit(self, tokens: int = 0) -> Iterator[None]:
+        """Block until the call may start; hold its concurrency slot until the block exits."""
+
+        start = time.perf_counter()
+        slot = self.concurrency.acquire() if self.concurrency else None
+        try:
+            wait = self._reserve(tokens)
+            if wait:
+                time.sleep(wait)
+            self.queue_wait.observe(time.perf_counter() - start, backend=self.name)
+            yield
+        finally:
+            if slot is not None:
+                self.concurrency.release(slot)  # type: ignore[union-attr]
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Async counterpart of `limit` that waits without blocking the event loop."""
+
+        start = time.perf_counter()
+        slot = await self.concurrency.aacquire() if self.concurrency else None
+        try:
+            # The bucket update is a few syscalls under a lock, cheap enough to run on the loop.
+            wait = self._reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            self.queue_wait.observe(time.perf_counter() - start, backend=self.name)
+            yield
+        finally:
+            if slot is not None:
+                self.concurrency.release(slot)  # type: ignore[union-attr]
+
+    def throttled(self, error: BackendError) -> None:
+        """Slow every caller down after the provider rejected a call with 429."""
+
+        if error.status_code == 429 and self.requests is not None:
+            self.requests.pause(error.retry_after or 1.0)
+
+    def _reserve(self, tokens: int) -> float:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+
+@lru_cache(maxsize=None)
+def shared_limiter(
+    name: str,
+    requests_per_minute: float | None,
+    tokens_per_minute: float | None,
+    max_concurrency: int | None,
+    state_dir: str | None,
+) -> RateLimiter:
+    """One limiter per backend/model and configuration, shared by every backend in the process."""
+
+    return RateLimiter(
+        name,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        max_concurrency=max_concurrency,
+        state_dir=state_dir,
+    )
+
+
+class RateLimitedBackend(LLMBackend):
+    """Runs every call of the wrapped backend inside `limiter.limit()`.
+
+    Tokens are charged from the estimated prompt size. Streams keep their
+    concurrency slot until the stream is exhausted or closed.
+    """
+
+    def __init__(self, backend: LLMBackend, limiter: RateLimiter) -> None:
+        self.backend = backend
+        self.limiter = limiter
+
+    @property
+    def supports_native_tools(self) -> bool:  # type: ignore[override]
+        return self.backend.supports_native_tools
+
+    def cache_identity(self) -> dict:
+        return self.backend.cache_identity()
+
+    def generate(self, messages: List[Message]) -> str:
+        with self._limit(messages):
+            return self.backend.generate(messages)
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        with self._limit(messages):
+            return self.backend.generate_with_tools(messages, tools)
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        with self._limit(messages):
+            yield from self.backend.stream(messages)
+
+    def close(self) -> None:
+        self.backend.close()
+
+    @contextmanager
+    def _limit(self, messages: List[Message]) -> Iterator[None]:
+        with self.limiter.limit(estimate_message_tokens(messages)):
+            try:
+                yield
+            except BackendError as exc:
+                self.limiter.throttled(exc)
+                raise
+
+
+class AsyncRateLimitedBackend(AsyncLLMBackend):
+    """Async counterpart of `RateLimitedBackend`."""
+
+    def __init__(self, backend: AsyncLLMBackend, limiter: RateLimiter) -> None:
+        self.backend = backend
+        self.limiter = limiter
+
+    @property
+    def supports_native_tools(self) -> bool:  # type: ignore[override]
+        return self.backend.supports_native_tools
+
+    async def agenerate(self, messages: List[Message]) -> str:
+        async with self._limit(messages):
+            return await self.backend.agenerate(messages)
+
+    async def agenerate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        async with self._limit(messages):
+            return await self.backend.agenerate_with_tools(messages, tools)
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    @asynccontextmanager
+    async def _limit(self, messages: List[Message]) -> AsyncIterator[None]:
+        async with self.limiter.alimit(estimate_message_tokens(messages)):
+            try:
+                yield
+            except BackendError as exc:
+                self.limiter.throttled(exc)
+                raise
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
@@ -0,0 +1,166 @@
+"""Pooled HTTP session helpers shared by the backends."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:  # pragma: no cover
+    import aiohttp
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(
+    *,
+    pool_size: int = 10,
+    keep_alive: bool = True,
+    max_retries: int = 2,
+    backoff_factor: float = 0.5,
+) -> requests.Session:
+    """Return a `requests.Session` with a bounded connection pool and retries.
+
+    Reusing the session across turns keeps the TCP/TLS connection to the
+    provider open, so only the first request pays the handshake.
+
+    `max_retries` covers connection failures and `RETRY_STATUSES` replies.
+    Read errors are not retried: the provider may already be generating (and
+    billing) a completion for the POST, so a resend could run it twice.
+    """
+
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+@dataclass(slots=True)
+class AsyncResponse:
+    """Fully read response returned by `post_json`."""
+
+    status: int
+    text: str
+    reason: str | None
+    retry_after: str | None = None
+
+    @property
+    def is_error(self) -> bool:
+        return self.status >= 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+def build_async_session(
+    *,
+    timeout: float = 30,
+    connect_timeout: float | None = None,
+    pool_size: int = 100,
+    keep_alive: bool = True,
+) -> aiohttp.ClientSession:
+    """Return a pooled `aiohttp.ClientSession` mirroring `build_session` options.
+
+    `pool_size` caps the connections open at once (`0` lifts the cap). It
+    defaults much higher than the sync pool because every concurrent
+    coroutine needs its own connection, while sync callers are already
+    bounded by their threads.
+
+    Must be called from a running event loop. aiohttp is imported here rather
+    than at module level because it costs more to import than the rest of the
+    package, and synchronous callers never need it.
+    """
+
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=pool_size, force_close=not keep_alive)
+    connect = connect_timeout if connect_timeout is not None else timeout
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=timeout),
+    )
+
+
+async def post_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    payload: dict,
+    *,
+    headers: dict[str, str] | None = None,
+    max_retries: int = 2,
+    backoff_factor: float = 0.5,
+) -> AsyncResponse:
+    """POST `payload` and read the body, retrying connection errors and retryable statuses."""
+
+    import aiohttp
+
+    attempt = 0
+    while True:
+        try:
+            async with session.post(url, json=payload, headers=headers) as response:
+                result = AsyncResponse(
+                    response.status,
+                    await response.text(),
+                    response.reason,
+                    response.headers.get("Retry-After"),
+                )
+            if result.status not in RETRY_STATUSES or attempt >= max_retries:
+                return result
+        except aiohttp.ClientConnectionError:
+            if attempt >= max_retries:
+                raise
+        await asyncio.sleep(backoff_factor * (2**attempt))
+        attempt += 1
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a `Retry-After` header (delta-seconds or an HTTP date)."""
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_sse_data(lines: Iterable[str | bytes]) -> Iterator[str]:
+    """Yield the `data:` payloads of a server-sent events stream."""
+
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield data
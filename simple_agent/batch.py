@@ -0,0 +1,131 @@
+"""Run a JSONL file of prompts through one shared agent."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Iterator
+
+from .agent import SimpleAgent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """One output record, written as a JSON line."""
+
+    line: int
+    id: str | None
+    response: str | None
+    error: str | None
+    elapsed: float
+
+
+@dataclass(slots=True)
+class BatchSummary:
+    processed: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+def run_batch(
+    agent: SimpleAgent,
+    input_path: str | Path,
+    output_path: str | Path,
+    *,
+    concurrency: int = 4,
+    max_turns: int = 5,
+) -> BatchSummary:
+    """Stream prompts from `input_path` and append results to `output_path`.
+
+    Each input line is either a JSON object with a `prompt` (and optional
+    `id`) or a JSON string. Results are written in input order, one per input
+    line, so an interrupted run resumes after the last line already present in
+    the output file. At most `2 * concurrency` prompts are in flight, which
+    keeps memory flat regardless of input size.
+    """
+
+    output_path = Path(output_path)
+    summary = BatchSummary(skipped=_completed_lines(output_path))
+    if summary.skipped:
+        logger.info("Resuming after %d completed lines.", summary.skipped)
+
+    window: deque[Future[BatchResult]] = deque()
+    with (
+        open(input_path, encoding="utf-8") as source,
+        open(output_path, "a", encoding="utf-8") as sink,
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="simple-agent-batch") as pool,
+    ):
+        for number, raw in _numbered_lines(source, start_after=summary.skipped):
+            window.append(pool.submit(_run_one, agent, number, raw, max_turns))
+            if len(window) >= concurrency * 2:
+                _write(sink, window.popleft().result(), summary)
+        while window:
+            _write(sink, window.popleft().result(), summary)
+
+    return summary
+
+
+def _numbered_lines(source: IO[str], *, start_after: int) -> Iterator[tuple[int, str]]:
+    for number, raw in enumerate(source, start=1):
+        if number > start_after:
+            yield number, raw
+
+
+def _run_one(agent: SimpleAgent, number: int, raw: str, max_turns: int) -> BatchResult:
+    start = time.perf_counter()
+    item_id: str | None = None
+    try:
+        item_id, prompt = _parse_line(raw)
+        response = agent.run(prompt, max_turns=max_turns)
+    except Exception as exc:  # pylint: disable=broad-except
+        return BatchResult(number, item_id, None, str(exc) or type(exc).__name__, time.perf_counter() - start)
+    return BatchResult(number, item_id, response, None, time.perf_counter() - start)
+
+
+def _parse_line(raw: str) -> tuple[str | None, str]:
+    raw = raw.strip()
+    if not raw:
+        raise ValueError("Empty line.")
+    data = json.loads(raw)
+    if isinstance(data, str):
+        return None, data
+    if isinstance(data, dict) and isinstance(data.get("prompt"), str):
+        item_id = data.get("id")
+        return (str(item_id) if item_id is not None else None), data["prompt"]
+    raise ValueError("Expected a JSON string or an object with a 'prompt' field.")
+
+
+def _write(sink: IO[str], result: BatchResult, summary: BatchSummary) -> None:
+    sink.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+    sink.flush()
+    summary.processed += 1
+    if result.error is not None:
+        summary.failed += 1
+
+
+def _completed_lines(path: Path) -> int:
+    """Count complete records in an existing output file, dropping a torn last line."""
+
+    if not path.exists():
+        return 0
+    count = 0
+    last_newline = 0
+    offset = 0
+    with open(path, "rb") as handle:
+        while chunk := handle.read(1 << 20):
+            count += chunk.count(b"\n")
+            position = chunk.rfind(b"\n")
+            if position != -1:
+                last_newline = offset + position + 1
+            offset += len(chunk)
+    if last_newline != offset:
+        with open(path, "r+b") as handle:
+            handle.truncate(last_newline)
+    return count
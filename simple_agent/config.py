@@ -6,9 +6,6 @@ import os
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import Literal
-from dotenv import load_dotenv
-
-load_dotenv()
 
 BackendName = Literal["chatgpt", "gemini"]
 
@@ -25,6 +22,57 @@ class Settings:
     gemini_model: str
     request_timeout: float
     python_tool_imports: tuple[str, ...]
+    connect_timeout: float = 10.0
+    http_pool_size: int = 10
+    http_async_pool_size: int = 100
+    http_keep_alive: bool = True
+    http_max_retries: int = 2
+    max_parallel_tools: int = 4
+    tool_timeout: float | None = None
+    python_tool_pool_size: int = 0
+    python_tool_warm_imports: tuple[str, ...] = ()
+    python_tool_worker_max_runs: int = 50
+    python_tool_worker_max_memory_mb: int = 256
+    python_tool_sessions: bool = False
+    python_tool_session_idle_timeout: float = 300.0
+    python_tool_session_max_memory_mb: int = 256
+    python_tool_cpu_limit: int | None = 10
+    python_tool_memory_limit_mb: int | None = 1024
+    python_tool_file_size_limit_mb: int | None = 16
+    python_tool_output_limit: int | None = 65536
+    response_cache: bool = False
+    response_cache_max_entries: int = 1024
+    response_cache_ttl: float | None = 3600.0
+    response_cache_path: str | None = None
+    native_tools: bool = False
+    history_token_budget: int | None = None
+    history_keep_turns: int = 2
+    history_tool_output_chars: int = 500
+    history_summarize: bool = False
+    trace_file: str | None = None
+    trace_metrics: bool = False
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_max_concurrency: int = 8
+    server_max_body_bytes: int = 1048576
+    file_search_index: str | None = ".cache/file-search.sqlite"
+    file_search_refresh: float = 10.0
+    tool_plugins: bool = True
+    tool_cache: tuple[str, ...] = ()
+    tool_cache_max_entries: int = 256
+    tool_cache_ttl: float | None = 300.0
+    backend_fallbacks: tuple[str, ...] = ()
+    backend_hedge: bool = True
+    backend_hedge_delay: float = 2.0
+    backend_max_retries: int = 2
+    backend_breaker_failures: int = 5
+    backend_breaker_reset: float = 30.0
+    backend_rpm: float | None = None
+    backend_tpm: float | None = None
+    backend_max_concurrency: int | None = None
+    backend_rate_limit_dir: str | None = ".cache/rate-limits"
+    conversation_store: str = ".cache/conversations.sqlite"
+    tool_metadata_cache: str | None = None
 
     @staticmethod
     def _get_env(key: str, default: str | None = None) -> str | None:
@@ -37,6 +85,10 @@ class Settings:
         backend_normalized = backend.lower()
         if backend_normalized not in {"chatgpt", "gemini"}:
             raise ValueError(f"Unsupported backend '{backend}'. Expected 'chatgpt' or 'gemini'.")
+        fallbacks = tuple(name.lower() for name in _parse_list(cls._get_env("LLM_FALLBACKS")))
+        for name in fallbacks:
+            if name not in {"chatgpt", "gemini"}:
+                raise ValueError(f"Unsupported fallback backend '{name}'. Expected 'chatgpt' or 'gemini'.")
 
         return cls(
             backend=backend_normalized,  # type: ignore[arg-type]
@@ -51,17 +103,96 @@ class Settings:
             gemini_model=cls._get_env("GEMINI_MODEL", "gemini-1.5-flash"),
             request_timeout=float(cls._get_env("REQUEST_TIMEOUT", "30")),
             python_tool_imports=_parse_list(cls._get_env("PYTHON_TOOL_IMPORTS")),
+            connect_timeout=float(cls._get_env("CONNECT_TIMEOUT", "10")),
+            http_pool_size=int(cls._get_env("HTTP_POOL_SIZE", "10")),
+            http_async_pool_size=int(cls._get_env("HTTP_ASYNC_POOL_SIZE", "100")),
+            http_keep_alive=_parse_bool(cls._get_env("HTTP_KEEP_ALIVE"), default=True),
+            http_max_retries=int(cls._get_env("HTTP_MAX_RETRIES", "2")),
+            max_parallel_tools=int(cls._get_env("MAX_PARALLEL_TOOLS", "4")),
+            tool_timeout=_parse_optional_float(cls._get_env("TOOL_TIMEOUT")),
+            python_tool_pool_size=int(cls._get_env("PYTHON_TOOL_POOL_SIZE", "0")),
+            python_tool_warm_imports=_parse_list(cls._get_env("PYTHON_TOOL_WARM_IMPORTS")),
+            python_tool_worker_max_runs=int(cls._get_env("PYTHON_TOOL_WORKER_MAX_RUNS", "50")),
+            python_tool_worker_max_memory_mb=int(cls._get_env("PYTHON_TOOL_WORKER_MAX_MEMORY_MB", "256")),
+            python_tool_sessions=_parse_bool(cls._get_env("PYTHON_TOOL_SESSIONS"), default=False),
+            python_tool_session_idle_timeout=float(cls._get_env("PYTHON_TOOL_SESSION_IDLE_TIMEOUT", "300")),
+            python_tool_session_max_memory_mb=int(cls._get_env("PYTHON_TOOL_SESSION_MAX_MEMORY_MB", "256")),
+            python_tool_cpu_limit=_parse_optional_int(cls._get_env("PYTHON_TOOL_CPU_LIMIT", "10")),
+            python_tool_memory_limit_mb=_parse_optional_int(cls._get_env("PYTHON_TOOL_MEMORY_LIMIT_MB", "1024")),
+            python_tool_file_size_limit_mb=_parse_optional_int(cls._get_env("PYTHON_TOOL_FILE_SIZE_LIMIT_MB", "16")),
+            python_tool_output_limit=_parse_optional_int(cls._get_env("PYTHON_TOOL_OUTPUT_LIMIT", "65536")),
+            response_cache=_parse_bool(cls._get_env("RESPONSE_CACHE"), default=False),
+            response_cache_max_entries=int(cls._get_env("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+            response_cache_ttl=_parse_optional_float(cls._get_env("RESPONSE_CACHE_TTL", "3600")),
+            response_cache_path=cls._get_env("RESPONSE_CACHE_PATH") or None,
+            native_tools=_parse_bool(cls._get_env("NATIVE_TOOLS"), default=False),
+            history_token_budget=_parse_optional_int(cls._get_env("HISTORY_TOKEN_BUDGET")),
+            history_keep_turns=int(cls._get_env("HISTORY_KEEP_TURNS", "2")),
+            history_tool_output_chars=int(cls._get_env("HISTORY_TOOL_OUTPUT_CHARS", "500")),
+            history_summarize=_parse_bool(cls._get_env("HISTORY_SUMMARIZE"), default=False),
+            trace_file=cls._get_env("TRACE_FILE") or None,
+            trace_metrics=_parse_bool(cls._get_env("TRACE_METRICS"), default=False),
+            server_host=cls._get_env("SERVER_HOST", "127.0.0.1") or "127.0.0.1",
+            server_port=int(cls._get_env("SERVER_PORT", "8000")),
+            server_max_concurrency=int(cls._get_env("SERVER_MAX_CONCURRENCY", "8")),
+            server_max_body_bytes=int(cls._get_env("SERVER_MAX_BODY_BYTES", "1048576")),
+            file_search_index=cls._get_env("FILE_SEARCH_INDEX", ".cache/file-search.sqlite") or None,
+            file_search_refresh=float(cls._get_env("FILE_SEARCH_REFRESH", "10")),
+            tool_plugins=_parse_bool(cls._get_env("TOOL_PLUGINS"), default=True),
+            tool_cache=_parse_list(cls._get_env("TOOL_CACHE")),
+            tool_cache_max_entries=int(cls._get_env("TOOL_CACHE_MAX_ENTRIES", "256")),
+            tool_cache_ttl=_parse_optional_float(cls._get_env("TOOL_CACHE_TTL", "300")),
+            backend_fallbacks=fallbacks,
+            backend_hedge=_parse_bool(cls._get_env("LLM_HEDGE"), default=True),
+            backend_hedge_delay=float(cls._get_env("LLM_HEDGE_DELAY", "2")),
+            backend_max_retries=int(cls._get_env("LLM_MAX_RETRIES", "2")),
+            backend_breaker_failures=int(cls._get_env("LLM_BREAKER_FAILURES", "5")),
+            backend_breaker_reset=float(cls._get_env("LLM_BREAKER_RESET", "30")),
+            backend_rpm=_parse_optional_float(cls._get_env("LLM_RPM")),
+            backend_tpm=_parse_optional_float(cls._get_env("LLM_TPM")),
+            backend_max_concurrency=_parse_optional_int(cls._get_env("LLM_MAX_CONCURRENCY")),
+            backend_rate_limit_dir=cls._get_env("LLM_RATE_LIMIT_DIR", ".cache/rate-limits") or None,
+            conversation_store=cls._get_env("CONVERSATION_STORE", ".cache/conversations.sqlite"),
+            tool_metadata_cache=cls._get_env("TOOL_METADATA_CACHE", _user_cache_path("tool-metadata.json")) or None,
         )
 
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Convenience accessor with caching to avoid redundant parsing."""
+    """Convenience accessor with caching to avoid redundant parsing.
+
+    `.env` is loaded here, on first use, rather than when the module is
+    imported, so importing the package does not touch the filesystem.
+    """
 
+    from dotenv import load_dotenv
+
+    load_dotenv()
     return Settings.from_env()
 
 
+def _user_cache_path(name: str) -> str:
+    """`name` in the per-user cache directory (`$XDG_CACHE_HOME/simple-agent`), not the working directory."""
+
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "simple-agent", name)
+
+
 def _parse_list(value: str | None) -> tuple[str, ...]:
     if not value:
         return ()
     return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _parse_bool(value: str | None, *, default: bool) -> bool:
+    if not value:
+        return default
+    return value.lower() in {"1", "true", "yes", "on"}
+
+
+def _parse_optional_float(value: str | None) -> float | None:
+    return float(value) if value else None
+
+
+def _parse_optional_int(value: str | None) -> int | None:
+    return int(value) if value else None
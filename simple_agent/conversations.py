@@ -0,0 +1,82 @@
+"""Append-only on-disk log of conversation messages."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Sequence
+
+from .backends.base import Message
+
+
+class ConversationStore:
+    """Messages of many conversations in one SQLite file, shared by processes.
+
+    Messages live in a `WITHOUT ROWID` table clustered on
+    `(conversation, seq)`. Loading a conversation is one range scan, and an
+    append is a seek to the conversation's last message plus an insert next
+    to it. Both cost the same with a thousand stored conversations or
+    millions. Rows are only ever inserted. The system prompt is not stored,
+    since the agent rebuilds it from its current tools.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "conversation TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL, "
+            "PRIMARY KEY (conversation, seq)) WITHOUT ROWID"
+        )
+
+    def load(self, conversation: str) -> List[Message]:
+        """All messages of `conversation` in order; empty for an unknown id."""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE conversation = ? ORDER BY seq", (conversation,)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def append(self, conversation: str, messages: Sequence[Message]) -> None:
+        """Add `messages` to the end of `conversation` in one transaction."""
+
+        if not messages:
+            return
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes never pick the same seq.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (last,) = self._conn.execute(
+                    "SELECT max(seq) FROM messages WHERE conversation = ?", (conversation,)
+                ).fetchone()
+                start = -1 if last is None else last
+                self._conn.executemany(
+                    "INSERT INTO messages (conversation, seq, role, content) VALUES (?, ?, ?, ?)",
+                    [
+                        (conversation, start + offset, message.get("role", "user"), message.get("content") or "")
+                        for offset, message in enumerate(messages, start=1)
+                    ],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def pending(self, conversation: str) -> bool:
+        """Whether the last run of `conversation` stopped before the model answered."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT role FROM messages WHERE conversation = ? ORDER BY seq DESC LIMIT 1", (conversation,)
+            ).fetchone()
+        return row is not None and row[0] == "user"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,203 @@
+"""Token-budgeted views of the conversation history sent to the backend."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+from .backends.base import LLMBackend, Message
+
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_HEADER = "[Summary of earlier turns]"
+TOOL_RESULT_PREFIX = "[Tool"  # tool results ("[Tool:name] ...", "[Tool error] ...") are sent as user messages
+
+Summarizer = Callable[[str, List[Message]], str]
+"""Takes the previous summary and newly aged-out messages, returns a new summary."""
+
+SUMMARY_PROMPT = """Summarize the earlier part of an agent conversation so the agent can continue without it.
+Keep tool names, key results, numbers, file names and open questions. Be terse; at most {max_chars} characters.
+
+Previous summary:
+{previous}
+
+New messages:
+{transcript}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English and code)."""
+
+    return math.ceil(len(text) / 4)
+
+
+def estimate_message_tokens(messages: List[Message]) -> int:
+    return sum(estimate_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+@dataclass(slots=True)
+class TurnStats:
+    """What one backend call was sent."""
+
+    turn: int
+    messages: int
+    bytes: int
+    tokens: int
+    compacted: bool
+
+
+class BackendSummarizer:
+    """Summarizes aged-out turns with a (typically cheap) LLM backend."""
+
+    def __init__(self, backend: LLMBackend, *, max_chars: int = 1500, message_chars: int = 2000) -> None:
+        self.backend = backend
+        self.max_chars = max_chars
+        self.message_chars = message_chars
+
+    def __call__(self, previous: str, messages: List[Message]) -> str:
+        transcript = "\n".join(
+            f"{message.get('role', 'user')}: {_elide(message.get('content') or '', self.message_chars)}"
+            for message in messages
+        )
+        prompt = SUMMARY_PROMPT.format(max_chars=self.max_chars, previous=previous or "(none)", transcript=transcript)
+        summary = self.backend.generate([{"role": "user", "content": prompt}]).strip()
+        return summary[: self.max_chars]
+
+
+@dataclass(slots=True)
+class HistoryManager:
+    """Keeps the payload sent on each turn under `token_budget`.
+
+    The system prompt, the user's current prompt (the latest user message
+    that is not a tool result) and the last `keep_turns` tool turns
+    (assistant request plus tool results) are always sent. When the full
+    history exceeds the budget, older messages, including earlier turns of a
+    continued conversation, are cut to `tool_output_chars`; if that is not
+    enough, they are replaced by a summary (when a `summarizer` is set) or
+    dropped. The budget is a soft target: when the pinned messages alone
+    exceed it, the recent tool outputs are cut too and the payload is sent
+    over budget rather than losing the prompt. The manager holds no per-run
+    state, so one instance can be shared by concurrent runs; call
+    `session()` at the start of each run.
+    """
+
+    token_budget: int | None = None
+    keep_turns: int = 2
+    tool_output_chars: int = 500
+    summarizer: Summarizer | None = None
+    on_turn: Callable[[TurnStats], None] | None = None
+
+    def session(self) -> "HistorySession":
+        return HistorySession(self)
+
+
+@dataclass(slots=True)
+class HistorySession:
+    """Per-run state: the incremental summary and per-turn statistics."""
+
+    manager: HistoryManager
+    turns: List[TurnStats] = field(default_factory=list)
+    _summary: str = ""
+    _summarized: int = 0
+    _logger: logging.Logger = field(default_factory=lambda: logging.getLogger("HistoryManager"), repr=False)
+
+    def prepare(self, history: List[Message]) -> List[Message]:
+        """Return the messages to send for this turn; `history` is left untouched."""
+
+        budget = self.manager.token_budget
+        payload = history
+        if budget is not None and estimate_message_tokens(history) > budget:
+            payload = self._compact(history, budget)
+        self._record(payload, compacted=payload is not history)
+        return payload
+
+    def _compact(self, history: List[Message], budget: int) -> List[Message]:
+        prompt = _latest_prompt(history)
+        system, question = history[:1], history[prompt]
+        body = history[prompt + 1 :]
+        keep = min(len(body), 2 * max(self.manager.keep_turns, 0))
+        recent = body[len(body) - keep :]
+        # Earlier turns of the conversation age out together with this run's older tool turns.
+        earlier, older_turns = history[1:prompt], body[: len(body) - keep]
+        older = [*earlier, *older_turns]
+        limit = self.manager.tool_output_chars
+
+        payload = [
+            *system,
+            *(_elide_tool_output(message, limit) for message in earlier),
+            question,
+            *(_elide_tool_output(message, limit) for message in older_turns),
+            *recent,
+        ]
+        if estimate_message_tokens(payload) <= budget or not older:
+            return self._fit_recent(payload, budget, len(recent))
+
+        if self.manager.summarizer is not None:
+            if len(older) > self._summarized:
+                self._summary = self.manager.summarizer(self._summary, older[self._summarized :])
+                self._summarized = len(older)
+            note = f"{SUMMARY_HEADER}\n{self._summary}"
+        else:
+            note = f"[{len(older)} earlier messages omitted to stay within the context budget]"
+        # Fold the note into the question so user/assistant turns keep alternating.
+        merged = {**question, "content": f"{question.get('content', '')}\n\n{note}"}
+        payload = [*system, merged, *recent]
+        return self._fit_recent(payload, budget, len(recent))
+
+    def _fit_recent(self, payload: List[Message], budget: int, recent: int) -> List[Message]:
+        if estimate_message_tokens(payload) <= budget or not recent:
+            return payload
+        limit = self.manager.tool_output_chars
+        start = len(payload) - recent
+        fitted = payload[:start] + [_elide_tool_output(message, limit) for message in payload[start:]]
+        tokens = estimate_message_tokens(fitted)
+        if tokens > budget:
+            self._logger.info("Pinned messages alone need ~%d tokens; sending over the %d-token budget.", tokens, budget)
+        return fitted
+
+    def _record(self, payload: List[Message], *, compacted: bool) -> None:
+        stats = TurnStats(
+            turn=len(self.turns) + 1,
+            messages=len(payload),
+            bytes=len(json.dumps(payload, ensure_ascii=False).encode("utf-8")),
+            tokens=estimate_message_tokens(payload),
+            compacted=compacted,
+        )
+        self.turns.append(stats)
+        self._logger.debug(
+            "Turn %d: sending %d messages, %d bytes, ~%d tokens%s.",
+            stats.turn,
+            stats.messages,
+            stats.bytes,
+            stats.tokens,
+            " (compacted)" if compacted else "",
+        )
+        if self.manager.on_turn is not None:
+            self.manager.on_turn(stats)
+
+
+def _latest_prompt(history: List[Message]) -> int:
+    """Index of the user's current prompt: the last user message that is not a tool result."""
+
+    for index in range(len(history) - 1, 0, -1):
+        message = history[index]
+        if message.get("role") == "user" and not (message.get("content") or "").startswith(TOOL_RESULT_PREFIX):
+            return index
+    return 1
+
+
+def _elide_tool_output(message: Message, limit: int) -> Message:
+    # Tool results come back as user messages; assistant turns are short tool-request JSON.
+    if message.get("role") != "user":
+        return message
+    content = message.get("content") or ""
+    elided = _elide(content, limit)
+    return message if elided is content else {**message, "content": elided}
+
+
+def _elide(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}… [{len(text) - limit} chars elided]"
@@ -0,0 +1,159 @@
+"""Long-running HTTP server that exposes one prepared agent as a JSON service."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .agent import SimpleAgent
+from .metrics import REGISTRY, MetricsRegistry
+
+MAX_BODY_BYTES = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    """Routes `POST /run`, `GET /metrics` and `GET /healthz`."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "AgentServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        start = time.perf_counter()
+        if self.path == "/healthz":
+            status = self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            status = self._send(200, self.server.registry.render().encode(), "text/plain; version=0.0.4")
+        else:
+            status = self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+        self.server.observe(self.path, status, time.perf_counter() - start)
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        start = time.perf_counter()
+        status = self._handle_post()
+        self.server.observe(self.path, status, time.perf_counter() - start)
+
+    def _handle_post(self) -> int:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body's extent is unknown, so the connection cannot be reused.
+            self.close_connection = True
+            return self._send_json(400, {"error": "Invalid Content-Length header."})
+        if length > self.server.max_body_bytes:
+            self.close_connection = True
+            return self._send_json(413, {"error": f"Request body is larger than {self.server.max_body_bytes} bytes."})
+        body = self.rfile.read(length)
+        if self.path != "/run":
+            return self._send_json(404, {"error": f"Unknown path '{self.path}'."})
+
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            return self._send_json(400, {"error": f"Invalid JSON: {exc}"})
+        prompt = request.get("prompt") if isinstance(request, dict) else None
+        if not isinstance(prompt, str) or not prompt.strip():
+            return self._send_json(400, {"error": "Expected a JSON object with a non-empty 'prompt'."})
+        max_turns = request.get("max_turns", self.server.max_turns)
+        if not isinstance(max_turns, int) or max_turns < 1:
+            return self._send_json(400, {"error": "'max_turns' must be a positive integer."})
+
+        if not self.server.slots.acquire(blocking=False):
+            self.server.rejected.inc()
+            return self._send_json(429, {"error": "Server is at capacity."}, headers={"Retry-After": "1"})
+        self.server.in_flight.inc()
+        run_start = time.perf_counter()
+        try:
+            response = self.server.agent.run(prompt, max_turns=min(max_turns, self.server.max_turns))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Agent run failed.")
+            return self._send_json(500, {"error": str(exc) or type(exc).__name__})
+        finally:
+            self.server.in_flight.dec()
+            self.server.slots.release()
+        return self._send_json(200, {"response": response, "elapsed": time.perf_counter() - run_start})
+
+    def _send_json(self, status: int, body: dict, *, headers: dict[str, str] | None = None) -> int:
+        return self._send(status, json.dumps(body, ensure_ascii=False).encode(), "application/json", headers)
+
+    def _send(self, status: int, data: bytes, content_type: str, headers: dict[str, str] | None = None) -> int:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        return status
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class AgentServer(ThreadingHTTPServer):
+    """Serves one shared `SimpleAgent`, so tools, the system prompt and pooled
+    backend connections are built once rather than per request.
+
+    At most `max_concurrency` runs execute at a time; further `/run` requests
+    get an immediate 429 with `Retry-After` instead of queueing. Bodies over
+    `max_body_bytes` get 413 without being read.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        agent: SimpleAgent,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        max_concurrency: int = 8,
+        max_turns: int = 5,
+        max_body_bytes: int = MAX_BODY_BYTES,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("Server concurrency must be at least 1.")
+        super().__init__((host, port), AgentRequestHandler)
+        self.agent = agent
+        self.max_turns = max_turns
+        self.max_body_bytes = max_body_bytes
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.registry = registry if registry is not None else REGISTRY
+        self.latency = self.registry.histogram(
+            "simple_agent_http_request_duration_seconds",
+            "Time spent handling HTTP requests.",
+            ("path", "status"),
+        )
+        self.in_flight = self.registry.gauge("simple_agent_runs_in_flight", "Agent runs currently executing.")
+        self.rejected = self.registry.counter(
+            "simple_agent_runs_rejected_total",
+            "Runs rejected with 429 because the server was saturated.",
+        )
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def observe(self, path: str, status: int, elapsed: float) -> None:
+        known = path if path in {"/run", "/metrics", "/healthz"} else "other"
+        self.latency.observe(elapsed, path=known, status=status)
+
+    def __enter__(self) -> "AgentServer":
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+        self.server_close()
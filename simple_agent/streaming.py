@@ -0,0 +1,160 @@
+"""Incremental classification of streamed model replies."""
+
+from __future__ import annotations
+
+import json
+from typing import List
+
+from .toolcalls import JSON_OPENERS, as_tool_requests, extract_tool_requests
+
+FENCE = "```"
+JSON_CLOSERS = "}]"
+
+
+class StreamingResponseParser:
+    """Decides from the first bytes whether a streamed reply is a tool call.
+
+    Replies that start with anything other than `{`, `[` or a code fence are
+    answers, and their text is released as soon as it arrives, up to the
+    first `{`. From there on it is held, because `run` also dispatches a tool
+    call embedded in prose: `finish` applies `extract_tool_requests` to the
+    whole reply and either sets `tool_requests` or releases the held text.
+    Replies that look like JSON are buffered until the top-level value closes,
+    at which point `tool_requests` is set and the caller can dispatch the
+    tools without waiting for the rest of the stream.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.tool_requests: List[dict] | None = None
+        self._mode: str | None = None  # None (undecided), "answer" or "json"
+        self._json_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._scanned = 0
+        self._released = 0  # how much of `text` has been returned as answer text
+        self._held = False  # an answer reached a `{` and may still hold a tool call
+
+    @property
+    def is_answer(self) -> bool:
+        return self._mode == "answer"
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk and return any text that should be shown to the user."""
+
+        if self.tool_requests is not None:
+            return []
+        self.text += chunk
+
+        if self._mode is None:
+            self._classify()
+            if self._mode == "answer":
+                self._released = len(self.text) - len(self.text.lstrip())
+        if self._mode == "answer":
+            return self._release()
+        if self._mode == "json":
+            self._scan_json()
+        return []
+
+    def finish(self) -> List[str]:
+        """Flush buffered text once the stream ends without a tool call."""
+
+        if self.tool_requests is not None:
+            return []
+        if self._mode == "answer" and not self._held:
+            return []
+        # The same check `run` uses, so both dispatch the same replies.
+        self.tool_requests = extract_tool_requests(self.text)
+        if self.tool_requests is not None:
+            return []
+        if self._mode == "answer":
+            rest = self.text[self._released :].rstrip()
+        else:
+            rest = self.text.strip()
+        self._mode = "answer"
+        self._released = len(self.text)
+        return [rest] if rest else []
+
+    def _release(self) -> List[str]:
+        if self._held:
+            return []
+        end = self.text.find("{", self._released)
+        if end == -1:
+            end = len(self.text)
+        else:
+            self._held = True
+        piece = self.text[self._released : end]
+        self._released = end
+        return [piece] if piece else []
+
+    def _classify(self) -> None:
+        stripped = self.text.lstrip()
+        if not stripped:
+            return
+        offset = len(self.text) - len(stripped)
+
+        if stripped[0] in JSON_OPENERS:
+            self._enter_json(offset)
+        elif stripped[0] == "`":
+            if len(stripped) < len(FENCE):
+                if not FENCE.startswith(stripped):
+                    self._mode = "answer"
+                return
+            if not stripped.startswith(FENCE):
+                self._mode = "answer"
+                return
+            newline = stripped.find("\n")
+            if newline == -1:
+                return
+            body = stripped[newline + 1 :]
+            body_stripped = body.lstrip()
+            if not body_stripped:
+                return
+            if body_stripped[0] not in JSON_OPENERS:
+                self._mode = "answer"
+                return
+            self._enter_json(len(self.text) - len(body_stripped))
+        else:
+            self._mode = "answer"
+
+    def _enter_json(self, start: int) -> None:
+        self._mode = "json"
+        self._json_start = start
+        self._scanned = start
+
+    def _scan_json(self) -> None:
+        text = self.text
+        for index in range(self._scanned, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in JSON_OPENERS:
+                self._depth += 1
+            elif char in JSON_CLOSERS:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._scanned = index + 1
+                    self._close_value(text[self._json_start : index + 1])
+                    return
+        self._scanned = len(text)
+
+    def _close_value(self, candidate: str) -> None:
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            data = None
+        requests = as_tool_requests(data)
+        if requests:
+            self.tool_requests = requests
+        else:
+            # Balanced but not a tool call: keep buffering and let `finish`
+            # release the whole reply as a plain answer.
+            self._mode = "buffered"
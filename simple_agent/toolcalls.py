@@ -0,0 +1,94 @@
+"""Single-pass extraction of JSON tool requests from model replies."""
+
+from __future__ import annotations
+
+import json
+from typing import List
+
+JSON_OPENERS = "{["
+WHITESPACE = " \t\r\n"
+TOOL_KEY = '"tool"'
+MAX_ENCLOSING_ATTEMPTS = 8  # `{` positions tried per key before giving up on it
+
+_DECODER = json.JSONDecoder()
+
+
+def extract_tool_requests(text: str) -> List[dict] | None:
+    """Return the tool requests in a model reply, or None for a plain answer.
+
+    A reply that starts with `{` or `[` is decoded in place. Every other
+    reply goes through C-level searches only: replies without a `{` are
+    plain answers, and so are replies with no `"tool"` key after their first
+    `{`. The single-character search runs at memchr speed, so long
+    natural-language answers are rejected without decoding anything or
+    raising a single exception. Otherwise the object around each key is
+    decoded with `raw_decode`, which stops at the end of the balanced value.
+    This finds requests in code fences and in prose, and ignores trailing
+    text. When the object is one item of an array of requests, the whole
+    array is returned.
+    """
+
+    start = 0
+    while start < len(text) and text[start] in WHITESPACE:
+        start += 1
+    if start < len(text) and text[start] in JSON_OPENERS:
+        requests = _decode_at(text, start)
+        if requests:
+            return requests
+
+    brace = text.find("{")
+    if brace == -1:
+        return None
+    key = text.find(TOOL_KEY, brace)
+    while key != -1:
+        requests = _enclosing_requests(text, key)
+        if requests:
+            return requests
+        key = text.find(TOOL_KEY, key + len(TOOL_KEY))
+    return None
+
+
+def as_tool_requests(data: object) -> List[dict] | None:
+    """`data` as a list of requests if it is one request or a non-empty array of them."""
+
+    if isinstance(data, dict) and "tool" in data:
+        return [data]
+    if isinstance(data, list) and data and all(isinstance(item, dict) and "tool" in item for item in data):
+        return data
+    return None
+
+
+def _enclosing_requests(text: str, key: int) -> List[dict] | None:
+    """Decode the object whose `"tool"` key sits at `key`, trying the nearest `{` first."""
+
+    brace = text.rfind("{", 0, key)
+    for _ in range(MAX_ENCLOSING_ATTEMPTS):
+        if brace == -1:
+            return None
+        before = brace - 1
+        while before >= 0 and text[before] in WHITESPACE:
+            before -= 1
+        if before >= 0 and text[before] == "[":
+            # Prefer the whole array when the object is one of several requests.
+            requests = _decode_at(text, before)
+            if requests:
+                return requests
+        try:
+            data, end = _DECODER.raw_decode(text, brace)
+        except json.JSONDecodeError:
+            data, end = None, -1
+        if end > key:
+            # The nearest `{` may open a nested value instead; only an object spanning the key counts.
+            requests = as_tool_requests(data)
+            if requests:
+                return requests
+        brace = text.rfind("{", 0, brace)
+    return None
+
+
+def _decode_at(text: str, index: int) -> List[dict] | None:
+    try:
+        data, _ = _DECODER.raw_decode(text, index)
+    except json.JSONDecodeError:
+        return None
+    return as_tool_requests(data)
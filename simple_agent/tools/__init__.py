@@ -2,31 +2,153 @@
 
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Callable, Dict, List
 
 from .base import Tool
-from .file_read_tool import FileReadTool
-from .math_tool import MathTool
-from .python_tool import PythonSandboxTool
-from .time_tool import TimeTool
+from .catalog import (
+    CALCULATOR_DESCRIPTION,
+    FILE_READER_DESCRIPTION,
+    FILE_SEARCH_DESCRIPTION,
+    TIME_DESCRIPTION,
+    python_description,
+)
+from .registry import LazyTool, ToolInfo, ToolRegistry
 
 if TYPE_CHECKING:  # pragma: no cover
     from ..config import Settings
 
+ToolBuilder = Callable[["Settings | None"], Tool]
+
+
+def _time_tool(settings: "Settings | None") -> Tool:
+    from .time_tool import TimeTool
+
+    return TimeTool()
+
+
+def _math_tool(settings: "Settings | None") -> Tool:
+    from .math_tool import MathTool
+
+    return MathTool()
+
+
+def _file_read_tool(settings: "Settings | None") -> Tool:
+    from .file_read_tool import FileReadTool
+
+    return FileReadTool()
+
+
+def _file_search_tool(settings: "Settings | None") -> Tool:
+    from .file_search_tool import FileSearchTool
+
+    if settings is None:
+        return FileSearchTool()
+    return FileSearchTool(index_path=settings.file_search_index, refresh_interval=settings.file_search_refresh)
+
+
+def _python_tool(settings: "Settings | None") -> Tool:
+    from .python_tool import DEFAULT_ALLOWED_IMPORTS, PythonSandboxTool
+    from .sandbox_limits import SandboxLimits
+    from .sandbox_pool import SandboxWorkerPool
+
+    if settings is None:
+        return PythonSandboxTool()
+
+    allowed_imports = set(settings.python_tool_imports)
+    limits = SandboxLimits(
+        cpu_seconds=settings.python_tool_cpu_limit,
+        memory_mb=settings.python_tool_memory_limit_mb,
+        file_size_mb=settings.python_tool_file_size_limit_mb,
+        output_bytes=settings.python_tool_output_limit,
+    )
+    pool = None
+    if settings.python_tool_pool_size > 0:
+        pool = SandboxWorkerPool(
+            settings.python_tool_pool_size,
+            warm_imports=settings.python_tool_warm_imports or sorted(DEFAULT_ALLOWED_IMPORTS | allowed_imports),
+            max_runs=settings.python_tool_worker_max_runs,
+            max_memory_mb=settings.python_tool_worker_max_memory_mb,
+            limits=limits,
+        )
+    return PythonSandboxTool(
+        extra_allowed_imports=allowed_imports,
+        pool=pool,
+        sessions=settings.python_tool_sessions,
+        session_idle_timeout=settings.python_tool_session_idle_timeout,
+        session_max_memory_mb=settings.python_tool_session_max_memory_mb,
+        limits=limits,
+    )
+
+
+def _describe(name: str, settings: "Settings | None") -> str:
+    if name == "python":
+        return python_description(bool(settings and settings.python_tool_sessions))
+    return BUILTIN_DESCRIPTIONS[name]
+
+
+# Built-in tools in the order they are offered to the model. Each builder
+# imports its tool module when called. `load_default_tools` defers the call
+# until the model first uses the tool, so importing this package,
+# `--list-tools` and runs that never touch a tool stay cheap.
+BUILTIN_TOOLS: Dict[str, ToolBuilder] = {
+    "time": _time_tool,
+    "calculator": _math_tool,
+    "file_reader": _file_read_tool,
+    "file_search": _file_search_tool,
+    "python": _python_tool,
+}
+BUILTIN_DESCRIPTIONS: Dict[str, str] = {
+    "time": TIME_DESCRIPTION,
+    "calculator": CALCULATOR_DESCRIPTION,
+    "file_reader": FILE_READER_DESCRIPTION,
+    "file_search": FILE_SEARCH_DESCRIPTION,
+}
+
 
 def load_default_tools(settings: "Settings | None" = None) -> List[Tool]:
-    """Return the default toolset used by the CLI."""
+    """Return the default toolset used by the CLI.
 
-    allowed_imports = None
-    if settings and settings.python_tool_imports:
-        allowed_imports = set(settings.python_tool_imports)
+    Every tool is a `LazyTool`, built on its first `run`: built-in tools are
+    described from `catalog`, plugin tools from the registry's metadata.
+    Plugin tools follow the built-in ones unless `TOOL_PLUGINS` is off.
+    A plugin cannot replace a built-in tool of the same name. Tools named in
+    `TOOL_CACHE` are wrapped in `MemoizedTool`.
+    """
 
-    return [
-        TimeTool(),
-        MathTool(),
-        FileReadTool(),
-        PythonSandboxTool(extra_allowed_imports=allowed_imports),
+    tools: List[Tool] = [
+        LazyTool(ToolInfo(name, _describe(name, settings), f"builtin:{name}"), partial(build, settings))
+        for name, build in BUILTIN_TOOLS.items()
     ]
+    if settings is None or settings.tool_plugins:
+        registry = plugin_registry(settings.tool_metadata_cache if settings else None)
+        builtin = set(BUILTIN_TOOLS)
+        tools.extend(tool for tool in registry.tools() if tool.name not in builtin)
+    if settings is not None and settings.tool_cache:
+        from .memo import memoize_tools
+
+        tools = memoize_tools(
+            tools,
+            settings.tool_cache,
+            max_entries=settings.tool_cache_max_entries,
+            ttl=settings.tool_cache_ttl,
+        )
+    return tools
+
+
+@lru_cache(maxsize=None)
+def plugin_registry(cache_path: str | None = None) -> ToolRegistry:
+    """The process-wide registry for `cache_path`, so discovery runs once per process."""
+
+    return ToolRegistry(cache_path)
 
 
-__all__ = ["Tool", "load_default_tools"]
+__all__ = [
+    "BUILTIN_TOOLS",
+    "LazyTool",
+    "Tool",
+    "ToolInfo",
+    "ToolRegistry",
+    "load_default_tools",
+    "plugin_registry",
+]
@@ -3,7 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol
+from typing import ClassVar, Literal, Protocol
+
+# How a tool's results may be memoized (see `tools.memo`):
+# "pure" results depend only on the query, "files" results also depend on the
+# files returned by the tool's `cache_files(query)`, and "never" results must
+# always be recomputed.
+CachePolicy = Literal["pure", "files", "never"]
 
 
 class Tool(Protocol):
@@ -22,3 +28,4 @@ class SimpleTool:
 
     name: str
     description: str
+    cache_policy: ClassVar[CachePolicy] = "never"
@@ -0,0 +1,32 @@
+"""Names and descriptions of the built-in tools.
+
+They live apart from the tool modules so the agent can advertise every
+built-in tool without importing it. Each tool class takes its description
+from here, so the two cannot drift apart.
+"""
+
+from __future__ import annotations
+
+TIME_DESCRIPTION = "Returns the current UTC time in ISO-8601 format."
+CALCULATOR_DESCRIPTION = (
+    "Evaluates math like '2 * (3 + 4)' or 'sqrt(2) * log(10, 2)' using math functions "
+    "(sqrt, exp, log, sin, hypot, factorial, min, max, sum, ...) and constants (pi, e). "
+    'Variables: {"expression": "x ** 2 + y", "variables": {"x": 3, "y": 1}}. '
+    'Many values at once: {"expression": "x ** 2 + y", "batch": {"x": [1, 2, 3], "y": 1}}.'
+)
+FILE_READER_DESCRIPTION = "Read a local text file. Format: 'path/to/file[:start-end]'."
+FILE_SEARCH_DESCRIPTION = (
+    "Find lines in local text files. Format: 'text' for a case-sensitive substring, "
+    "'/regex/' for a regular expression or '/regex/i' to ignore case. "
+    "Returns path:line matches to open with file_reader."
+)
+PYTHON_DESCRIPTION = "Run Python code in a sandboxed interpreter. Provide raw code; stdout is returned."
+PYTHON_SESSION_NOTE = " Variables, functions and imports persist between calls in this conversation."
+
+# Built-in tools whose `cache_policy` is "never", so `TOOL_CACHE` can skip
+# them without building them.
+UNCACHEABLE_TOOLS = frozenset({"time", "file_search"})
+
+
+def python_description(sessions: bool) -> str:
+    return PYTHON_DESCRIPTION + PYTHON_SESSION_NOTE if sessions else PYTHON_DESCRIPTION
@@ -2,21 +2,28 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
+from typing import ClassVar, List
 
-from .base import SimpleTool
+from .base import CachePolicy, SimpleTool
+from .catalog import FILE_READER_DESCRIPTION
+from .line_index import LineIndexCache, read_lines
+
+DEFAULT_LINES = 80
+READ_ERROR = "Could not read "
 
 
 class FileReadTool(SimpleTool):
     """Reads text files relative to the repo, optionally with a line range."""
 
+    cache_policy: ClassVar[CachePolicy] = "files"
+
     def __init__(self, base_dir: Path | None = None, *, max_chars: int = 4000) -> None:
-        super().__init__(
-            name="file_reader",
-            description="Read a local text file. Format: 'path/to/file[:start-end]'.",
-        )
+        super().__init__(name="file_reader", description=FILE_READER_DESCRIPTION)
         self.base_dir = Path(base_dir or Path.cwd()).resolve()
         self.max_chars = max_chars
+        self._indexes = LineIndexCache()
 
     def run(self, query: str) -> str:
         query = query.strip()
@@ -33,24 +40,19 @@ class FileReadTool(SimpleTool):
         if target.is_dir():
             return f"'{path_str}' is a directory."
 
-        try:
-            text = target.read_text(encoding="utf-8", errors="replace")
-        except UnicodeDecodeError:
-            return "File does not appear to be UTF-8 text."
-
-        lines = text.splitlines()
-        snippet: str
-
         if sep:
             start_line, end_line = _parse_range(range_str)
             if start_line is None:
                 return "Invalid range. Use integers like :10-30."
             start_idx = max(start_line - 1, 0)
             end_idx = end_line if end_line is not None else start_idx + 40
-            snippet_lines = lines[start_idx:end_idx]
-            snippet = "\n".join(snippet_lines)
         else:
-            snippet = "\n".join(lines[:80])
+            start_idx, end_idx = 0, DEFAULT_LINES
+
+        try:
+            snippet = self._read_window(target, start_idx, end_idx)
+        except OSError as exc:
+            return f"{READ_ERROR}{path_str}: {exc}"
 
         snippet = snippet.strip()
         if len(snippet) > self.max_chars:
@@ -58,6 +60,39 @@ class FileReadTool(SimpleTool):
 
         return f"{path_str}:\n{snippet or '(file empty)'}"
 
+    def cache_files(self, query: str) -> List[Path]:
+        """The file a query reads, so memoized results are dropped when it changes."""
+
+        path_str = query.strip().partition(":")[0]
+        return [(self.base_dir / path_str).resolve()]
+
+    def cacheable_output(self, output: str) -> bool:
+        # I/O errors can be transient (permissions, a file being replaced), unlike "not found".
+        return not output.startswith(READ_ERROR)
+
+    def _read_window(self, target: Path, start_idx: int, end_idx: int) -> str:
+        """Return lines `[start_idx, end_idx)` without loading the whole file.
+
+        Reads seek from the nearest cached checkpoint, so memory stays flat and
+        repeated windows into the same large file cost O(window).
+        """
+
+        count = end_idx - start_idx
+        if count <= 0:
+            return ""
+        with open(target, "rb") as handle:
+            index = self._indexes.get(target, os.fstat(handle.fileno()))
+            if not index.seek_line(handle, start_idx):
+                return ""
+            # UTF-8 needs at most 4 bytes per character; the slack covers stripped whitespace.
+            data = read_lines(handle, count, self.max_chars * 4 + 4096)
+        # Split on "\n" only, like the line index and file_search; splitlines() would
+        # also break on form feeds, lone CRs and other separators inside a line.
+        lines = data.decode("utf-8", errors="replace").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return "\n".join(line.removesuffix("\r") for line in lines[:count])
+
 
 def _parse_range(range_str: str) -> tuple[int | None, int | None]:
     if not range_str:
@@ -0,0 +1,114 @@
+"""Tool for finding text in local files by substring or regular expression."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+from .base import SimpleTool
+from .catalog import FILE_SEARCH_DESCRIPTION
+from .search_index import TrigramIndex, literal_trigrams, regex_trigrams
+
+MAX_LINE_CHARS = 200
+
+
+class FileSearchTool(SimpleTool):
+    """Searches text files under `base_dir` and returns `path:line: text` matches.
+
+    A trigram index narrows each search to files that can possibly match, so
+    only those are read. The index is stored at `index_path` (in memory when
+    unset) and refreshed incrementally at most every `refresh_interval`
+    seconds, so files created or edited in between may be missed until the
+    next refresh.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path | None = None,
+        *,
+        index_path: str | Path | None = None,
+        refresh_interval: float = 10.0,
+        max_results: int = 50,
+    ) -> None:
+        super().__init__(name="file_search", description=FILE_SEARCH_DESCRIPTION)
+        self.base_dir = Path(base_dir or Path.cwd()).resolve()
+        self.index_path = index_path
+        self.refresh_interval = refresh_interval
+        self.max_results = max_results
+        self._index: TrigramIndex | None = None
+        self._refreshed_at: float | None = None
+        self._lock = threading.Lock()
+
+    def run(self, query: str) -> str:
+        query = query.strip()
+        if not query:
+            return "Provide text to find, or a pattern like /def \\w+_tool/."
+
+        try:
+            pattern, trigrams = _compile(query)
+        except re.error as exc:
+            return f"Invalid regular expression: {exc}"
+
+        try:
+            candidates = self._fresh_index().candidates(trigrams)
+        except sqlite3.Error as exc:
+            # E.g. the shared index stayed locked by another process past the busy timeout.
+            return f"File search index is unavailable: {exc}"
+        matches: List[str] = []
+        for relative in candidates:
+            try:
+                text = (self.base_dir / relative).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            # Number lines by "\n" like file_reader does, so matches can be opened there.
+            for number, line in enumerate(text.split("\n"), start=1):
+                if pattern.search(line):
+                    matches.append(f"{relative}:{number}: {_clip(line.strip())}")
+                    if len(matches) >= self.max_results:
+                        matches.append(f"(stopped after {self.max_results} matches; narrow the pattern)")
+                        return "\n".join(matches)
+
+        if not matches:
+            return f"No matches for {query}."
+        return "\n".join(matches)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+    def _fresh_index(self) -> TrigramIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = TrigramIndex(self.base_dir, self.index_path)
+            now = time.monotonic()
+            if self._refreshed_at is None or now - self._refreshed_at >= self.refresh_interval:
+                self._index.refresh()
+                self._refreshed_at = now
+            return self._index
+
+
+def _compile(query: str) -> tuple[re.Pattern[str], set[bytes]]:
+    """Turn a tool query into a line pattern plus the trigrams a match needs."""
+
+    if len(query) > 2 and query.startswith("/"):
+        body, slash, flags = query[1:].rpartition("/")
+        if slash and body and flags in {"", "i"}:
+            pattern = re.compile(body, re.IGNORECASE if flags else 0)
+            trigrams = regex_trigrams(body)
+            if pattern.flags & re.IGNORECASE:
+                # bytes.lower() only folds ASCII, so other trigrams could reject real matches.
+                trigrams = {trigram for trigram in trigrams if trigram.isascii()}
+            return pattern, trigrams
+    return re.compile(re.escape(query)), literal_trigrams(query)
+
+
+def _clip(line: str) -> str:
+    if len(line) <= MAX_LINE_CHARS:
+        return line
+    return f"{line[:MAX_LINE_CHARS]}…"
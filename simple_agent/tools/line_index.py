@@ -0,0 +1,122 @@
+"""Sparse line-offset index for windowed reads from large text files."""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+CHUNK_SIZE = 1 << 18  # bytes read per step while building the index
+CHECKPOINT_BYTES = 1 << 14  # spacing between checkpoints, which bounds the scan per seek
+
+
+class LineIndex:
+    """Checkpoints of (newlines seen, byte offset) every `CHECKPOINT_BYTES` bytes.
+
+    The index is extended lazily, only as deep as the furthest line asked
+    for, so reading the head of a huge file never scans the rest of it.
+    Seeking to any line then costs one checkpoint lookup plus a scan of at
+    most `CHECKPOINT_BYTES`. A 4 GB file needs about 4 MB of checkpoints.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._lines = array("q", [0])
+        self._offsets = array("q", [0])
+        self._lock = threading.Lock()
+
+    def seek_line(self, handle: BinaryIO, line: int) -> bool:
+        """Position `handle` at the start of 0-based `line`; False if past EOF."""
+
+        with self._lock:
+            self._extend(handle, line)
+            # Rightmost checkpoint strictly before the target line (or the file start).
+            index = max(bisect.bisect_left(self._lines, line) - 1, 0)
+            seen, offset = self._lines[index], self._offsets[index]
+        handle.seek(offset)
+        return _skip_lines(handle, line - seen)
+
+    def _extend(self, handle: BinaryIO, line: int) -> None:
+        offset = self._offsets[-1]
+        seen = self._lines[-1]
+        if seen >= line or offset >= self.size:
+            return
+        handle.seek(offset)
+        while seen < line and offset < self.size:
+            chunk = handle.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            for start in range(0, len(chunk), CHECKPOINT_BYTES):
+                end = min(start + CHECKPOINT_BYTES, len(chunk))
+                seen += chunk.count(b"\n", start, end)
+                self._lines.append(seen)
+                self._offsets.append(offset + end)
+            offset += len(chunk)
+
+
+class LineIndexCache:
+    """LRU of `LineIndex` objects keyed by path, invalidated on mtime or size change."""
+
+    def __init__(self, max_files: int = 32) -> None:
+        self.max_files = max_files
+        self._entries: OrderedDict[Path, tuple[int, int, LineIndex]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, stat: os.stat_result) -> LineIndex:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                return entry[2]
+            index = LineIndex(stat.st_size)
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, index)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_files:
+                self._entries.popitem(last=False)
+            return index
+
+
+def read_lines(handle: BinaryIO, count: int, byte_limit: int) -> bytes:
+    """Read up to `count` lines from the current position, stopping after `byte_limit` bytes."""
+
+    chunks: list[bytes] = []
+    total = 0
+    remaining = count
+    while remaining > 0 and total < byte_limit:
+        chunk = handle.read(min(CHUNK_SIZE, byte_limit - total))
+        if not chunk:
+            break
+        newlines = chunk.count(b"\n")
+        if newlines >= remaining:
+            chunk = chunk[: _nth_newline(chunk, remaining) + 1]
+            remaining = 0
+        else:
+            remaining -= newlines
+        chunks.append(chunk)
+        total += len(chunk)
+    return b"".join(chunks)
+
+
+def _skip_lines(handle: BinaryIO, count: int) -> bool:
+    while count > 0:
+        start = handle.tell()
+        chunk = handle.read(CHECKPOINT_BYTES)
+        if not chunk:
+            return False
+        newlines = chunk.count(b"\n")
+        if newlines >= count:
+            handle.seek(start + _nth_newline(chunk, count) + 1)
+            return True
+        count -= newlines
+    return True
+
+
+def _nth_newline(chunk: bytes, n: int) -> int:
+    position = -1
+    for _ in range(n):
+        position = chunk.find(b"\n", position + 1)
+    return position
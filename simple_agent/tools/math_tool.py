@@ -3,47 +3,398 @@
 from __future__ import annotations
 
 import ast
+import itertools
+import json
+import math
 import operator as op
-from typing import Any, Mapping
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Dict, List, Mapping, Sequence
 
-from .base import SimpleTool
+from .base import CachePolicy, SimpleTool
+from .catalog import CALCULATOR_DESCRIPTION
+
+MAX_BATCH_ROWS = 10_000
+MAX_EXPRESSION_CHARS = 5_000
+MAX_NODES = 1_000  # operators, calls and operands per expression
+MAX_INT_BITS = 10_000  # about 3000 digits, below the 4300-digit str() limit
+MAX_ROUND_DIGITS = 1_000
+MAX_EXACT_FLOAT_INT = 2**53  # larger ints lose precision as float64
+EVALUATION_ERROR = "Could not evaluate expression: "
+
+Scope = Mapping[str, Any]
+Evaluator = Callable[[Scope], Any]
 
 
 class MathTool(SimpleTool):
-    """Evaluates simple arithmetic expressions."""
+    """Evaluates arithmetic with `math` functions, optionally over variable bindings.
+
+    Evaluation runs in-process, so every operation is bounded: integer
+    results are capped at `MAX_INT_BITS` before they are computed and an
+    expression may have at most `MAX_NODES` nodes. A batch may take at most
+    `max_steps` node evaluations and, when set, `timeout` seconds.
+    """
+
+    cache_policy: ClassVar[CachePolicy] = "pure"
 
-    def __init__(self) -> None:
-        super().__init__(name="calculator", description="Evaluates basic arithmetic expressions like '2 * (3 + 4)'.")
+    def __init__(self, *, max_steps: int | None = 1_000_000, timeout: float | None = None) -> None:
+        super().__init__(name="calculator", description=CALCULATOR_DESCRIPTION)
+        self.max_steps = max_steps
+        self.timeout = timeout
 
     def run(self, query: str) -> str:
-        expression = query.strip()
-        if not expression:
+        query = query.strip()
+        if not query:
             return "No expression provided."
 
         try:
-            node = ast.parse(expression, mode="eval").body
-            value = _safe_eval(node)
-            return str(value)
+            if not query.startswith("{"):
+                return str(compile_expression(query).evaluate())
+            request = json.loads(query)
+            compiled = compile_expression(str(request.get("expression", "")).strip())
+            if "batch" in request:
+                results = compiled.evaluate_batch(request["batch"], max_steps=self.max_steps, timeout=self.timeout)
+                return json.dumps(results)
+            return str(compiled.evaluate(request.get("variables") or {}))
         except Exception as exc:  # pylint: disable=broad-except
-            return f"Could not evaluate expression: {exc}"
+            return f"{EVALUATION_ERROR}{exc}"
+
+    def cacheable_output(self, output: str) -> bool:
+        # Errors include batch timeouts, which a retry under less load may not hit.
+        return not output.startswith(EVALUATION_ERROR)
+
+
+def _too_large() -> ValueError:
+    return ValueError(f"Integer result would exceed {MAX_INT_BITS} bits (about {MAX_INT_BITS * 3 // 10} digits).")
+
+
+def _checked_int(value: Any) -> Any:
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise _too_large()
+    return value
+
+
+def _arithmetic(function: Callable[[Any, Any], Any], bits: Callable[[int, int], float] | None = None):
+    """Wrap a binary operator so list operands and oversized integer results fail before any work.
+
+    `bits` predicts the bit length of an int-by-int result from the operands.
+    """
+
+    def apply(left: Any, right: Any) -> Any:
+        if isinstance(left, list) or isinstance(right, list):
+            raise TypeError("Lists can only be passed to functions such as sum() or max().")
+        if bits is not None and type(left) is int and type(right) is int and bits(left, right) > MAX_INT_BITS:
+            raise _too_large()
+        return function(left, right)
+
+    return apply
+
+
+def _sum_bits(left: int, right: int) -> float:
+    return max(left.bit_length(), right.bit_length()) + 1
+
+
+def _product_bits(left: int, right: int) -> float:
+    return left.bit_length() + right.bit_length()
+
+
+def _power_bits(base: int, exponent: int) -> float:
+    if exponent <= 0 or abs(base) <= 1:
+        return 0  # a negative exponent produces a float
+    return math.floor(exponent * math.log2(abs(base))) + 1
+
+
+def _log2_factorial(value: int) -> float:
+    if value < 2:
+        return 0.0
+    if value.bit_length() > 64:
+        return math.inf
+    return math.lgamma(value + 1) / math.log(2)
+
+
+def _guarded(function: Callable[..., Any], bits: Callable[..., float]) -> Callable[..., Any]:
+    """Wrap a `math` function with a result-size estimate checked before calling it."""
+
+    def call(*args: Any) -> Any:
+        if all(type(arg) is int for arg in args) and bits(*args) > MAX_INT_BITS:
+            raise _too_large()
+        return function(*args)
+
+    return call
+
+
+def _comb_bits(n: int, k: int) -> float:
+    if not 0 <= k <= n:
+        return 0.0
+    return _log2_factorial(n) - _log2_factorial(k) - _log2_factorial(n - k)
+
+
+def _perm_bits(n: int, k: int | None = None) -> float:
+    if k is None:
+        return _log2_factorial(n)
+    if not 0 <= k <= n:
+        return 0.0
+    return _log2_factorial(n) - _log2_factorial(n - k)
+
+
+def _checked_prod(values: Sequence[Any]) -> Any:
+    multiply = ALLOWED_OPERATORS[ast.Mult]
+    result: Any = 1
+    for value in values:
+        result = multiply(result, value)
+    return result
+
+
+def _checked_round(value: Any, ndigits: int | None = None) -> Any:
+    if ndigits is not None and abs(ndigits) > MAX_ROUND_DIGITS:
+        raise ValueError(f"round() digits are limited to {MAX_ROUND_DIGITS}.")
+    return round(value, ndigits)
 
 
 ALLOWED_OPERATORS: Mapping[type[Any], Any] = {
-    ast.Add: op.add,
-    ast.Sub: op.sub,
-    ast.Mult: op.mul,
-    ast.Div: op.truediv,
-    ast.Pow: op.pow,
-    ast.Mod: op.mod,
+    ast.Add: _arithmetic(op.add, _sum_bits),
+    ast.Sub: _arithmetic(op.sub, _sum_bits),
+    ast.Mult: _arithmetic(op.mul, _product_bits),
+    ast.Div: _arithmetic(op.truediv),
+    ast.FloorDiv: _arithmetic(op.floordiv),
+    ast.Pow: _arithmetic(op.pow, _power_bits),
+    ast.Mod: _arithmetic(op.mod),
     ast.USub: op.neg,
+    ast.UAdd: op.pos,
+}
+
+FUNCTIONS: Mapping[str, Callable[..., Any]] = {
+    **{
+        name: getattr(math, name)
+        for name in (
+            "sqrt", "cbrt", "exp", "log", "log2", "log10", "log1p", "expm1",
+            "sin", "cos", "tan", "asin", "acos", "atan", "atan2", "sinh", "cosh", "tanh",
+            "hypot", "degrees", "radians", "floor", "ceil", "trunc", "fabs", "fmod",
+            "gcd", "isqrt", "erf", "gamma", "lgamma", "fsum", "dist",
+        )
+        if hasattr(math, name)
+    },
+    "factorial": _guarded(math.factorial, _log2_factorial),
+    "comb": _guarded(math.comb, _comb_bits),
+    "perm": _guarded(math.perm, _perm_bits),
+    "lcm": _guarded(math.lcm, lambda *args: sum(arg.bit_length() for arg in args)),
+    "prod": _checked_prod,
+    "abs": abs,
+    "round": _checked_round,
+    "min": min,
+    "max": max,
+    "sum": sum,
 }
 
+CONSTANTS: Mapping[str, float] = {"pi": math.pi, "e": math.e, "tau": math.tau, "inf": math.inf, "nan": math.nan}
+
+# Elementwise NumPy counterparts; expressions using anything else are evaluated row by row.
+# All of them but `abs` return floats, like their `math` versions. `floor`, `ceil`, `trunc`
+# and `round` are left out because `math` returns ints for them.
+NUMPY_FUNCTIONS = (
+    "sqrt", "cbrt", "exp", "log2", "log10", "log1p", "expm1", "sin", "cos", "tan", "sinh", "cosh", "tanh",
+    "hypot", "degrees", "radians", "fabs", "fmod", "abs",
+)
+_NUMPY_ALIASES = {"asin": "arcsin", "acos": "arccos", "atan": "arctan", "atan2": "arctan2"}
+# NumPy rounds `//` and `%` on floats differently from Python in edge cases (e.g. `1 // 0.1`).
+_ROW_ONLY_NODES = (ast.List, ast.Tuple, ast.FloorDiv, ast.Mod)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledExpression:
+    """A validated expression compiled to nested closures, ready to evaluate repeatedly."""
+
+    expression: str
+    variables: frozenset[str]
+    functions: frozenset[str]
+    vectorizable: bool
+    steps: int
+    float_result: bool
+    _evaluate: Evaluator
+
+    def evaluate(self, variables: Mapping[str, Any] | None = None) -> Any:
+        return self._evaluate(self._scope(variables or {}))
+
+    def evaluate_batch(
+        self,
+        batch: Mapping[str, Any] | Sequence[Mapping[str, Any]],
+        *,
+        max_steps: int | None = None,
+        timeout: float | None = None,
+    ) -> List[Any]:
+        """Evaluate once per row of bindings.
+
+        `batch` maps each variable to a list of values (scalars are repeated for
+        every row) or is a list of per-row mappings. When NumPy is installed and
+        the expression only uses elementwise functions, all rows are computed
+        in one vectorized pass in float64. That pass is skipped when it could
+        change a result's type or value: for `//`, `%` and int-returning
+        functions, and for int inputs unless the expression always yields a
+        float and the ints fit float64 exactly. A batch needing more than
+        `max_steps` node evaluations is refused up front; `timeout` is checked
+        between rows.
+        """
+
+        columns, rows = _columns(batch)
+        missing = self.variables - columns.keys()
+        if missing:
+            raise ValueError(f"Missing values for {', '.join(sorted(missing))}.")
+        if max_steps is not None and self.steps * rows > max_steps:
+            raise ValueError(f"Batch needs {self.steps * rows} steps; the limit is {max_steps}.")
+        if self.vectorizable and rows > 1:
+            result = _evaluate_numpy(self, columns, rows)
+            if result is not None:
+                return result
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        results = []
+        for index in range(rows):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Batch timed out after {index} of {rows} rows ({timeout}s limit).")
+            results.append(self._evaluate(self._scope({name: values[index] for name, values in columns.items()})))
+        return results
+
+    def _scope(self, variables: Mapping[str, Any]) -> Dict[str, Any]:
+        missing = self.variables - variables.keys()
+        if missing:
+            raise ValueError(f"Missing values for {', '.join(sorted(missing))}.")
+        scope = {name: FUNCTIONS[name] for name in self.functions}
+        for name in self.variables:
+            scope[name] = _number(name, variables[name])
+        return scope
+
 
-def _safe_eval(node: ast.AST) -> Any:
-    if isinstance(node, ast.Num):  # type: ignore[attr-defined]
-        return node.n  # type: ignore[attr-defined]
+@lru_cache(maxsize=256)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse, validate and compile `expression`; repeated expressions hit the cache."""
+
+    if not expression:
+        raise ValueError("No expression provided.")
+    if len(expression) > MAX_EXPRESSION_CHARS:
+        raise ValueError(f"Expression is longer than {MAX_EXPRESSION_CHARS} characters.")
+    tree = ast.parse(expression, mode="eval")
+    # Stop counting at the first node over the limit; huge trees are refused without a full walk.
+    steps = sum(1 for _ in itertools.islice(ast.walk(tree.body), MAX_NODES + 1))
+    if steps > MAX_NODES:
+        raise ValueError(f"Expression has more than {MAX_NODES} nodes.")
+    variables: set[str] = set()
+    functions: set[str] = set()
+    evaluate = _compile(tree.body, variables, functions)
+    # Lists only feed functions like sum() or max(); NumPy would broadcast them instead.
+    vectorizable = all(name in NUMPY_FUNCTIONS or name in _NUMPY_ALIASES for name in functions) and not any(
+        isinstance(node, _ROW_ONLY_NODES) for node in ast.walk(tree)
+    )
+    return CompiledExpression(
+        expression,
+        frozenset(variables),
+        frozenset(functions),
+        vectorizable,
+        steps,
+        vectorizable and _float_result(tree.body),
+        evaluate,
+    )
+
+
+def _compile(node: ast.AST, variables: set[str], functions: set[str]) -> Evaluator:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = _checked_int(node.value)
+        return lambda scope: value
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in CONSTANTS:
+            constant = CONSTANTS[name]
+            return lambda scope: constant
+        if name in FUNCTIONS:
+            raise ValueError(f"'{name}' is a function; call it like {name}(x).")
+        variables.add(name)
+        return lambda scope: scope[name]
     if isinstance(node, ast.UnaryOp) and type(node.op) in ALLOWED_OPERATORS:
-        return ALLOWED_OPERATORS[type(node.op)](_safe_eval(node.operand))
+        unary = ALLOWED_OPERATORS[type(node.op)]
+        operand = _compile(node.operand, variables, functions)
+        return lambda scope: unary(operand(scope))
     if isinstance(node, ast.BinOp) and type(node.op) in ALLOWED_OPERATORS:
-        return ALLOWED_OPERATORS[type(node.op)](_safe_eval(node.left), _safe_eval(node.right))
+        binary = ALLOWED_OPERATORS[type(node.op)]
+        left = _compile(node.left, variables, functions)
+        right = _compile(node.right, variables, functions)
+        return lambda scope: binary(left(scope), right(scope))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        function = node.func.id
+        if function not in FUNCTIONS:
+            raise ValueError(f"Unknown function '{function}'.")
+        functions.add(function)
+        arguments = [_compile(argument, variables, functions) for argument in node.args]
+        return lambda scope: scope[function](*[argument(scope) for argument in arguments])
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [_compile(item, variables, functions) for item in node.elts]
+        return lambda scope: [item(scope) for item in items]
     raise ValueError("Unsupported expression.")
+
+
+def _float_result(node: ast.AST) -> bool:
+    """Whether a vectorizable expression gives a float on the row path whatever its inputs are."""
+
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, float)
+    if isinstance(node, ast.Name):
+        return isinstance(CONSTANTS.get(node.id), float)
+    if isinstance(node, ast.UnaryOp):
+        return _float_result(node.operand)
+    if isinstance(node, ast.BinOp):
+        return isinstance(node.op, ast.Div) or _float_result(node.left) or _float_result(node.right)
+    if isinstance(node, ast.Call):
+        return node.func.id != "abs" or any(_float_result(argument) for argument in node.args)  # type: ignore[attr-defined]
+    return False
+
+
+def _columns(batch: Mapping[str, Any] | Sequence[Mapping[str, Any]]) -> tuple[Dict[str, List[Any]], int]:
+    if isinstance(batch, Mapping):
+        lengths = {len(values) for values in batch.values() if isinstance(values, list)}
+        if len(lengths) > 1:
+            raise ValueError("Batch columns must have the same length.")
+        rows = lengths.pop() if lengths else 1
+        columns = {name: values if isinstance(values, list) else [values] * rows for name, values in batch.items()}
+    elif isinstance(batch, Sequence):
+        rows = len(batch)
+        names = set().union(*(row.keys() for row in batch)) if batch else set()
+        columns = {name: [row.get(name) for row in batch] for name in names}
+    else:
+        raise ValueError("'batch' must map names to lists of values or be a list of objects.")
+    if rows > MAX_BATCH_ROWS:
+        raise ValueError(f"Batches are limited to {MAX_BATCH_ROWS} rows.")
+    return columns, rows
+
+
+def _evaluate_numpy(compiled: CompiledExpression, columns: Mapping[str, List[Any]], rows: int) -> List[Any] | None:
+    """Vectorized evaluation; None means fall back to the row-by-row loop."""
+
+    try:
+        import numpy as np  # optional: pip install simple-agent[numeric]
+    except ImportError:
+        return None
+
+    scope: Dict[str, Any] = {}
+    for name in compiled.functions:
+        scope[name] = getattr(np, _NUMPY_ALIASES.get(name, name))
+    try:
+        for name in compiled.variables:
+            values = [_number(name, value) for value in columns[name]]
+            # Ints stay ints on the row path (`x * 2`), and large ones would be rounded here.
+            if any(
+                type(value) is int and (not compiled.float_result or abs(value) > MAX_EXACT_FLOAT_INT)
+                for value in values
+            ):
+                return None
+            scope[name] = np.asarray(values, dtype=np.float64)
+        # Raise instead of producing inf/nan so the loop reports the failing row like math would.
+        with np.errstate(all="raise"):
+            result = compiled._evaluate(scope)
+        return np.broadcast_to(result, (rows,)).tolist()
+    except (ArithmeticError, TypeError, ValueError):
+        return None
+
+
+def _number(name: str, value: Any) -> Any:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Value for '{name}' must be a number, got {value!r}.")
+    return _checked_int(value)
+
@@ -0,0 +1,190 @@
+"""Memoization of tool results for tools that declare them reusable."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+from ..metrics import REGISTRY, MetricsRegistry
+from .base import CachePolicy, Tool
+from .catalog import UNCACHEABLE_TOOLS
+from .registry import LazyTool
+
+FileSignature = Tuple[Tuple[int, int] | None, ...]
+
+_logger = logging.getLogger(__name__)
+
+
+class MemoizedTool:
+    """Serves repeated queries to `tool` from a bounded LRU with a time-to-live.
+
+    Only tools that declare a `cache_policy` are memoized. For "pure" tools
+    the query is the whole key. For "files" tools each entry also records
+    the mtime and size of the files named by `tool.cache_files(query)`, and
+    an entry is used only while they are unchanged (a missing file counts
+    as a state too). A tool may also define `cacheable(query)` to opt single
+    queries out, and `cacheable_output(output)` to keep failures such as
+    timeouts out of the cache. Anything else, e.g. `TimeTool` or a plugin
+    with no policy, is run every time.
+
+    Hits, misses and bypassed calls are counted on the instance and in
+    `simple_agent_tool_cache_requests_total`. Concurrent misses on the same
+    query each run the tool.
+    """
+
+    __slots__ = (
+        "tool",
+        "name",
+        "description",
+        "max_entries",
+        "ttl",
+        "hits",
+        "misses",
+        "bypassed",
+        "_entries",
+        "_lock",
+        "_requests",
+        "_clock",
+    )
+
+    def __init__(
+        self,
+        tool: Tool,
+        *,
+        max_entries: int = 256,
+        ttl: float | None = 300.0,
+        registry: MetricsRegistry | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tool = tool
+        self.name = tool.name
+        self.description = tool.description
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._entries: OrderedDict[str, tuple[float | None, FileSignature, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = clock
+        registry = registry if registry is not None else REGISTRY
+        self._requests = registry.counter(
+            "simple_agent_tool_cache_requests_total",
+            "Tool calls by memoization outcome (hit, miss or bypass).",
+            ("tool", "result"),
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def run(self, query: str) -> str:
+        tool = self.tool.load() if isinstance(self.tool, LazyTool) else self.tool
+        policy = cache_policy(tool)
+        cacheable = getattr(tool, "cacheable", None)
+        if policy == "never" or (cacheable is not None and not cacheable(query)):
+            with self._lock:
+                self.bypassed += 1
+            self._requests.inc(tool=self.name, result="bypass")
+            return tool.run(query)
+
+        # Files are stat'ed before the run, so a change made during it invalidates the new entry.
+        signature = _file_signature(tool.cache_files(query)) if policy == "files" else ()  # type: ignore[attr-defined]
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is not None:
+                expires_at, stored_signature, output = entry
+                if (expires_at is None or expires_at > now) and stored_signature == signature:
+                    self._entries.move_to_end(query)
+                    self.hits += 1
+                    self._requests.inc(tool=self.name, result="hit")
+                    return output
+                del self._entries[query]
+            self.misses += 1
+        self._requests.inc(tool=self.name, result="miss")
+
+        output = tool.run(query)
+        cacheable_output = getattr(tool, "cacheable_output", None)
+        if cacheable_output is not None and not cacheable_output(output):
+            return output
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[query] = (expires_at, signature, output)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return output
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        close = getattr(self.tool, "close", None)
+        if close is not None:
+            close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"MemoizedTool({self.tool!r}, hits={self.hits}, misses={self.misses})"
+
+
+def cache_policy(tool: Tool) -> CachePolicy:
+    """The policy `tool` declares; tools that declare none are never memoized."""
+
+    return getattr(tool, "cache_policy", "never")
+
+
+def memoize_tools(
+    tools: Iterable[Tool],
+    names: Sequence[str],
+    *,
+    max_entries: int = 256,
+    ttl: float | None = 300.0,
+) -> List[Tool]:
+    """Wrap the tools called `names` in `MemoizedTool`; `*` selects every tool.
+
+    Each tool gets its own LRU of `max_entries`. A selected tool that is
+    known never to be cacheable is left unwrapped, with a warning.
+    """
+
+    selected = set(names)
+    wrapped: List[Tool] = []
+    for tool in tools:
+        if "*" not in selected and tool.name not in selected:
+            wrapped.append(tool)
+        elif _never_cached(tool):
+            if tool.name in selected:
+                _logger.warning("Tool '%s' is not cacheable; TOOL_CACHE ignores it.", tool.name)
+            wrapped.append(tool)
+        else:
+            wrapped.append(MemoizedTool(tool, max_entries=max_entries, ttl=ttl))
+    return wrapped
+
+
+def _never_cached(tool: Tool) -> bool:
+    if isinstance(tool, LazyTool):
+        # A plugin's policy is only known once it is imported, so `MemoizedTool` checks it per call.
+        return tool.target.startswith("builtin:") and tool.name in UNCACHEABLE_TOOLS
+    return cache_policy(tool) == "never"
+
+
+def _file_signature(paths: Iterable[Path | str]) -> FileSignature:
+    signature: List[Tuple[int, int] | None] = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
@@ -2,45 +2,101 @@
 
 from __future__ import annotations
 
-import subprocess
 import ast
+import logging
 from textwrap import dedent
 
-from .base import SimpleTool
+from ..metrics import REGISTRY, MetricsRegistry
+from .base import CachePolicy, SimpleTool
+from .catalog import python_description
+from .run_context import current_run
+from .sandbox_limits import LIMITS_SOURCE, SandboxLimits, run_limited
+from .sandbox_pool import SandboxResult, SandboxSession, SandboxWorkerPool, WorkerTimeout
+
+RSS_BUCKETS = tuple(float(mb << 20) for mb in (16, 32, 64, 128, 256, 512, 1024, 2048))
+
+DEFAULT_ALLOWED_IMPORTS = frozenset(
+    {
+        "math",
+        "statistics",
+        "datetime",
+        "time",
+        "random",
+        "json",
+        "collections",
+        "itertools",
+        "functools",
+        "os",
+        "sys",
+        "pathlib",
+        "psutil",
+        "requests",
+        "bs4",
+    }
+)
+
+# Modules whose use cannot change a snippet's output between runs, and builtins that can.
+# Sets are included because their iteration order over strings depends on PYTHONHASHSEED.
+DETERMINISTIC_IMPORTS = frozenset({"math", "statistics", "json", "collections", "itertools", "functools"})
+IMPURE_BUILTINS = frozenset(
+    {"open", "input", "__import__", "eval", "exec", "compile", "globals", "vars", "id", "hash", "set", "frozenset"}
+)
+# Outputs of runs that failed or were cut short; they are not memoized because a retry may succeed.
+FAILURE_PREFIXES = ("Python execution timed out", "Failed to invoke python", "Python exited with ")
 
 
 class PythonSandboxTool(SimpleTool):
-    """Executes small Python snippets in a separate interpreter."""
+    """Executes small Python snippets in a separate interpreter.
+
+    With `sessions` enabled, calls made during one agent run share a
+    dedicated interpreter, so variables and imports survive between turns;
+    the interpreter is shut down when the run ends. Calls made outside an
+    agent run stay stateless.
+
+    A `pool` worker serves many snippets, including snippets from different
+    clients under `--serve`. Each gets a fresh namespace and modules it
+    imports are forgotten afterwards, but changes to the worker's warm-up
+    modules persist until the worker is recycled after `max_runs` runs. A
+    pool with `max_runs=1` is as isolated as spawning an interpreter per call.
+
+    Every snippet runs under `limits` (CPU time, address space, file size and
+    output bytes). CPU time and peak RSS of each run are logged at debug level
+    and recorded in the metrics registry.
+    """
 
     def __init__(
         self,
         *,
-        timeout: int = 5,
+        timeout: float = 5,
         extra_allowed_imports: set[str] | None = None,
+        pool: SandboxWorkerPool | None = None,
+        sessions: bool = False,
+        session_idle_timeout: float = 300.0,
+        session_max_memory_mb: int = 256,
+        limits: SandboxLimits | None = None,
+        registry: MetricsRegistry | None = None,
     ) -> None:
-        super().__init__(
-            name="python",
-            description="Run Python code in a sandboxed interpreter. Provide raw code; stdout is returned.",
-        )
+        super().__init__(name="python", description=python_description(sessions))
         self.timeout = timeout
-        default_allowed = {
-            "math",
-            "statistics",
-            "datetime",
-            "time",
-            "random",
-            "json",
-            "collections",
-            "itertools",
-            "functools",
-            "os",
-            "sys",
-            "pathlib",
-            "psutil",
-            "requests",
-            "bs4",
-        }
-        self.allowed_imports = default_allowed | (extra_allowed_imports or set())
+        self.allowed_imports = set(DEFAULT_ALLOWED_IMPORTS) | (extra_allowed_imports or set())
+        self.pool = pool
+        self.sessions = sessions
+        self.session_idle_timeout = session_idle_timeout
+        self.session_max_memory_mb = session_max_memory_mb
+        self.limits = limits or SandboxLimits()
+        registry = registry if registry is not None else REGISTRY
+        self.cpu_seconds = registry.histogram(
+            "simple_agent_python_cpu_seconds",
+            "CPU time used by python tool snippets.",
+            ("mode",),
+        )
+        self.max_rss = registry.histogram(
+            "simple_agent_python_max_rss_bytes",
+            "Peak resident memory of the interpreter that ran a python tool snippet.",
+            ("mode",),
+            buckets=RSS_BUCKETS,
+        )
+        self._logger = logging.getLogger(self.__class__.__name__)
 
     def run(self, query: str) -> str:
         code = query.strip()
@@ -52,45 +108,116 @@ class PythonSandboxTool(SimpleTool):
             allowed = ", ".join(sorted(self.allowed_imports))
             return f"Imports not permitted: {', '.join(sorted(disallowed))}. Allowed modules: {allowed}."
 
-        wrapped = dedent(
-            f"""
-            import sys
+        session = self._session()
+        if session is not None:
+            try:
+                result = session.run(code, self.timeout)
+            except WorkerTimeout:
+                return "Python execution timed out; the session was reset."
+            return self._report("session", result)
 
-            namespace = {{}}
-            code = {code!r}
+        if self.pool is not None:
             try:
-                exec(code, namespace, namespace)
-            except SystemExit as exc:
-                print(f"[SystemExit] {{exc}}", file=sys.stderr)
-            except Exception as exc:  # pylint: disable=broad-except
-                print(f"[Error] {{exc}}", file=sys.stderr)
+                result = self.pool.run(code, self.timeout)
+            except WorkerTimeout:
+                return "Python execution timed out."
+            return self._report("pool", result)
+
+        limits = self.limits.to_json()
+        wrapped = LIMITS_SOURCE + dedent(
+            f"""
+            import json
+
+            _limits = json.loads({limits!r})
+            _apply_limits(_limits)
+            _execute({code!r}, {{}}, _limits, final=True)
             """
-        ).strip()
+        )
 
         try:
-            completed = subprocess.run(
+            completed = run_limited(
                 ["python3", "-c", wrapped],
-                capture_output=True,
-                text=True,
                 timeout=self.timeout,
-                check=False,
+                output_bytes=self.limits.output_bytes,
             )
-        except subprocess.TimeoutExpired:
-            return "Python execution timed out."
         except Exception as exc:  # pylint: disable=broad-except
             return f"Failed to invoke python: {exc}"
+        if completed.timed_out:
+            return "Python execution timed out."
 
-        stdout = completed.stdout.strip()
-        stderr = completed.stderr.strip()
+        result = SandboxResult(
+            stdout=completed.stdout,
+            stderr=completed.stderr,
+            # The runner kills the interpreter itself once output passes the cap.
+            returncode=0 if completed.truncated else completed.returncode,
+            cpu_seconds=completed.cpu_seconds,
+            max_rss_kb=completed.max_rss_kb,
+            truncated=completed.truncated,
+        )
+        return self._report("spawn", result)
 
-        if completed.returncode != 0 and stderr:
-            return f"Python exited with {completed.returncode}: {stderr}"
+    @property
+    def cache_policy(self) -> CachePolicy:  # type: ignore[override]
+        # A session snippet can read state left by earlier calls, so only stateless runs are memoized.
+        return "never" if self.sessions else "pure"
 
-        if stderr and stdout:
-            return f"{stdout}\n[stderr]\n{stderr}"
-        if stderr:
-            return f"[stderr]\n{stderr}"
-        return stdout or "(no output)"
+    def cacheable(self, query: str) -> bool:
+        """Whether `query` is deterministic: no clock, randomness, I/O or hash-seeded output."""
+
+        return _is_deterministic(query.strip())
+
+    def cacheable_output(self, output: str) -> bool:
+        """Only clean runs are memoized: not timeouts, crashes, kills or anything written to stderr."""
+
+        return not output.startswith(FAILURE_PREFIXES) and "[stderr]" not in output and "Python was killed" not in output
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+
+    def _session(self) -> SandboxSession | None:
+        run = current_run() if self.sessions else None
+        if run is None:
+            return None
+        return run.resource(
+            ("python-session", id(self)),
+            lambda: SandboxSession(
+                idle_timeout=self.session_idle_timeout,
+                max_memory_mb=self.session_max_memory_mb,
+                limits=self.limits,
+            ),
+            SandboxSession.close,
+        )
+
+    def _report(self, mode: str, result: SandboxResult) -> str:
+        self.cpu_seconds.observe(result.cpu_seconds, mode=mode)
+        self.max_rss.observe(result.max_rss_kb * 1024, mode=mode)
+        self._logger.debug(
+            "Python snippet (%s) used %.3fs CPU, peak RSS %.1f MB%s.",
+            mode,
+            result.cpu_seconds,
+            result.max_rss_kb / 1024,
+            ", output truncated" if result.truncated else "",
+        )
+        return _format_output(result.stdout, result.stderr, result.returncode)
+
+
+def _format_output(stdout: str, stderr: str, returncode: int) -> str:
+    stdout = stdout.strip()
+    stderr = stderr.strip()
+
+    if returncode != 0 and stderr:
+        return f"Python exited with {returncode}: {stderr}"
+    if returncode < 0:
+        # Killed without a word, e.g. by the kernel at the hard CPU limit.
+        killed = f"Python was killed by signal {-returncode}."
+        return f"{stdout}\n{killed}" if stdout else killed
+
+    if stderr and stdout:
+        return f"{stdout}\n[stderr]\n{stderr}"
+    if stderr:
+        return f"[stderr]\n{stderr}"
+    return stdout or "(no output)"
 
 
 def _find_disallowed_imports(code: str, allowed: set[str]) -> set[str]:
@@ -114,3 +241,16 @@ def _find_disallowed_imports(code: str, allowed: set[str]) -> set[str]:
             if root not in allowed:
                 blocked.add(root)
     return blocked
+
+
+def _is_deterministic(code: str) -> bool:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return True
+    if _find_disallowed_imports(code, set(DETERMINISTIC_IMPORTS)):
+        return False
+    return not any(
+        isinstance(node, (ast.Set, ast.SetComp)) or (isinstance(node, ast.Name) and node.id in IMPURE_BUILTINS)
+        for node in ast.walk(tree)
+    )
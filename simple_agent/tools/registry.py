@@ -0,0 +1,205 @@
+"""Discovery of plugin tools published under the `simple_agent.tools` entry-point group."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .base import Tool
+
+ENTRY_POINT_GROUP = "simple_agent.tools"
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class ToolInfo:
+    """What the agent needs to advertise a tool without importing it.
+
+    `target` is the entry point value (`module:attribute`). The attribute is
+    called without arguments on first use and must return a tool; a tool
+    class with a no-argument constructor qualifies. `key` identifies the
+    distribution version the metadata was read from.
+    """
+
+    name: str
+    description: str
+    target: str
+    key: str = ""
+
+
+class LazyTool:
+    """Stands in for a built-in or plugin tool and builds it on its first `run`."""
+
+    __slots__ = ("name", "description", "target", "_factory", "_tool", "_lock")
+
+    def __init__(self, info: ToolInfo, factory: Callable[[], Tool] | None = None) -> None:
+        self.name = info.name
+        self.description = info.description
+        self.target = info.target
+        self._factory = factory
+        self._tool: Tool | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool is not None
+
+    def load(self) -> Tool:
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    factory = self._factory or _resolve(self.target)
+                    self._tool = factory()
+        return self._tool
+
+    def run(self, query: str) -> str:
+        return self.load().run(query)
+
+    def close(self) -> None:
+        close = getattr(self._tool, "close", None)
+        if close is not None:
+            close()
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"LazyTool({self.name!r}, {self.target!r}, {state})"
+
+
+class ToolRegistry:
+    """Tools discovered from installed distributions, described without importing them.
+
+    Reading entry points costs about as much as importing `importlib.metadata`
+    plus scanning every installed distribution, and describing a plugin needs
+    one import and instantiation. Both results are kept in a JSON file at
+    `cache_path`, which is only written once a plugin has been found. The
+    cache is reused while the `sys.path` directories that hold distributions
+    are unchanged (installing or removing a package touches them). A plugin's
+    description is read again only when its distribution version changes.
+    """
+
+    def __init__(self, cache_path: str | Path | None = None, *, group: str = ENTRY_POINT_GROUP) -> None:
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.group = group
+        self._infos: Dict[str, ToolInfo] | None = None
+        self._tools: Dict[str, LazyTool] = {}
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def register(self, info: ToolInfo, factory: Callable[[], Tool] | None = None) -> None:
+        """Add a tool by hand, e.g. from application code or tests."""
+
+        with self._lock:
+            self._tools[info.name] = LazyTool(info, factory)
+
+    def tools(self) -> List[LazyTool]:
+        """One `LazyTool` per discovered or registered tool, shared across calls."""
+
+        with self._lock:
+            if self._infos is None:
+                self._infos = self._discover()
+                for name, info in self._infos.items():
+                    self._tools.setdefault(name, LazyTool(info))
+            return list(self._tools.values())
+
+    def _discover(self) -> Dict[str, ToolInfo]:
+        fingerprint = _path_fingerprint()
+        cached = self._read_cache()
+        if cached.get("fingerprint") == fingerprint:
+            return {info["name"]: ToolInfo(**info) for info in cached.get("tools", [])}
+
+        from importlib.metadata import entry_points
+
+        known = {info["key"]: info for info in cached.get("tools", [])}
+        infos: Dict[str, ToolInfo] = {}
+        for entry_point in entry_points(group=self.group):
+            dist = getattr(entry_point, "dist", None)
+            key = f"{dist.name}=={dist.version}:{entry_point.value}" if dist is not None else entry_point.value
+            if key in known:
+                info = ToolInfo(**known[key])
+            else:
+                try:
+                    tool = entry_point.load()()
+                except Exception:  # pylint: disable=broad-except
+                    self._logger.exception("Skipping tool plugin %s (%s).", entry_point.name, entry_point.value)
+                    continue
+                info = ToolInfo(tool.name, tool.description, entry_point.value, key)
+            infos[info.name] = info
+        self._write_cache(fingerprint, infos)
+        return infos
+
+    def _read_cache(self) -> Dict[str, Any]:
+        if self.cache_path is None:
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) and data.get("version") == CACHE_VERSION else {}
+
+    def _write_cache(self, fingerprint: List[List[Any]], infos: Dict[str, ToolInfo]) -> None:
+        if self.cache_path is None:
+            return
+        if not infos:
+            # Without plugins a scan is all the cache would save; do not leave files behind for it.
+            try:
+                self.cache_path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                self._logger.warning("Could not remove stale tool metadata cache %s.", self.cache_path)
+            return
+        data = {"version": CACHE_VERSION, "fingerprint": fingerprint, "tools": [asdict(info) for info in infos.values()]}
+        temporary = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(temporary, self.cache_path)
+        except OSError:
+            self._logger.warning("Could not write tool metadata cache %s.", self.cache_path)
+
+
+def _resolve(target: str) -> Callable[[], Tool]:
+    module, _, attribute = target.partition(":")
+    value: Any = import_module(module.strip())
+    for part in attribute.strip().split("."):
+        value = getattr(value, part)
+    return value
+
+
+def _path_fingerprint() -> List[List[Any]]:
+    """Modification times of the `sys.path` directories where distributions are installed.
+
+    Only site directories and directories holding `.dist-info`/`.egg-info`
+    entries count. The script directory and the working directory are left
+    out: they change for unrelated reasons, such as a cache created in them.
+    """
+
+    skipped = {os.getcwd()}
+    if sys.argv and sys.argv[0] and os.path.isfile(sys.argv[0]):
+        skipped.add(os.path.dirname(os.path.abspath(sys.argv[0])))
+    fingerprint: List[List[Any]] = []
+    for entry in sys.path:
+        if not entry or os.path.abspath(entry) in skipped or not _holds_distributions(entry):
+            continue
+        try:
+            fingerprint.append([entry, os.stat(entry).st_mtime_ns])
+        except OSError:
+            continue
+    return fingerprint
+
+
+def _holds_distributions(entry: str) -> bool:
+    if os.path.basename(entry.rstrip(os.sep)) in {"site-packages", "dist-packages"}:
+        return True
+    try:
+        with os.scandir(entry) as entries:
+            return any(item.name.endswith((".dist-info", ".egg-info")) for item in entries)
+    except OSError:
+        return False
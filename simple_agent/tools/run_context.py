@@ -0,0 +1,65 @@
+"""Per-run state that tools can attach long-lived resources to."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+CURRENT_RUN: ContextVar["RunContext | None"] = ContextVar("simple_agent_run", default=None)
+"""Set by the agent around each tool call; tools read it with `current_run()`."""
+
+
+@dataclass(slots=True)
+class RunContext:
+    """Resources scoped to one agent run (one conversation).
+
+    The agent creates a context per `run`/`arun`/`stream` call and closes it
+    when the run ends, however it ends. Tools reach it through
+    `current_run()`, because the tool interface only receives the query.
+    """
+
+    run_id: str = field(default_factory=lambda: os.urandom(8).hex())
+    _resources: Dict[Hashable, Any] = field(default_factory=dict, repr=False)
+    _closers: List[Callable[[], None]] = field(default_factory=list, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _closed: bool = False
+
+    def resource(self, key: Hashable, factory: Callable[[], T], close: Callable[[T], None] | None = None) -> T:
+        """Return the resource stored under `key`, creating it on first use.
+
+        `close` is called with the resource when the run ends.
+        """
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("This run has already finished.")
+            if key not in self._resources:
+                value = self._resources[key] = factory()
+                if close is not None:
+                    self._closers.append(lambda: close(value))
+            return self._resources[key]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            closers, self._closers = self._closers, []
+            self._resources.clear()
+        for closer in reversed(closers):
+            try:
+                closer()
+            except Exception:  # pylint: disable=broad-except
+                logging.getLogger(self.__class__.__name__).exception("Failed to release a run resource.")
+
+
+def current_run() -> RunContext | None:
+    """The run the current tool call belongs to, if it was made by an agent."""
+
+    return CURRENT_RUN.get()
@@ -0,0 +1,241 @@
+"""Resource limits for python sandbox executions and a capped, streaming process runner."""
+
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import signal
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from typing import Sequence
+
+TRUNCATION_MARKER = "\n[output truncated at {limit} bytes]"
+READ_CHUNK = 65536
+REAP_POLL_SECONDS = 0.05  # longest sleep between checks for an exited process
+
+# Shared by every sandbox interpreter (one-shot and worker). `_apply_limits`
+# caps address space and file size once per process. `_execute` runs one
+# snippet under a fresh CPU budget and turns limit violations into `[Error]`
+# lines on stderr. SIGXCPU raises `_CpuLimitExceeded`, a BaseException so
+# snippets catching Exception cannot swallow it; SIGXFSZ is ignored so an
+# oversized write fails with OSError instead of killing the interpreter.
+LIMITS_SOURCE = r'''
+import io as _io, math as _math, resource as _resource, signal as _signal, sys as _sys
+
+
+class _CpuLimitExceeded(BaseException):
+    pass
+
+
+class _OutputLimitExceeded(BaseException):
+    pass
+
+
+def _on_cpu_limit(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+class _CappedOutput(_io.StringIO):
+    """Keeps at most `limit` UTF-8 bytes; the first overflowing write stops the snippet."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+        self.truncated = False
+
+    def write(self, text):
+        if self.truncated:
+            return len(text)
+        if self.limit is None:
+            return super().write(text)
+        data = text.encode("utf-8", "replace")
+        if self.size + len(data) <= self.limit:
+            self.size += len(data)
+            return super().write(text)
+        super().write(data[: self.limit - self.size].decode("utf-8", "ignore"))
+        self.size = self.limit
+        self.truncated = True
+        raise _OutputLimitExceeded()
+
+
+def _apply_limits(limits):
+    _signal.signal(_signal.SIGXFSZ, _signal.SIG_IGN)
+    _signal.signal(_signal.SIGXCPU, _on_cpu_limit)
+    for name, key in (("RLIMIT_AS", "memory_mb"), ("RLIMIT_FSIZE", "file_size_mb")):
+        if limits.get(key):
+            size = limits[key] * 1024 * 1024
+            _resource.setrlimit(getattr(_resource, name), (size, size))
+
+
+def _cpu_budget(seconds, final=False):
+    """Allow `seconds` more CPU time, or lift the soft limit when falsy.
+
+    `final` also closes the hard limit a second later, so the kernel kills a
+    snippet stuck in C code where the SIGXCPU handler never runs. Workers
+    cannot do that: an unprivileged process cannot raise its hard limit again
+    for the next snippet, so they rely on the wall-clock timeout instead.
+    """
+
+    _, hard = _resource.getrlimit(_resource.RLIMIT_CPU)
+    if not seconds:
+        _resource.setrlimit(_resource.RLIMIT_CPU, (hard, hard))
+        return
+    usage = _resource.getrusage(_resource.RUSAGE_SELF)
+    soft = _math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+    if hard != _resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    _resource.setrlimit(_resource.RLIMIT_CPU, (soft, soft + 1 if final else hard))
+
+
+def _execute(code, namespace, limits, final=False):
+    try:
+        _cpu_budget(limits.get("cpu_seconds"), final)
+        try:
+            exec(code, namespace, namespace)
+        finally:
+            if not final:
+                _cpu_budget(None)
+    except _OutputLimitExceeded:
+        pass
+    except _CpuLimitExceeded:
+        print(f"[Error] CPU time limit of {limits['cpu_seconds']}s exceeded", file=_sys.stderr)
+    except MemoryError:
+        if limits.get("memory_mb"):
+            print(f"[Error] Memory limit of {limits['memory_mb']} MB exceeded", file=_sys.stderr)
+        else:
+            print("[Error] Out of memory", file=_sys.stderr)
+    except SystemExit as exc:
+        print(f"[SystemExit] {exc}", file=_sys.stderr)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"[Error] {exc}", file=_sys.stderr)
+'''
+
+
+@dataclass(frozen=True, slots=True)
+class SandboxLimits:
+    """Per-execution caps for sandboxed snippets; `None` disables a limit.
+
+    `cpu_seconds` maps to RLIMIT_CPU, `memory_mb` to RLIMIT_AS (address
+    space, so it also counts memory that is reserved but never touched) and
+    `file_size_mb` to RLIMIT_FSIZE. `output_bytes` caps stdout and stderr
+    separately.
+    """
+
+    cpu_seconds: int | None = 10
+    memory_mb: int | None = 1024
+    file_size_mb: int | None = 16
+    output_bytes: int | None = 64 * 1024
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+@dataclass(slots=True)
+class ProcessResult:
+    """Output and resource usage of one finished sandbox process."""
+
+    stdout: str
+    stderr: str
+    returncode: int
+    cpu_seconds: float
+    max_rss_kb: int
+    truncated: bool = False
+    timed_out: bool = False
+
+
+def truncated_output(text: str, truncated: bool, limit: int | None) -> str:
+    return text + TRUNCATION_MARKER.format(limit=limit) if truncated else text
+
+
+def run_limited(args: Sequence[str], *, timeout: float, output_bytes: int | None) -> ProcessResult:
+    """Run `args`, streaming stdout and stderr into buffers of at most `output_bytes` each.
+
+    The process runs in its own process group, which is killed as soon as a
+    stream passes the cap or `timeout` elapses, so a runaway print loop
+    never holds more than the cap in memory. The deadline also covers the
+    wait for exit after both streams close. CPU time and peak RSS are taken
+    from `wait4`.
+    """
+
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    assert process.stdout is not None and process.stderr is not None
+    streams = (process.stdout, process.stderr)
+    buffers = {stream.fileno(): bytearray() for stream in streams}
+    truncated: set[int] = set()
+    timed_out = False
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as selector:
+        for stream in streams:
+            selector.register(stream, selectors.EVENT_READ)
+        while selector.get_map() and not truncated:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, READ_CHUNK)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    continue
+                buffer = buffers[key.fd]
+                buffer += chunk
+                if output_bytes is not None and len(buffer) > output_bytes:
+                    del buffer[output_bytes:]
+                    truncated.add(key.fd)
+    if not truncated and not timed_out and not _exited(process.pid, deadline):
+        # The snippet closed its streams (or passed them to a child) and kept running.
+        timed_out = True
+    # Also kills leftover children. Until `wait4` reaps it, the exited leader keeps the group id reserved.
+    _kill_group(process.pid)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    stdout, stderr = (
+        truncated_output(
+            buffers[stream.fileno()].decode("utf-8", errors="replace"),
+            stream.fileno() in truncated,
+            output_bytes,
+        )
+        for stream in streams
+    )
+    for stream in streams:
+        stream.close()
+    return ProcessResult(
+        stdout=stdout,
+        stderr=stderr,
+        returncode=process.returncode,
+        cpu_seconds=usage.ru_utime + usage.ru_stime,
+        max_rss_kb=usage.ru_maxrss,
+        truncated=bool(truncated),
+        timed_out=timed_out,
+    )
+
+
+def _exited(pid: int, deadline: float) -> bool:
+    """Wait until `pid` exits or `deadline` passes, without reaping it."""
+
+    delay = 0.001
+    while True:
+        if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, REAP_POLL_SECONDS)
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
@@ -0,0 +1,427 @@
+"""Pool of warm, pre-imported Python worker processes for the sandbox tool."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import random
+import select
+import struct
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from .sandbox_limits import LIMITS_SOURCE, SandboxLimits, truncated_output
+
+HEADER = struct.Struct(">I")
+READY_TIMEOUT = 30.0
+IDLE_POLL_SECONDS = 0.5  # how often a caller waiting for a worker checks whether the pool closed
+RESPAWN_BACKOFF = 1.0  # first delay before retrying a replacement that failed to start
+MAX_RESPAWN_BACKOFF = 30.0
+
+# Runs inside each worker after LIMITS_SOURCE. Requests and replies are
+# length-prefixed JSON on private duplicates of stdin/stdout; fds 0 and 1 are
+# pointed at /dev/null so user code cannot corrupt the protocol stream.
+WORKER_SOURCE = LIMITS_SOURCE + r'''
+import contextlib, json, os, resource, struct, sys
+
+HEADER = struct.Struct(">I")
+_limits = json.loads(sys.argv[1])
+_apply_limits(_limits)
+for _name in sys.argv[2:]:
+    try:
+        __import__(_name)
+    except Exception:
+        pass
+
+_requests = os.fdopen(os.dup(0), "rb")
+_replies = os.fdopen(os.dup(1), "wb")
+_null = os.open(os.devnull, os.O_RDWR)
+os.dup2(_null, 0)
+os.dup2(_null, 1)
+_replies.write(HEADER.pack(0))  # ready: warm-up imports are done
+_replies.flush()
+_session = {}
+_warm_modules = frozenset(sys.modules)
+
+
+def _cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+while True:
+    _header = _requests.read(HEADER.size)
+    if len(_header) < HEADER.size:
+        break
+    _request = json.loads(_requests.read(HEADER.unpack(_header)[0]))
+    _stdout = _CappedOutput(_limits.get("output_bytes"))
+    _stderr = _CappedOutput(_limits.get("output_bytes"))
+    # Session workers keep one namespace for their lifetime. Pool workers get a
+    # fresh namespace and forget modules the snippet imported, but changes made
+    # to warm-up modules (e.g. patched attributes) last until the worker is recycled.
+    namespace = _session if _request.get("persist") else {}
+    _started = _cpu_time()
+    with contextlib.redirect_stdout(_stdout), contextlib.redirect_stderr(_stderr):
+        _execute(_request["code"], namespace, _limits)
+    if not _request.get("persist"):
+        for _name in set(sys.modules) - _warm_modules:
+            del sys.modules[_name]
+    _reply = json.dumps(
+        {
+            "stdout": _stdout.getvalue(),
+            "stderr": _stderr.getvalue(),
+            "stdout_truncated": _stdout.truncated,
+            "stderr_truncated": _stderr.truncated,
+            "cpu_seconds": _cpu_time() - _started,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+    ).encode()
+    _replies.write(HEADER.pack(len(_reply)) + _reply)
+    _replies.flush()
+'''
+
+
+class WorkerTimeout(Exception):
+    """Raised when a worker does not answer within the allotted time."""
+
+
+class WorkerCrashed(Exception):
+    """Raised when a worker exits while handling a request."""
+
+
+@dataclass(slots=True)
+class SandboxResult:
+    """Captured output of one snippet execution."""
+
+    stdout: str
+    stderr: str
+    returncode: int = 0
+    cpu_seconds: float = 0.0
+    max_rss_kb: int = 0
+    truncated: bool = False
+
+
+class SandboxWorker:
+    """One long-lived interpreter that executes snippets sent over a pipe.
+
+    `limits` are applied when the interpreter starts; the CPU budget and
+    output cap are re-armed for every snippet.
+    """
+
+    def __init__(
+        self,
+        warm_imports: Iterable[str] = (),
+        *,
+        limits: SandboxLimits | None = None,
+        python: str = "python3",
+    ) -> None:
+        self.limits = limits or SandboxLimits()
+        self.process = subprocess.Popen(
+            [python, "-c", WORKER_SOURCE, self.limits.to_json(), *warm_imports],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.runs = 0
+        self.max_rss_kb = 0
+        self.max_runs = 0
+        self.ready = False
+        self.retired = False
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def wait_ready(self, timeout: float) -> None:
+        """Block until the worker has finished its warm-up imports."""
+
+        if not self.ready:
+            self._read_exactly(HEADER.size, time.monotonic() + timeout)
+            self.ready = True
+
+    def execute(self, code: str, timeout: float, *, persist: bool = False) -> SandboxResult:
+        request = json.dumps({"code": code, "persist": persist}).encode()
+        assert self.process.stdin is not None
+        try:
+            self.process.stdin.write(HEADER.pack(len(request)) + request)
+            self.process.stdin.flush()
+        except BrokenPipeError as exc:
+            raise WorkerCrashed("worker is gone") from exc
+
+        deadline = time.monotonic() + timeout
+        if not self.ready:
+            self._read_exactly(HEADER.size, deadline)
+            self.ready = True
+        header = self._read_exactly(HEADER.size, deadline)
+        reply = json.loads(self._read_exactly(HEADER.unpack(header)[0], deadline))
+        self.runs += 1
+        self.max_rss_kb = int(reply.get("max_rss_kb") or 0)
+        limit = self.limits.output_bytes
+        return SandboxResult(
+            stdout=truncated_output(reply["stdout"], reply["stdout_truncated"], limit),
+            stderr=truncated_output(reply["stderr"], reply["stderr_truncated"], limit),
+            cpu_seconds=reply["cpu_seconds"],
+            max_rss_kb=self.max_rss_kb,
+            truncated=reply["stdout_truncated"] or reply["stderr_truncated"],
+        )
+
+    def kill(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            if stream is not None:
+                stream.close()
+
+    def _read_exactly(self, size: int, deadline: float) -> bytes:
+        assert self.process.stdout is not None
+        fd = self.process.stdout.fileno()
+        chunks: list[bytes] = []
+        remaining = size
+        while remaining:
+            wait = deadline - time.monotonic()
+            if wait <= 0 or not select.select([fd], [], [], wait)[0]:
+                raise WorkerTimeout()
+            chunk = os.read(fd, remaining)
+            if not chunk:
+                raise WorkerCrashed(f"worker exited with {self.process.wait()}")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+
+class SandboxWorkerPool:
+    """Keeps `size` warm workers and recycles them to preserve isolation.
+
+    A worker is killed when a snippet times out or crashes it, or once its
+    peak RSS exceeds `max_memory_mb`. After roughly `max_runs` executions
+    (jittered so workers do not all expire together) it keeps serving until a
+    warm replacement is ready. Replacements are spawned in the background so
+    callers keep hitting warm interpreters; one that fails to start is killed
+    and retried with exponential backoff. `limits` caps each snippet's CPU
+    time and output and each worker's address space and file writes.
+
+    `run` raises `RuntimeError` once the pool is closed, including for callers
+    that were waiting for a worker.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        *,
+        warm_imports: Iterable[str] = (),
+        max_runs: int = 50,
+        max_memory_mb: int = 256,
+        limits: SandboxLimits | None = None,
+        python: str = "python3",
+    ) -> None:
+        if size < 1:
+            raise ValueError("Sandbox pool size must be at least 1.")
+        self.size = size
+        self.warm_imports = tuple(warm_imports)
+        self.max_runs = max_runs
+        self.max_memory_mb = max_memory_mb
+        self.limits = limits
+        self.python = python
+        self._idle: queue.Queue[SandboxWorker] = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = threading.Event()
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def start(self) -> None:
+        """Spawn the workers up front so the first calls are warm too."""
+
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def run(self, code: str, timeout: float) -> SandboxResult:
+        self.start()
+        worker = self._take()
+        try:
+            result = worker.execute(code, timeout)
+        except WorkerTimeout:
+            self._recycle(worker, "timeout")
+            raise
+        except WorkerCrashed as exc:
+            self._recycle(worker, "crash")
+            return SandboxResult(stdout="", stderr=f"Sandbox worker crashed: {exc}", returncode=1)
+
+        if worker.max_rss_kb > self.max_memory_mb * 1024:
+            self._recycle(worker, "memory limit")
+            return result
+        if worker.runs == worker.max_runs:
+            self._logger.debug("Sandbox worker %s reached its run budget.", worker.pid)
+            threading.Thread(target=self._replenish, args=(worker,), daemon=True).start()
+        self._release(worker)
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed.set()
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.kill()
+
+    def _take(self) -> SandboxWorker:
+        # A timed get, so callers waiting for a worker notice `close` instead of blocking forever.
+        while True:
+            if self._closed.is_set():
+                raise RuntimeError("Sandbox pool is closed.")
+            try:
+                worker = self._idle.get(timeout=IDLE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if not worker.retired:
+                return worker
+            worker.kill()
+
+    def _release(self, worker: SandboxWorker) -> bool:
+        """Return `worker` to the idle queue, or kill it if the pool has closed."""
+
+        with self._lock:
+            if not self._closed.is_set():
+                self._idle.put(worker)
+                return True
+        worker.kill()
+        return False
+
+    def _spawn(self) -> SandboxWorker:
+        worker = SandboxWorker(self.warm_imports, limits=self.limits, python=self.python)
+        # Jitter the run budget so workers do not all recycle at once.
+        worker.max_runs = max(1, round(self.max_runs * random.uniform(0.75, 1.0)))
+        return worker
+
+    def _recycle(self, worker: SandboxWorker, reason: str) -> None:
+        self._logger.debug("Recycling sandbox worker %s (%s).", worker.pid, reason)
+        worker.kill()
+        if not self._closed.is_set():
+            threading.Thread(target=self._replenish, daemon=True).start()
+
+    def _replenish(self, retiring: SandboxWorker | None = None) -> None:
+        delay = RESPAWN_BACKOFF
+        while not self._closed.is_set():
+            try:
+                worker = self._spawn()
+            except OSError as exc:
+                self._logger.warning("Could not spawn a sandbox worker (%s); retrying in %gs.", exc, delay)
+            else:
+                try:
+                    worker.wait_ready(READY_TIMEOUT)
+                except (WorkerTimeout, WorkerCrashed):
+                    worker.kill()
+                    self._logger.warning("Sandbox worker %s failed to start; retrying in %gs.", worker.pid, delay)
+                else:
+                    if self._release(worker) and retiring is not None:
+                        retiring.retired = True
+                    return
+            self._closed.wait(delay)
+            delay = min(delay * 2, MAX_RESPAWN_BACKOFF)
+
+
+class SandboxSession:
+    """A dedicated worker whose namespace persists across snippets.
+
+    Sessions belong to one agent run and are closed when it ends. A session
+    left idle for `idle_timeout` seconds, a snippet that times out or crashes
+    the worker, and a peak RSS above `max_memory_mb` all end the interpreter.
+    The next snippet then starts a fresh one, and its output begins with a
+    note that earlier state is gone.
+    """
+
+    def __init__(
+        self,
+        *,
+        warm_imports: Iterable[str] = (),
+        idle_timeout: float = 300.0,
+        max_memory_mb: int = 256,
+        limits: SandboxLimits | None = None,
+        python: str = "python3",
+    ) -> None:
+        self.warm_imports = tuple(warm_imports)
+        self.idle_timeout = idle_timeout
+        self.max_memory_mb = max_memory_mb
+        self.limits = limits
+        self.python = python
+        self.runs = 0
+        self._worker: SandboxWorker | None = None
+        self._reset_reason: str | None = None
+        self._timer: threading.Timer | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def pid(self) -> int | None:
+        return self._worker.pid if self._worker is not None else None
+
+    def run(self, code: str, timeout: float) -> SandboxResult:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Sandbox session is closed.")
+            self._cancel_timer()
+            note = self._take_reset_note()
+            if self._worker is None:
+                self._worker = SandboxWorker(self.warm_imports, limits=self.limits, python=self.python)
+            try:
+                result = self._worker.execute(code, timeout, persist=True)
+            except WorkerTimeout:
+                self._end("the previous snippet timed out")
+                raise
+            except WorkerCrashed as exc:
+                self._end("the interpreter crashed")
+                return SandboxResult(stdout="", stderr=f"{note}Sandbox worker crashed: {exc}", returncode=1)
+            self.runs += 1
+            if self._worker.max_rss_kb > self.max_memory_mb * 1024:
+                self._end(f"it exceeded the {self.max_memory_mb} MB memory limit")
+            else:
+                self._timer = threading.Timer(self.idle_timeout, self._expire, args=(self._generation,))
+                self._timer.daemon = True
+                self._timer.start()
+            if note:
+                result.stdout = note + result.stdout
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._cancel_timer()
+            if self._worker is not None:
+                self._worker.kill()
+                self._worker = None
+
+    def _expire(self, generation: int) -> None:
+        with self._lock:
+            # A timer that fired while a snippet was running is stale once that snippet re-armed it.
+            if generation == self._generation and self._worker is not None and not self._closed:
+                self._end(f"it was idle for more than {self.idle_timeout:g}s")
+
+    def _end(self, reason: str) -> None:
+        self._logger.debug("Ending sandbox session worker %s: %s.", self.pid, reason)
+        if self._worker is not None:
+            self._worker.kill()
+            self._worker = None
+        self._reset_reason = reason
+
+    def _take_reset_note(self) -> str:
+        reason, self._reset_reason = self._reset_reason, None
+        return f"[Session restarted because {reason}; earlier variables are gone.]\n" if reason else ""
+
+    def _cancel_timer(self) -> None:
+        self._generation += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,337 @@
+"""On-disk trigram index used to narrow file searches to candidate files."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Set
+
+MAX_FILE_BYTES = 1 << 20  # larger files are skipped, like binaries
+SNIFF_BYTES = 8192  # a NUL byte in this prefix marks a file as binary
+MAX_QUERY_TRIGRAMS = 24  # the rarest ones; more rarely narrows the candidates further
+COUNT_LIMIT = 5000  # posting-list sizes are only counted up to this for ordering
+PROBE_COST = 3  # a keyed lookup costs about as much as reading three posting rows
+SKIP_DIRS = frozenset({"node_modules", "__pycache__", "env", "venv"})
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+_CAPPED_COUNT = "SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE trigram = ? LIMIT ?)"
+_POSTINGS = "SELECT file_id FROM postings WHERE trigram = ?"
+_PROBE_POSTINGS = "SELECT file_id FROM postings WHERE trigram = ? AND file_id IN (SELECT value FROM json_each(?))"
+_PATHS = "SELECT path FROM files WHERE id IN (SELECT value FROM json_each(?)) ORDER BY path"
+_QUANTIFIER = re.compile(r"(?:[*+?]|\{\d*(?:,\d*)?\})[?+]?")
+
+
+@dataclass(slots=True)
+class RefreshStats:
+    """What one `TrigramIndex.refresh` pass did."""
+
+    scanned: int = 0
+    indexed: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+class TrigramIndex:
+    """Maps lowercase byte trigrams to the files under `root` that contain them.
+
+    The index lives in a SQLite file so it survives restarts. `refresh()`
+    walks the tree and re-reads only files whose mtime or size changed, and
+    drops files that disappeared. Processes sharing the file serialize their
+    refreshes with `BEGIN IMMEDIATE`, so each sees the others' rows before
+    deciding what is new. Hidden directories and vendored environments
+    are not walked; binaries and files over `max_file_bytes` are recorded
+    without trigrams so they are not re-read on every refresh.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        path: str | Path | None = None,
+        *,
+        max_file_bytes: int = MAX_FILE_BYTES,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger("TrigramIndex")
+        database = ":memory:" if path is None else Path(path)
+        if isinstance(database, Path):
+            database.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(database, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, mtime_ns INTEGER NOT NULL, "
+            "size INTEGER NOT NULL, trigrams BLOB)"
+        )
+        # No rowid and no file_id index: a file's own trigram list (files.trigrams)
+        # is enough to delete its postings, which keeps the table compact.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "trigram BLOB NOT NULL, file_id INTEGER NOT NULL, PRIMARY KEY (trigram, file_id)) WITHOUT ROWID"
+        )
+
+    def refresh(self) -> RefreshStats:
+        """Bring the index in line with the files currently on disk."""
+
+        stats = RefreshStats()
+        start = time.perf_counter()
+        with self._lock:
+            # Take the write lock before reading, so another process cannot index the same new files meanwhile.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = {
+                    path: (file_id, mtime_ns, size)
+                    for file_id, path, mtime_ns, size in self._conn.execute(
+                        "SELECT id, path, mtime_ns, size FROM files"
+                    )
+                }
+                for relative, entry in self._walk():
+                    stats.scanned += 1
+                    stat = entry.stat()
+                    previous = known.pop(relative, None)
+                    if previous is not None and previous[1:] == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    if previous is not None:
+                        self._remove(previous[0])
+                    if self._add(relative, entry.path, stat):
+                        stats.indexed += 1
+                for file_id, _, _ in known.values():
+                    self._remove(file_id)
+                    stats.removed += 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        stats.seconds = time.perf_counter() - start
+        self._logger.debug(
+            "Scanned %d files, indexed %d, removed %d in %.3fs.",
+            stats.scanned,
+            stats.indexed,
+            stats.removed,
+            stats.seconds,
+        )
+        return stats
+
+    def candidates(self, trigrams: Set[bytes]) -> List[str]:
+        """Relative paths of indexed files containing every trigram in `trigrams`.
+
+        Posting lists are intersected rarest first. Once few file ids survive,
+        the remaining trigrams are probed for just those ids instead of loading
+        lists for common trigrams such as `def`. An empty set cannot narrow
+        anything down and returns every indexed file.
+        """
+
+        with self._lock:
+            if not trigrams:
+                rows = self._conn.execute("SELECT path FROM files WHERE trigrams IS NOT NULL ORDER BY path")
+                return [path for (path,) in rows]
+            sized = sorted(
+                (self._conn.execute(_CAPPED_COUNT, (trigram, COUNT_LIMIT)).fetchone()[0], trigram)
+                for trigram in trigrams
+            )
+            file_ids: Set[int] | None = None
+            for size, trigram in sized[:MAX_QUERY_TRIGRAMS]:
+                if file_ids is None or len(file_ids) * PROBE_COST > size:
+                    postings = {file_id for (file_id,) in self._conn.execute(_POSTINGS, (trigram,))}
+                    file_ids = postings if file_ids is None else file_ids & postings
+                else:
+                    rows = self._conn.execute(_PROBE_POSTINGS, (trigram, json.dumps(sorted(file_ids))))
+                    file_ids = {file_id for (file_id,) in rows}
+                if not file_ids:
+                    return []
+            rows = self._conn.execute(_PATHS, (json.dumps(sorted(file_ids)),))
+            return [path for (path,) in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files WHERE trigrams IS NOT NULL").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _walk(self) -> Iterator[tuple[str, os.DirEntry]]:
+        prefix = len(str(self.root)) + 1
+        stack = [str(self.root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path[prefix:].replace(os.sep, "/"), entry
+
+    def _add(self, relative: str, path: str, stat: os.stat_result) -> bool:
+        """Index one file; returns False if it was recorded as unsearchable."""
+
+        data = b""
+        if stat.st_size <= self.max_file_bytes:
+            try:
+                with open(path, "rb") as handle:
+                    data = handle.read(self.max_file_bytes + 1)
+            except OSError:
+                return False
+        searchable = 0 < len(data) <= self.max_file_bytes and b"\0" not in data[:SNIFF_BYTES]
+        trigrams = file_trigrams(data) if searchable else set()
+        # A row for the path should not exist here; if one does, replace it and its postings.
+        existing = self._conn.execute("SELECT id FROM files WHERE path = ?", (relative,)).fetchone()
+        if existing is not None:
+            self._remove_postings(existing[0])
+        cursor = self._conn.execute(
+            "INSERT INTO files (path, mtime_ns, size, trigrams) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, size = excluded.size, "
+            "trigrams = excluded.trigrams",
+            (relative, stat.st_mtime_ns, stat.st_size, b"".join(sorted(trigrams)) if searchable else None),
+        )
+        if not searchable:
+            return False
+        file_id = existing[0] if existing is not None else cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO postings (trigram, file_id) VALUES (?, ?)",
+            ((trigram, file_id) for trigram in trigrams),
+        )
+        return True
+
+    def _remove(self, file_id: int) -> None:
+        self._remove_postings(file_id)
+        self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _remove_postings(self, file_id: int) -> None:
+        row = self._conn.execute("SELECT trigrams FROM files WHERE id = ?", (file_id,)).fetchone()
+        if row is not None and row[0]:
+            blob = row[0]
+            self._conn.executemany(
+                "DELETE FROM postings WHERE trigram = ? AND file_id = ?",
+                ((blob[offset : offset + 3], file_id) for offset in range(0, len(blob), 3)),
+            )
+
+
+def file_trigrams(data: bytes) -> Set[bytes]:
+    """Distinct lowercase 3-byte sequences in `data`."""
+
+    data = data.lower()
+    return {data[index : index + 3] for index in range(len(data) - 2)}
+
+
+def literal_trigrams(text: str) -> Set[bytes]:
+    return file_trigrams(text.encode("utf-8"))
+
+
+def regex_trigrams(pattern: str) -> Set[bytes]:
+    """Trigrams every match of `pattern` must contain (possibly none).
+
+    Only literal runs outside groups, classes and optional atoms are used, and
+    a top-level alternation disables filtering, so the result errs towards
+    returning too many candidates rather than missing a match. Trigrams are
+    lowercase, which keeps them valid for case-insensitive patterns too.
+    """
+
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "|":
+            return set()
+        if char == "\\" and index + 1 < len(pattern):
+            escaped = pattern[index + 1]
+            index += 2
+            if escaped.isalnum():
+                # Class escapes (\d, \w, ...), backreferences and \x/\u codes.
+                flush()
+                continue
+            atom = escaped
+        elif char == "(":
+            flush()
+            index = _skip_group(pattern, index)
+            if index < 0:
+                return set()
+            continue
+        elif char == "[":
+            flush()
+            index = _skip_class(pattern, index)
+            continue
+        elif char in _REGEX_META:
+            flush()
+            index = _skip_quantifier(pattern, index + 1)
+            continue
+        else:
+            atom = char
+            index += 1
+        quantifier = _QUANTIFIER.match(pattern, index)
+        if quantifier is None:
+            current.append(atom)
+            continue
+        index = quantifier.end()
+        if quantifier.group().startswith("+"):
+            # One or more: the atom is required but cannot join a longer run.
+            current.append(atom)
+        flush()
+    flush()
+    trigrams: Set[bytes] = set()
+    for run in runs:
+        trigrams |= literal_trigrams(run)
+    return trigrams
+
+
+def _skip_group(pattern: str, index: int) -> int:
+    """Index just past the group opening at `index`, or -1 if it never closes.
+
+    A quantifier directly after the group is skipped along with it.
+    """
+
+    depth = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "[":
+            index = _skip_class(pattern, index)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return _skip_quantifier(pattern, index + 1)
+        index += 1
+    return -1
+
+
+def _skip_class(pattern: str, index: int) -> int:
+    index += 1
+    if index < len(pattern) and pattern[index] == "^":
+        index += 1
+    if index < len(pattern) and pattern[index] == "]":
+        index += 1
+    while index < len(pattern) and pattern[index] != "]":
+        index += 2 if pattern[index] == "\\" else 1
+    return _skip_quantifier(pattern, index + 1)
+
+
+def _skip_quantifier(pattern: str, index: int) -> int:
+    match = _QUANTIFIER.match(pattern, index)
+    return match.end() if match else index
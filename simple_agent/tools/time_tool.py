@@ -3,15 +3,19 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import ClassVar
 
-from .base import SimpleTool
+from .base import CachePolicy, SimpleTool
+from .catalog import TIME_DESCRIPTION
 
 
 class TimeTool(SimpleTool):
     """Returns the current UTC timestamp."""
 
+    cache_policy: ClassVar[CachePolicy] = "never"
+
     def __init__(self) -> None:
-        super().__init__(name="time", description="Returns the current UTC time in ISO-8601 format.")
+        super().__init__(name="time", description=TIME_DESCRIPTION)
 
     def run(self, _: str) -> str:
         return datetime.now(tz=timezone.utc).isoformat()
@@ -0,0 +1,192 @@
+"""Span-based tracing for agent runs with pluggable exporters."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Protocol, Sequence
+
+from .metrics import REGISTRY, MetricsRegistry
+
+SPAN_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Shared no-op context handed out when tracing is off, so disabled spans cost
+# one attribute check and a `with` on a preallocated object.
+NO_SPAN: AbstractContextManager[None] = nullcontext()
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed step: a run, a turn, a backend request, a tool run or a parse."""
+
+    name: str
+    trace_id: str
+    span_id: int
+    parent_id: int | None
+    start: float
+    timestamp: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    end: float | None = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    """Hook interface notified when spans start and end."""
+
+    def on_start(self, span: Span) -> None:
+        """Called when a span opens."""
+
+    def on_end(self, span: Span) -> None:
+        """Called when a span closes; `span.end` is set."""
+
+
+class Tracer:
+    """Creates spans and fans their start/end events out to exporters.
+
+    Parents are passed explicitly rather than through context variables, so
+    spans nest correctly when tools run on a thread pool.
+    """
+
+    def __init__(self, exporters: Sequence[SpanExporter] = ()) -> None:
+        self.exporters = list(exporters)
+        self._ids = itertools.count(1)
+
+    def span(self, name: str, parent: Span | None = None, **attributes: Any) -> "_SpanContext":
+        return _SpanContext(self, name, parent, attributes)
+
+    def close(self) -> None:
+        for exporter in self.exporters:
+            close = getattr(exporter, "close", None)
+            if close is not None:
+                close()
+
+
+class _SpanContext:
+    """Context manager for one span; a plain class is cheaper than `@contextmanager`."""
+
+    __slots__ = ("tracer", "span")
+
+    def __init__(self, tracer: Tracer, name: str, parent: Span | None, attributes: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else os.urandom(8).hex(),
+            span_id=next(tracer._ids),
+            parent_id=parent.span_id if parent is not None else None,
+            start=0.0,
+            timestamp=time.time(),
+            attributes=attributes,
+        )
+
+    def __enter__(self) -> Span:
+        span = self.span
+        for exporter in self.tracer.exporters:
+            exporter.on_start(span)
+        span.start = time.perf_counter()
+        return span
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: object) -> None:
+        span = self.span
+        span.end = time.perf_counter()
+        if exc_type is not None:
+            span.attributes["error"] = exc_type.__name__
+        for exporter in self.tracer.exporters:
+            exporter.on_end(span)
+
+
+def maybe_span(
+    tracer: Tracer | None, name: str, parent: Span | None = None, **attributes: Any
+) -> AbstractContextManager[Span | None]:
+    """`tracer.span(...)` when tracing is on, otherwise the shared no-op context."""
+
+    if tracer is None:
+        return NO_SPAN
+    return tracer.span(name, parent, **attributes)
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list; handy for tests and ad-hoc analysis."""
+
+    def __init__(self) -> None:
+        self.finished: List[Span] = []
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        return None
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            self.finished.append(span)
+
+    def spans(self, name: str | None = None) -> List[Span]:
+        with self._lock:
+            return [span for span in self.finished if name is None or span.name == name]
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per finished span to a trace file.
+
+    The file is flushed whenever a root span (a whole run) ends.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        return None
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._handle.write(line + "\n")
+            if span.parent_id is None:
+                self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+class PrometheusExporter:
+    """Feeds span durations into a histogram served by `/metrics`."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        self.registry = registry if registry is not None else REGISTRY
+        self.durations = self.registry.histogram(
+            "simple_agent_span_duration_seconds",
+            "Duration of agent spans by span name and tool.",
+            ("span", "tool"),
+            buckets=SPAN_BUCKETS,
+        )
+
+    def on_start(self, span: Span) -> None:
+        return None
+
+    def on_end(self, span: Span) -> None:
+        self.durations.observe(span.duration, span=span.name, tool=span.attributes.get("tool", ""))
+
+    def render(self) -> str:
+        return self.registry.render()
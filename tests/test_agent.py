@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List
+import asyncio
+import threading
+import time
+from typing import Iterable, Iterator, List, Sequence
 
 import pytest
 
 from simple_agent.agent import SimpleAgent, _truncate
-from simple_agent.backends.base import LLMBackend, Message
+from simple_agent.backends.base import AsyncLLMBackend, BackendResult, LLMBackend, Message, ToolCall, ToolSpec
 from simple_agent.tools.base import SimpleTool, Tool
+from simple_agent.tools.registry import LazyTool, ToolInfo
+from simple_agent.tools.run_context import current_run
 
 
 class DummyBackend(LLMBackend):
@@ -26,6 +31,46 @@ class DummyBackend(LLMBackend):
         return self._responses.pop(0)
 
 
+class ChunkedBackend(DummyBackend):
+    """Streams each queued response a few characters at a time."""
+
+    def __init__(self, responses: Iterable[str]) -> None:
+        super().__init__(responses)
+        self.consumed: list[str] = []
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        response = self.generate(messages)
+        for index in range(0, len(response), 4):
+            chunk = response[index : index + 4]
+            self.consumed.append(chunk)
+            yield chunk
+
+
+class SlowTool(SimpleTool):
+    """Tool that sleeps before answering."""
+
+    def __init__(self, name: str, delay: float) -> None:
+        super().__init__(name=name, description="Sleeps.")
+        self.delay = delay
+
+    def run(self, query: str) -> str:
+        time.sleep(self.delay)
+        return f"{self.name} done"
+
+
+class AsyncDummyBackend(AsyncLLMBackend):
+    """Async backend that returns predefined responses for each call."""
+
+    def __init__(self, responses: Iterable[str]) -> None:
+        self._responses = list(responses)
+        self.calls: List[List[Message]] = []
+
+    async def agenerate(self, messages: List[Message]) -> str:
+        self.calls.append([msg.copy() for msg in messages])
+        await asyncio.sleep(0)
+        return self._responses.pop(0)
+
+
 class RecordingTool(SimpleTool):
     """Tool that records the inputs it receives."""
 
@@ -73,20 +118,229 @@ def test_agent_executes_requested_tool_and_returns_model_reply() -> None:
     assert backend.calls[1][-1]["content"].startswith("[Tool:echo] tool ran with: calculate pi")
 
 
+class NativeToolBackend(DummyBackend):
+    """Returns queued `BackendResult`s through `generate_with_tools`."""
+
+    supports_native_tools = True
+
+    def __init__(self, results: Iterable[BackendResult]) -> None:
+        super().__init__([])
+        self.results = list(results)
+        self.tools: list[tuple[ToolSpec, ...]] = []
+
+    def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+        self.calls.append([msg.copy() for msg in messages])
+        self.tools.append(tuple(tools))
+        return self.results.pop(0)
+
+
+def test_agent_uses_native_tool_calls_with_text_fallback() -> None:
+    tool = RecordingTool()
+    backend = NativeToolBackend(
+        [
+            BackendResult("", [ToolCall("echo", "first")]),
+            BackendResult('{"tool": "echo", "input": "second"}'),
+            BackendResult("done"),
+        ]
+    )
+    agent = SimpleAgent(backend=backend, tools=[tool], system_prompt="Be helpful.", native_tools=True)
+
+    assert agent.run("Go", max_turns=3) == "done"
+    assert tool.invocations == ["first", "second"]
+    assert backend.tools[0] == (ToolSpec("echo", "Echo the provided input."),)
+    system_prompt = backend.calls[0][0]["content"]
+    assert "Echo the provided input." not in system_prompt
+    assert "JSON object" not in system_prompt
+
+
+def test_native_tools_fall_back_to_text_prompt_for_plain_backends() -> None:
+    agent, backend = _make_agent(["answer"], tools=[RecordingTool()])
+    agent.native_tools = True
+
+    assert agent.run("Go") == "answer"
+    assert "Echo the provided input." in backend.calls[0][0]["content"]
+
+
+def test_agent_runs_array_of_tools_concurrently_in_one_turn() -> None:
+    tools = [SlowTool("a", 0.2), SlowTool("b", 0.2), SlowTool("c", 0.2)]
+    agent, backend = _make_agent(
+        responses=['[{"tool":"a","input":""},{"tool":"b","input":""},{"tool":"c","input":""}]', "all done"],
+        tools=tools,
+    )
+
+    start = time.perf_counter()
+    result = agent.run("Go")
+    elapsed = time.perf_counter() - start
+
+    assert result == "all done"
+    assert len(backend.calls) == 2
+    assert elapsed < 0.5
+    tool_message = backend.calls[1][-1]["content"]
+    assert tool_message == "[Tool:a] a done\n\n[Tool:b] b done\n\n[Tool:c] c done"
+
+
+def test_agent_reports_tool_timeouts_and_unknown_tools(caplog: pytest.LogCaptureFixture) -> None:
+    agent, backend = _make_agent(
+        responses=['[{"tool":"slow","input":""},{"tool":"missing","input":""}]', "ok"],
+        tools=[SlowTool("slow", 0.5)],
+    )
+    agent.tool_timeouts = {"slow": 0.05}
+
+    assert agent.run("Go") == "ok"
+    tool_message = backend.calls[1][-1]["content"]
+    assert "[Tool error] 'slow' timed out after 0.05s." in tool_message
+    assert "[Tool error] 'missing' is not a known tool." in tool_message
+    assert "Tool 'slow' timed out after 0.05s and is still running" in caplog.text
+
+
+def test_concurrent_turns_share_one_tool_executor() -> None:
+    agent, _ = _make_agent(responses=["ok"], tools=[SlowTool("slow", 0.0)])
+    executors: List[object] = []
+    threads = [threading.Thread(target=lambda: executors.append(agent._tool_executor())) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(executors) == 16 and all(executor is executors[0] for executor in executors)
+    agent.close()
+    assert agent._executor is None
+
+
+def test_close_releases_the_backend_and_every_closable_tool() -> None:
+    closed: List[str] = []
+    backend = DummyBackend(["ok"])
+    backend.close = lambda: closed.append("backend")  # type: ignore[method-assign]
+    tool = RecordingTool()
+    tool.close = lambda: closed.append("echo")  # type: ignore[attr-defined]
+    lazy = LazyTool(ToolInfo("lazy", "Never loaded.", "unused:Tool"), lambda: RecordingTool())
+    agent = SimpleAgent(backend=backend, tools=[tool, lazy, SlowTool("slow", 0)], system_prompt="Be helpful.")
+
+    agent.close()
+    assert closed == ["backend", "echo"] and not lazy.loaded
+
+    async_backend = AsyncDummyBackend(["ok"])
+
+    async def aclose() -> None:
+        closed.append("async backend")
+
+    async_backend.aclose = aclose  # type: ignore[method-assign]
+    asyncio.run(SimpleAgent(backend=async_backend, tools=[], system_prompt="Be helpful.").aclose())
+    assert closed[-1] == "async backend"
+
+
+def test_arun_runs_array_of_tools() -> None:
+    tool = RecordingTool()
+    backend = AsyncDummyBackend(['[{"tool":"echo","input":"1"},{"tool":"echo","input":"2"}]', "done"])
+    agent = SimpleAgent(backend=backend, tools=[tool], system_prompt="Be helpful.")
+
+    assert asyncio.run(agent.arun("Go")) == "done"
+    assert sorted(tool.invocations) == ["1", "2"]
+
+
+def test_arun_executes_tool_with_async_backend() -> None:
+    tool = RecordingTool()
+    backend = AsyncDummyBackend(['{"tool":"echo","input":"x"}', "done"])
+    agent = SimpleAgent(backend=backend, tools=[tool], system_prompt="Be helpful.")
+
+    result = asyncio.run(agent.arun("Go"))
+
+    assert result == "done"
+    assert tool.invocations == ["x"]
+    assert backend.calls[1][-1]["content"] == "[Tool:echo] tool ran with: x"
+
+
+def test_arun_offloads_sync_backend() -> None:
+    agent, backend = _make_agent(["hello"])
+
+    assert asyncio.run(agent.arun("Hi")) == "hello"
+    assert len(backend.calls) == 1
+
+
+def test_run_rejects_async_backend() -> None:
+    agent = SimpleAgent(backend=AsyncDummyBackend(["x"]), tools=[], system_prompt="Be helpful.")
+
+    with pytest.raises(TypeError):
+        agent.run("Hi")
+
+
+def test_stream_yields_answer_chunks_after_tool_call() -> None:
+    tool = RecordingTool()
+    backend = ChunkedBackend(['{"tool":"echo","input":"x"} trailing noise', "streamed answer"])
+    agent = SimpleAgent(backend=backend, tools=[tool], system_prompt="Be helpful.")
+
+    chunks = list(agent.stream("Go"))
+
+    assert "".join(chunks) == "streamed answer"
+    assert len(chunks) > 1
+    assert tool.invocations == ["x"]
+    # The tool call was dispatched before the trailing text was consumed.
+    assert "noise" not in "".join(backend.consumed)
+
+
+def test_stream_and_run_dispatch_the_same_prose_embedded_call() -> None:
+    replies = ['Sure, let me compute that.\n{"tool": "echo", "input": "2+2"}', "It is 4."]
+    streamed_tool, run_tool = RecordingTool(), RecordingTool()
+    streamed = SimpleAgent(backend=ChunkedBackend(replies), tools=[streamed_tool], system_prompt="Be helpful.")
+    ran = SimpleAgent(backend=DummyBackend(replies), tools=[run_tool], system_prompt="Be helpful.")
+
+    chunks = "".join(streamed.stream("Go"))
+
+    assert ran.run("Go") == "It is 4."
+    assert streamed_tool.invocations == run_tool.invocations == ["2+2"]
+    assert chunks == "Sure, let me compute that.\nIt is 4."
+    assert '"tool"' not in chunks
+
+
 @pytest.mark.parametrize(
     "text,expected",
     [
         ('{"tool":"echo","input":"test"}', {"tool": "echo", "input": "test"}),
         ("```json\n{\"tool\": \"echo\"}\n```", {"tool": "echo"}),
         ("Some text", None),
+        ('[{"tool":"a"},{"tool":"b"}]', {"tool": "a"}),
     ],
 )
 def test_maybe_extract_tool_request_variants(text: str, expected: dict | None) -> None:
     assert SimpleAgent._maybe_extract_tool_request(text) == expected  # type: ignore[arg-type]
 
 
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ('[{"tool":"a"},{"tool":"b","input":"x"}]', [{"tool": "a"}, {"tool": "b", "input": "x"}]),
+        ('{"tool":"a"}', [{"tool": "a"}]),
+        ("[1, 2]", None),
+        ("[]", None),
+    ],
+)
+def test_maybe_extract_tool_requests_accepts_arrays(text: str, expected: list | None) -> None:
+    assert SimpleAgent._maybe_extract_tool_requests(text) == expected
+
+
 def test_truncate_adds_ellipsis_when_text_is_long() -> None:
     text = "abc" * 200
     truncated = _truncate(text, limit=10)
     assert truncated.endswith("…")
     assert len(truncated) == 11
+
+
+def test_each_run_gets_its_own_run_context() -> None:
+    seen: list = []
+
+    class ContextTool(SimpleTool):
+        def __init__(self) -> None:
+            super().__init__(name="ctx", description="Records the active run.")
+
+        def run(self, query: str) -> str:
+            seen.append(current_run())
+            return "ok"
+
+    call = '{"tool": "ctx", "input": ""}'
+    agent, _ = _make_agent([call, call, "done", call, "done"], tools=[ContextTool()])
+    agent.run("first")
+    agent.run("second")
+
+    assert seen[0] is seen[1] and seen[1] is not seen[2]
+    assert seen[0]._closed and seen[2]._closed
+    assert current_run() is None
@@ -0,0 +1,307 @@
+"""Tests for the HTTP backends and backend factory."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+import pytest
+
+from simple_agent.backends.base import BackendError, ToolCall, ToolSpec
+from simple_agent.backends.chatgpt import AsyncChatGPTBackend, ChatGPTBackend
+from simple_agent.backends.factory import get_async_backend, get_backend
+from simple_agent.backends.gemini import AsyncGeminiBackend, GeminiBackend
+from simple_agent.backends.session import build_session
+from simple_agent.config import Settings
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200, lines: list[str] | None = None) -> None:
+        self._payload = payload
+        self.status_code = status_code
+        self.text = ""
+        self.reason = ""
+        self.headers: dict[str, str] = {}
+        self.lines = lines or []
+
+    def __enter__(self) -> "FakeResponse":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def iter_lines(self) -> Iterator[str]:
+        return iter(self.lines)
+
+    def json(self) -> dict:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class FakeSession:
+    """Session stand-in that records every post call."""
+
+    def __init__(self, payload: dict, lines: list[str] | None = None) -> None:
+        self.payload = payload
+        self.lines = lines
+        self.calls: list[dict[str, Any]] = []
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:
+        self.calls.append({"url": url, **kwargs})
+        return FakeResponse(self.payload, lines=self.lines)
+
+    def close(self) -> None:
+        return None
+
+
+def _settings(**overrides: Any) -> Settings:
+    values: dict[str, Any] = {
+        "backend": "chatgpt",
+        "system_prompt": "Be helpful.",
+        "openai_api_key": "sk-test",
+        "openai_model": "gpt-test",
+        "gemini_api_key": "gm-test",
+        "gemini_model": "gemini-test",
+        "request_timeout": 12.0,
+        "python_tool_imports": (),
+    }
+    values.update(overrides)
+    return Settings(**values)
+
+
+def test_build_session_configures_pool_and_keep_alive() -> None:
+    session = build_session(pool_size=3, keep_alive=False, max_retries=4)
+
+    adapter = session.get_adapter("https://api.openai.com")
+    assert adapter._pool_maxsize == 3  # type: ignore[attr-defined]
+    assert adapter.max_retries.total == 4
+    assert adapter.max_retries.connect == 4
+    assert adapter.max_retries.read == 0
+    assert session.headers["Connection"] == "close"
+
+
+def test_chatgpt_backend_reuses_session_across_turns() -> None:
+    session = FakeSession({"choices": [{"message": {"content": " hi "}}]})
+    backend = ChatGPTBackend("sk", "gpt", timeout=7, connect_timeout=2, session=session)  # type: ignore[arg-type]
+
+    assert backend.generate([{"role": "user", "content": "a"}]) == "hi"
+    assert backend.generate([{"role": "user", "content": "b"}]) == "hi"
+    assert len(session.calls) == 2
+    assert session.calls[0]["timeout"] == (2, 7)
+
+
+def test_gemini_backend_uses_owned_session() -> None:
+    session = FakeSession({"candidates": [{"content": {"parts": [{"text": "yo"}]}}]})
+    backend = GeminiBackend("key", "gemini", session=session)  # type: ignore[arg-type]
+
+    assert backend.generate([{"role": "user", "content": "hello"}]) == "yo"
+    assert ":generateContent" in session.calls[0]["url"]
+
+
+def test_chatgpt_backend_declares_tools_and_parses_tool_calls() -> None:
+    call = {"type": "function", "function": {"name": "time", "arguments": '{"input": "utc"}'}}
+    session = FakeSession({"choices": [{"message": {"content": None, "tool_calls": [call]}}]})
+    backend = ChatGPTBackend("sk", "gpt", session=session)  # type: ignore[arg-type]
+
+    result = backend.generate_with_tools([{"role": "user", "content": "a"}], [ToolSpec("time", "Clock.")])
+
+    assert result.text == ""
+    assert result.tool_calls == [ToolCall("time", "utc")]
+    declared = session.calls[0]["json"]["tools"][0]
+    assert declared["function"]["name"] == "time"
+    assert declared["function"]["parameters"]["required"] == ["input"]
+
+
+def test_gemini_backend_declares_function_declarations() -> None:
+    parts = [{"text": "Checking. "}, {"functionCall": {"name": "calculator", "args": {"input": "2+2"}}}]
+    session = FakeSession({"candidates": [{"content": {"parts": parts}}]})
+    backend = GeminiBackend("key", "gemini", session=session)  # type: ignore[arg-type]
+
+    result = backend.generate_with_tools([{"role": "user", "content": "a"}], [ToolSpec("calculator", "Math.")])
+
+    assert result.text == "Checking."
+    assert result.tool_calls == [ToolCall("calculator", "2+2")]
+    assert session.calls[0]["json"]["tools"][0]["functionDeclarations"][0]["name"] == "calculator"
+
+
+def test_chatgpt_backend_streams_sse_deltas() -> None:
+    lines = [
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+        "",
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+        'data: {"choices": [{"delta": {"content": "lo"}}]}',
+        "data: [DONE]",
+    ]
+    session = FakeSession({}, lines=lines)
+    backend = ChatGPTBackend("sk", "gpt", session=session)  # type: ignore[arg-type]
+
+    assert list(backend.stream([{"role": "user", "content": "a"}])) == ["Hel", "lo"]
+    assert session.calls[0]["json"]["stream"] is True
+    assert session.calls[0]["stream"] is True
+
+
+def test_gemini_backend_streams_sse_chunks() -> None:
+    lines = [
+        'data: {"candidates": [{"content": {"parts": [{"text": "Hi "}]}}]}',
+        'data: {"candidates": [{"content": {"parts": [{"text": "there"}]}, "finishReason": "STOP"}]}',
+    ]
+    session = FakeSession({}, lines=lines)
+    backend = GeminiBackend("key", "gemini", session=session)  # type: ignore[arg-type]
+
+    assert list(backend.stream([{"role": "user", "content": "a"}])) == ["Hi ", "there"]
+    assert ":streamGenerateContent?alt=sse" in session.calls[0]["url"]
+
+
+def test_get_backend_passes_http_settings() -> None:
+    backend = get_backend(_settings(http_pool_size=4, http_max_retries=1, connect_timeout=3.0))
+
+    assert isinstance(backend, ChatGPTBackend)
+    assert backend.connect_timeout == 3.0
+    assert backend.timeout == 12.0
+    assert backend.session.get_adapter("https://x").max_retries.total == 1
+
+
+def test_async_backends_get_their_own_larger_pool() -> None:
+    settings = _settings(http_pool_size=4)
+
+    assert get_async_backend(settings).pool_size == 100
+    assert get_async_backend(_settings(http_async_pool_size=0)).pool_size == 0
+    assert get_backend(settings).session.get_adapter("https://x")._pool_maxsize == 4
+
+
+def test_failover_members_leave_retries_to_the_failover_layer() -> None:
+    backend = get_backend(_settings(http_max_retries=2, backend_fallbacks=("gemini",)))
+
+    assert [type(member).__name__ for member in backend.backends] == ["ChatGPTBackend", "GeminiBackend"]
+    assert all(member.session.get_adapter("https://x").max_retries.total == 0 for member in backend.backends)
+
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.requests.append((self.path, json.loads(body)))  # type: ignore[attr-defined]
+        status, payload = self.server.reply  # type: ignore[attr-defined]
+        if isinstance(payload, bytes):
+            # An event stream cut short: promise more than is sent, then hang up.
+            self.send_response(status)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(payload) + 1024))
+            self.end_headers()
+            self.wfile.write(payload)
+            self.close_connection = True
+            return
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+
+@pytest.fixture()
+def stub_server() -> Iterator[ThreadingHTTPServer]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []  # type: ignore[attr-defined]
+    server.reply = (200, {})  # type: ignore[attr-defined]
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def test_async_chatgpt_backend_posts_shared_payload(stub_server: ThreadingHTTPServer) -> None:
+    stub_server.reply = (200, {"choices": [{"message": {"content": "async hi"}}]})  # type: ignore[attr-defined]
+    backend = AsyncChatGPTBackend("sk", "gpt", base_url=_url(stub_server))
+
+    async def scenario() -> str:
+        try:
+            return await backend.agenerate([{"role": "user", "content": "a"}])
+        finally:
+            await backend.aclose()
+
+    assert asyncio.run(scenario()) == "async hi"
+    path, payload = stub_server.requests[0]  # type: ignore[attr-defined]
+    assert path == "/chat/completions"
+    assert payload["model"] == "gpt"
+
+
+def test_async_gemini_backend_surfaces_error_detail(stub_server: ThreadingHTTPServer) -> None:
+    stub_server.reply = (400, {"error": {"message": "bad key"}})  # type: ignore[attr-defined]
+    backend = AsyncGeminiBackend("key", "gemini", base_url=_url(stub_server))
+
+    async def scenario() -> str:
+        try:
+            return await backend.agenerate([{"role": "user", "content": "a"}])
+        finally:
+            await backend.aclose()
+
+    with pytest.raises(RuntimeError, match="bad key"):
+        asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    ("backend_class", "event"),
+    [
+        (ChatGPTBackend, b'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'),
+        (GeminiBackend, b'data: {"candidates": [{"content": {"parts": [{"text": "Hel"}]}}]}\n\n'),
+    ],
+)
+def test_stream_dropped_mid_reply_raises_retryable_backend_error(
+    stub_server: ThreadingHTTPServer, backend_class: type, event: bytes
+) -> None:
+    stub_server.reply = (200, event)  # type: ignore[attr-defined]
+    backend = backend_class("key", "model", base_url=_url(stub_server), max_retries=0)
+
+    with pytest.raises(BackendError, match="stream failed") as excinfo:
+        list(backend.stream([{"role": "user", "content": "a"}]))
+
+    assert excinfo.value.retryable
+
+
+@pytest.mark.parametrize("backend_class", [ChatGPTBackend, GeminiBackend])
+def test_malformed_stream_event_raises_non_retryable_backend_error(backend_class: type) -> None:
+    session = FakeSession({}, lines=["data: {not json"])
+    backend = backend_class("key", "model", session=session)
+
+    with pytest.raises(BackendError, match="malformed stream event") as excinfo:
+        list(backend.stream([{"role": "user", "content": "a"}]))
+
+    assert not excinfo.value.retryable
+
+
+def test_get_async_backend_selects_provider() -> None:
+    backend = get_async_backend(_settings(backend="gemini"))
+
+    assert isinstance(backend, AsyncGeminiBackend)
+
+
+def test_package_import_defers_backends_tools_and_dotenv() -> None:
+    code = (
+        "import sys, simple_agent\n"
+        "heavy = {'aiohttp', 'requests', 'dotenv', 'simple_agent.backends.chatgpt', 'simple_agent.tools.math_tool'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+        "simple_agent.get_backend\n"
+        "print('simple_agent.backends.gemini' in sys.modules)"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert completed.stdout.split("\n")[:2] == ["[]", "False"]
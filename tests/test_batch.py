@@ -0,0 +1,67 @@
+"""Tests for batch mode."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.base import LLMBackend, Message
+from simple_agent.batch import run_batch
+
+
+class EchoBackend(LLMBackend):
+    """Answers with the user prompt, failing on request."""
+
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+
+    def generate(self, messages: List[Message]) -> str:
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        if prompt == "fail":
+            raise RuntimeError("backend exploded")
+        return f"echo: {prompt}"
+
+
+def _write_input(path: Path, lines: list[str]) -> None:
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _read_output(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_run_batch_writes_results_in_input_order(tmp_path: Path) -> None:
+    source, sink = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    prompts = [json.dumps({"id": f"q{i}", "prompt": f"p{i}"}) for i in range(20)]
+    _write_input(source, prompts + ['"plain string"', json.dumps({"prompt": "fail"}), ""])
+    agent = SimpleAgent(backend=EchoBackend(), tools=[], system_prompt="s")
+
+    summary = run_batch(agent, source, sink, concurrency=3)
+
+    records = _read_output(sink)
+    assert [record["line"] for record in records] == list(range(1, 24))
+    assert records[0] == {**records[0], "id": "q0", "response": "echo: p0", "error": None}
+    assert records[20]["response"] == "echo: plain string"
+    assert records[21]["error"] == "backend exploded"
+    assert records[22]["error"] == "Empty line."
+    assert all(record["elapsed"] >= 0 for record in records)
+    assert (summary.processed, summary.failed, summary.skipped) == (23, 2, 0)
+
+
+def test_run_batch_resumes_after_last_complete_line(tmp_path: Path) -> None:
+    source, sink = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write_input(source, [json.dumps(f"p{i}") for i in range(5)])
+    done = [json.dumps({"line": n, "id": None, "response": "old", "error": None, "elapsed": 0}) for n in (1, 2)]
+    sink.write_text("\n".join(done) + '\n{"line": 3, "resp', encoding="utf-8")
+    backend = EchoBackend()
+    agent = SimpleAgent(backend=backend, tools=[], system_prompt="s")
+
+    summary = run_batch(agent, source, sink, concurrency=2)
+
+    records = _read_output(sink)
+    assert [record["line"] for record in records] == [1, 2, 3, 4, 5]
+    assert sorted(backend.prompts) == ["p2", "p3", "p4"]  # two workers may call the backend in either order
+    assert summary.skipped == 2
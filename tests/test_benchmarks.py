@@ -0,0 +1,28 @@
+"""Tests for the benchmark suite's baseline comparison."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from benchmarks.suite import compare, main
+
+
+def _results(**cases: float) -> dict:
+    return {"meta": {}, "results": {name: {"seconds_per_op": value} for name, value in cases.items()}}
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold() -> None:
+    baseline = _results(fast=1.0, steady=1.0, slow=1.0)
+    current = _results(fast=0.5, steady=1.05, slow=1.5)
+
+    assert compare(baseline, current, threshold=0.1) == ["slow"]
+
+
+def test_compare_command_exits_non_zero_on_regression(tmp_path: Path) -> None:
+    baseline, current = tmp_path / "baseline.json", tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(agent_run=1.0)))
+    current.write_text(json.dumps(_results(agent_run=1.3)))
+
+    assert main(["compare", str(baseline), str(current), "--threshold", "0.5"]) == 0
+    assert main(["compare", str(baseline), str(current), "--threshold", "0.2"]) == 1
@@ -0,0 +1,122 @@
+"""Tests for the response cache wrapper."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Iterator, List, Sequence
+
+from simple_agent.backends.base import BackendResult, LLMBackend, Message, ToolCall, ToolSpec
+from simple_agent.backends.cache import CachingBackend, MemoryCache, SQLiteCache
+from simple_agent.backends.chatgpt import ChatGPTBackend
+from simple_agent.backends.factory import get_backend
+from simple_agent.config import Settings
+
+
+class CountingBackend(LLMBackend):
+    def __init__(self, model: str = "m") -> None:
+        self.model = model
+        self.calls = 0
+
+    def generate(self, messages: List[Message]) -> str:
+        self.calls += 1
+        return f"reply {self.calls}"
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        self.calls += 1
+        yield "str"
+        yield "eamed"
+
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+
+def test_repeated_prompt_is_served_from_memory() -> None:
+    inner = CountingBackend()
+    backend = CachingBackend(inner)
+
+    assert backend.generate(MESSAGES) == "reply 1"
+    assert backend.generate([{"role": "system", "content": "sys "}, {"role": "user", "content": " hi"}]) == "reply 1"
+    assert inner.calls == 1
+    assert backend.stats.memory_hits == 1
+    assert backend.stats.misses == 1
+
+
+def test_key_includes_model() -> None:
+    assert CachingBackend(CountingBackend("a")).key_for(MESSAGES) != CachingBackend(CountingBackend("b")).key_for(MESSAGES)
+
+
+def test_tool_calling_results_are_cached_separately() -> None:
+    class ToolCallingBackend(CountingBackend):
+        supports_native_tools = True
+
+        def generate_with_tools(self, messages: List[Message], tools: Sequence[ToolSpec]) -> BackendResult:
+            self.calls += 1
+            return BackendResult("", [ToolCall("time", "now")])
+
+    inner = ToolCallingBackend()
+    backend = CachingBackend(inner)
+    tools = [ToolSpec("time", "Clock.")]
+
+    assert backend.supports_native_tools
+    assert backend.generate_with_tools(MESSAGES, tools).tool_calls == [ToolCall("time", "now")]
+    assert backend.generate_with_tools(MESSAGES, tools).tool_calls == [ToolCall("time", "now")]
+    assert backend.generate(MESSAGES) == "reply 2"
+    assert inner.calls == 2
+
+
+def test_memory_cache_evicts_lru_and_expires() -> None:
+    cache = MemoryCache(max_entries=2, ttl=0.05)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.evictions == 2
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite"
+    first = CachingBackend(CountingBackend(), disk=SQLiteCache(path))
+    first.generate(MESSAGES)
+    first.close()
+
+    inner = CountingBackend()
+    second = CachingBackend(inner, disk=SQLiteCache(path))
+
+    assert second.generate(MESSAGES) == "reply 1"
+    assert inner.calls == 0
+    assert second.stats.disk_hits == 1
+    second.close()
+
+
+def test_stream_is_cached_after_full_consumption() -> None:
+    inner = CountingBackend()
+    backend = CachingBackend(inner)
+
+    assert list(backend.stream(MESSAGES)) == ["str", "eamed"]
+    assert list(backend.stream(MESSAGES)) == ["streamed"]
+    assert inner.calls == 1
+
+
+def test_get_backend_wraps_when_cache_enabled() -> None:
+    settings = Settings(
+        backend="chatgpt",
+        system_prompt="s",
+        openai_api_key="sk",
+        openai_model="gpt",
+        gemini_api_key=None,
+        gemini_model="g",
+        request_timeout=5,
+        python_tool_imports=(),
+        response_cache=True,
+    )
+
+    backend = get_backend(settings)
+
+    assert isinstance(backend, CachingBackend)
+    assert isinstance(backend.backend, ChatGPTBackend)
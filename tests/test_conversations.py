@@ -0,0 +1,95 @@
+"""Tests for stored conversations and resumable runs."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.base import LLMBackend, Message
+from simple_agent.conversations import ConversationStore
+from simple_agent.tools.base import SimpleTool
+
+
+class CountingTool(SimpleTool):
+    def __init__(self) -> None:
+        super().__init__(name="lookup", description="Looks things up.")
+        self.calls: list[str] = []
+
+    def run(self, query: str) -> str:
+        self.calls.append(query)
+        return f"result for {query}"
+
+
+class ReplayBackend(LLMBackend):
+    """Returns queued replies; an exception in the queue is raised instead."""
+
+    def __init__(self, replies: List[object]) -> None:
+        self.replies = list(replies)
+        self.sent: List[List[Message]] = []
+
+    def generate(self, messages: List[Message]) -> str:
+        self.sent.append([dict(message) for message in messages])
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        return str(reply)
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> ConversationStore:
+    conversations = ConversationStore(tmp_path / "conversations.sqlite")
+    yield conversations
+    conversations.close()
+
+
+def test_store_appends_in_order_and_keeps_conversations_apart(store: ConversationStore) -> None:
+    store.append("a", [{"role": "user", "content": "hi"}])
+    store.append("b", [{"role": "user", "content": "other"}])
+    store.append("a", [{"role": "assistant", "content": "hello"}, {"role": "user", "content": "again"}])
+
+    assert [message["content"] for message in store.load("a")] == ["hi", "hello", "again"]
+    assert store.pending("a") and store.pending("b")
+    assert store.load("missing") == [] and not store.pending("missing")
+
+
+def test_follow_up_turn_sees_earlier_turns(store: ConversationStore) -> None:
+    backend = ReplayBackend(["Paris.", "About 2.1 million."])
+    agent = SimpleAgent(backend=backend, tools=[], system_prompt="Be brief.", conversation_store=store)
+
+    assert agent.run("Capital of France?", conversation="trip") == "Paris."
+    assert agent.run("Its population?", conversation="trip") == "About 2.1 million."
+
+    contents = [message["content"] for message in backend.sent[1]]
+    assert contents[1:] == ["Capital of France?", "Paris.", "Its population?"]
+    assert not store.pending("trip")
+
+
+def test_crashed_run_resumes_without_running_its_tools_again(store: ConversationStore) -> None:
+    tool = CountingTool()
+    crashing = ReplayBackend(['{"tool": "lookup", "input": "weather"}', RuntimeError("connection reset")])
+    agent = SimpleAgent(backend=crashing, tools=[tool], system_prompt="s", conversation_store=store)
+    with pytest.raises(RuntimeError, match="connection reset"):
+        agent.run("What's the weather?", conversation="c1")
+    assert store.pending("c1")
+
+    backend = ReplayBackend(["Sunny."])
+    resumed = SimpleAgent(backend=backend, tools=[tool], system_prompt="s", conversation_store=store)
+    assert resumed.run("", conversation="c1") == "Sunny."
+
+    assert tool.calls == ["weather"]
+    assert backend.sent[0][-1]["content"] == "[Tool:lookup] result for weather"
+    with pytest.raises(ValueError, match="no unfinished run"):
+        resumed.run("", conversation="c1")
+
+
+def test_arun_and_stream_record_answers(store: ConversationStore) -> None:
+    agent = SimpleAgent(backend=ReplayBackend(["one", "two"]), tools=[], system_prompt="s", conversation_store=store)
+
+    assert asyncio.run(agent.arun("first", conversation="mixed")) == "one"
+    assert "".join(agent.stream("second", conversation="mixed")) == "two"
+
+    assert [message["content"] for message in store.load("mixed")] == ["first", "one", "second", "two"]
@@ -0,0 +1,127 @@
+"""Tests for the failover backend."""
+
+from __future__ import annotations
+
+import time
+from typing import Iterator, List
+
+import pytest
+
+from simple_agent.backends.base import BackendError, LLMBackend, Message
+from simple_agent.backends.failover import CircuitBreaker, FailoverBackend
+from simple_agent.backends.session import parse_retry_after
+
+
+class ScriptedProvider(LLMBackend):
+    """Replays a script of replies and errors, optionally after a delay."""
+
+    def __init__(self, name: str, script: List[object], *, delay: float = 0.0) -> None:
+        self.name = name
+        self.script = list(script)
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, messages: List[Message]) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        step = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(step, BaseException):
+            raise step
+        return str(step)
+
+    def stream(self, messages: List[Message]) -> Iterator[str]:
+        yield from self.generate(messages).split(" ")
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def test_fails_over_on_server_errors_and_not_on_success() -> None:
+    primary = ScriptedProvider("primary", [BackendError("overloaded", status_code=503), "primary"])
+    secondary = ScriptedProvider("secondary", ["secondary"])
+    backend = FailoverBackend([primary, secondary], hedge=False, sleep=lambda _: None)
+
+    assert backend.generate(MESSAGES) == "secondary"
+    assert backend.generate(MESSAGES) == "primary"
+    assert (primary.calls, secondary.calls) == (2, 1)
+    assert backend.stats.failovers == 1
+
+
+def test_client_errors_fail_over_but_are_not_retried() -> None:
+    bad = BackendError("bad request", status_code=400)
+    primary = ScriptedProvider("primary", [bad])
+    secondary = ScriptedProvider("secondary", [BackendError("bad key", status_code=401)])
+    backend = FailoverBackend([primary, secondary], hedge=False, sleep=lambda _: pytest.fail("retried"))
+
+    with pytest.raises(BackendError, match="bad request"):
+        backend.generate(MESSAGES)
+    assert (primary.calls, secondary.calls) == (1, 1)
+
+
+def test_retries_honour_retry_after_and_stop_when_it_is_too_long() -> None:
+    limited = BackendError("slow down", status_code=429, retry_after=1.5)
+    primary = ScriptedProvider("primary", [limited, "ok"])
+    delays: list[float] = []
+    backend = FailoverBackend([primary], hedge=False, backoff=0.01, sleep=delays.append)
+
+    assert backend.generate(MESSAGES) == "ok"
+    assert delays == [1.5]
+
+    primary.script = [BackendError("come back tomorrow", status_code=429, retry_after=86400), "ok"]
+    with pytest.raises(BackendError, match="tomorrow"):
+        backend.generate(MESSAGES)
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_circuit_breaker_skips_a_failing_backend_until_reset() -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] = 10.0
+    assert breaker.allow() and not breaker.allow()  # one trial call while half-open
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+    primary = ScriptedProvider("primary", [BackendError("down", status_code=500)])
+    secondary = ScriptedProvider("secondary", ["up"])
+    backend = FailoverBackend([primary, secondary], hedge=False, failure_threshold=2, sleep=lambda _: None)
+    for _ in range(5):
+        assert backend.generate(MESSAGES) == "up"
+    assert primary.calls == 2
+    assert backend.stats.short_circuits == 3
+
+
+def test_half_open_trial_is_resolved_by_every_kind_of_error() -> None:
+    unavailable = BackendError("overloaded", status_code=503)
+    primary = ScriptedProvider(
+        "primary",
+        [unavailable, BackendError("bad request", status_code=400), unavailable, RuntimeError("unparseable"), "ok"],
+    )
+    backend = FailoverBackend([primary], hedge=False, max_retries=0, failure_threshold=1, reset_timeout=0)
+
+    for error in ("overloaded", "bad request", "overloaded", "unparseable"):
+        with pytest.raises(Exception, match=error):
+            backend.generate(MESSAGES)
+        if error == "bad request":
+            assert backend.breaker(0).state == "closed"
+
+    assert backend.generate(MESSAGES) == "ok"
+    assert primary.calls == 5
+
+
+def test_hedged_request_returns_the_faster_backend() -> None:
+    slow = ScriptedProvider("slow", ["slow"], delay=0.5)
+    fast = ScriptedProvider("fast", ["fast"], delay=0.01)
+    backend = FailoverBackend([slow, fast], hedge_delay=0.05)
+    try:
+        start = time.perf_counter()
+        assert backend.generate(MESSAGES) == "fast"
+        assert time.perf_counter() - start < 0.3
+        assert (backend.stats.hedges, backend.stats.hedge_wins) == (1, 1)
+        assert list(backend.stream(MESSAGES)) == ["slow"]  # streams are never hedged
+    finally:
+        backend.close()
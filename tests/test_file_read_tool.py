@@ -0,0 +1,62 @@
+"""Tests for windowed reads in the file reader tool."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from simple_agent.tools import line_index
+from simple_agent.tools.file_read_tool import FileReadTool
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Force many checkpoints and chunk-straddling lines on small fixtures.
+    monkeypatch.setattr(line_index, "CHUNK_SIZE", 64)
+    monkeypatch.setattr(line_index, "CHECKPOINT_BYTES", 16)
+
+
+def _write_lines(path: Path, count: int, newline: str = "\n") -> list[str]:
+    lines = [f"line {index} " + "x" * (index % 7) for index in range(1, count + 1)]
+    path.write_text(newline.join(lines) + newline, encoding="utf-8", newline="")
+    return lines
+
+
+@pytest.mark.parametrize("query, expected", [("1-3", (0, 3)), ("450-460", (449, 460)), ("990", (989, 1000)), ("", (0, 80))])
+def test_windows_match_full_file_slicing(tmp_path: Path, query: str, expected: tuple[int, int]) -> None:
+    lines = _write_lines(tmp_path / "big.log", 1000)
+    tool = FileReadTool(base_dir=tmp_path)
+
+    result = tool.run(f"big.log:{query}" if query else "big.log")
+
+    start, end = expected
+    assert result == "big.log:\n" + "\n".join(lines[start:end])
+
+
+def test_repeated_reads_reuse_index_until_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "log.txt"
+    _write_lines(path, 300, newline="\r\n")
+    tool = FileReadTool(base_dir=tmp_path)
+
+    assert tool.run("log.txt:200-201") == "log.txt:\nline 200 " + "x" * (200 % 7) + "\nline 201 " + "x" * (201 % 7)
+    assert tool.run("log.txt:5-5") == "log.txt:\nline 5 " + "x" * 5
+
+    path.write_text("replaced\n", encoding="utf-8")
+    assert tool.run("log.txt:1-2") == "log.txt:\nreplaced"
+    assert tool.run("log.txt:200-201") == "log.txt:\n(file empty)"
+
+
+def test_long_lines_are_capped_without_reading_the_rest(tmp_path: Path) -> None:
+    (tmp_path / "wide.txt").write_text("y" * 100_000 + "\nnext\n", encoding="utf-8")
+    tool = FileReadTool(base_dir=tmp_path, max_chars=50)
+
+    assert tool.run("wide.txt") == "wide.txt:\n" + "y" * 50 + "…"
+
+
+def test_only_newlines_end_lines(tmp_path: Path) -> None:
+    (tmp_path / "f.txt").write_bytes("a\rb\nc\x0cd\u2028\ne\r\nf\n".encode())
+    tool = FileReadTool(base_dir=tmp_path)
+
+    assert tool.run("f.txt:2-3") == "f.txt:\nc\x0cd\u2028\ne"
+    assert tool.run("f.txt:1") == "f.txt:\na\rb\nc\x0cd\u2028\ne\nf"
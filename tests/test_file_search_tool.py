@@ -0,0 +1,120 @@
+"""Tests for the indexed file search tool."""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from simple_agent.tools.file_search_tool import FileSearchTool
+from simple_agent.tools.search_index import TrigramIndex, regex_trigrams
+
+
+def _tree(root: Path) -> None:
+    (root / "pkg").mkdir()
+    (root / "pkg" / "tools.py").write_text("import re\n\ndef math_tool():\n    return 1\n", encoding="utf-8")
+    (root / "pkg" / "notes.md").write_text("# Notes\nThe Math tool is handy.\n", encoding="utf-8")
+    (root / "blob.bin").write_bytes(b"def math_tool\0\0")
+    (root / ".git").mkdir()
+    (root / ".git" / "config").write_text("def math_tool", encoding="utf-8")
+
+
+def test_substring_and_regex_searches_report_paths_and_lines(tmp_path: Path) -> None:
+    _tree(tmp_path)
+    tool = FileSearchTool(base_dir=tmp_path)
+
+    assert tool.run("def math_tool") == "pkg/tools.py:3: def math_tool():"
+    assert tool.run("/math.tool/i") == "pkg/notes.md:2: The Math tool is handy.\npkg/tools.py:3: def math_tool():"
+    assert tool.run("missing text").startswith("No matches")
+    assert tool.run("/(unclosed/").startswith("Invalid regular expression")
+
+
+def test_refresh_only_reindexes_changed_files(tmp_path: Path) -> None:
+    _tree(tmp_path)
+    index = TrigramIndex(tmp_path, tmp_path / ".cache" / "index.sqlite")
+
+    first = index.refresh()
+    assert (first.scanned, first.indexed) == (3, 2)
+    assert index.refresh().indexed == 0
+
+    notes = tmp_path / "pkg" / "notes.md"
+    notes.write_text("nothing here any more\n", encoding="utf-8")
+    os.utime(notes, ns=(1, 1))
+    (tmp_path / "pkg" / "tools.py").unlink()
+    second = index.refresh()
+    assert (second.indexed, second.removed) == (1, 1)
+    assert index.candidates(regex_trigrams("math")) == []
+    index.close()
+
+    # The index persists, so a new process only re-stats the tree.
+    reopened = TrigramIndex(tmp_path, tmp_path / ".cache" / "index.sqlite")
+    assert reopened.refresh().indexed == 0
+    assert reopened.candidates(regex_trigrams("any more")) == ["pkg/notes.md"]
+
+
+def test_processes_can_refresh_one_shared_index_at_once(tmp_path: Path) -> None:
+    root = tmp_path / "tree"
+    root.mkdir()
+    for number in range(300):
+        (root / f"file{number}.txt").write_text(f"line {number}\n", encoding="utf-8")
+    database = tmp_path / "index.sqlite"
+    code = (
+        "import sys\n"
+        "from simple_agent.tools.search_index import TrigramIndex\n"
+        "TrigramIndex(sys.argv[1], sys.argv[2]).refresh()"
+    )
+    processes = [
+        subprocess.Popen([sys.executable, "-c", code, str(root), str(database)], stderr=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    errors = [process.communicate(timeout=60)[1] for process in processes]
+
+    assert [process.returncode for process in processes] == [0] * 4, errors
+    index = TrigramIndex(root, database)
+    assert len(index) == 300
+    assert index.refresh().indexed == 0
+    assert index.candidates(regex_trigrams("line 299")) == ["file299.txt"]
+
+
+def test_index_errors_are_reported_instead_of_raised(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def locked(self: TrigramIndex) -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(TrigramIndex, "refresh", locked)
+
+    assert FileSearchTool(base_dir=tmp_path).run("text") == "File search index is unavailable: database is locked"
+
+
+def test_search_respects_refresh_interval(tmp_path: Path) -> None:
+    _tree(tmp_path)
+    tool = FileSearchTool(base_dir=tmp_path, refresh_interval=3600)
+    assert tool.run("brand new").startswith("No matches")
+
+    (tmp_path / "new.txt").write_text("brand new file\n", encoding="utf-8")
+    assert tool.run("brand new").startswith("No matches")
+
+    tool.refresh_interval = 0
+    assert tool.run("brand new") == "new.txt:1: brand new file"
+
+
+@pytest.mark.parametrize(
+    "pattern, text",
+    [
+        (r"def \w+_tool", "def math_tool"),
+        (r"colou?r map", "color map"),
+        (r"(foo|bar)baz", "barbaz"),
+        (r"ab{0,2}cde", "acde"),
+        (r"x[0-9]+yz\.py", "x12yz.py"),
+        (r"hello|world", "world"),
+        (r"Hel+o", "Hellllo"),
+    ],
+)
+def test_regex_trigrams_never_exclude_a_match(pattern: str, text: str) -> None:
+    assert re.search(pattern, text)
+    haystack = {text.lower().encode()[index : index + 3] for index in range(len(text) - 2)}
+    assert regex_trigrams(pattern) <= haystack
@@ -0,0 +1,135 @@
+"""Tests for token-budgeted history management."""
+
+from __future__ import annotations
+
+import json
+from typing import List
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.base import LLMBackend, Message
+from simple_agent.history import SUMMARY_HEADER, HistoryManager, TurnStats, estimate_message_tokens
+from simple_agent.tools.base import SimpleTool
+
+
+def _history(turns: int, output_chars: int = 4000) -> List[Message]:
+    history: List[Message] = [{"role": "system", "content": "sys"}, {"role": "user", "content": "question"}]
+    for turn in range(turns):
+        history.append({"role": "assistant", "content": json.dumps({"tool": "file_reader", "input": f"f{turn}"})})
+        history.append({"role": "user", "content": f"[Tool:file_reader] {turn}" + "x" * output_chars})
+    return history
+
+
+def test_history_under_budget_is_sent_unchanged() -> None:
+    session = HistoryManager(token_budget=100_000).session()
+    history = _history(2)
+
+    assert session.prepare(history) is history
+    assert session.turns[0].messages == 6
+    assert session.turns[0].compacted is False
+
+
+def test_old_tool_outputs_are_elided_first() -> None:
+    session = HistoryManager(token_budget=2500, keep_turns=1, tool_output_chars=100).session()
+    history = _history(3)
+
+    payload = session.prepare(history)
+
+    assert len(payload) == len(history)
+    assert payload[3]["content"].endswith("chars elided]")
+    assert payload[-1] == history[-1]
+    assert history[3]["content"].endswith("x")
+    assert estimate_message_tokens(payload) <= 2500
+
+
+def test_older_turns_are_summarized_incrementally() -> None:
+    seen: list[tuple[str, int]] = []
+
+    def summarizer(previous: str, messages: List[Message]) -> str:
+        seen.append((previous, len(messages)))
+        return f"summary{len(seen)}"
+
+    session = HistoryManager(token_budget=1200, keep_turns=1, tool_output_chars=2000, summarizer=summarizer).session()
+    history = _history(3)
+    session.prepare(history)
+    history.extend(_history(1)[2:])
+    payload = session.prepare(history)
+
+    assert seen == [("", 4), ("summary1", 2)]
+    assert [message["role"] for message in payload] == ["system", "user", "assistant", "user"]
+    assert payload[1]["content"] == f"question\n\n{SUMMARY_HEADER}\nsummary2"
+
+
+def test_older_turns_are_dropped_without_a_summarizer() -> None:
+    session = HistoryManager(token_budget=300, keep_turns=1, tool_output_chars=200).session()
+
+    payload = session.prepare(_history(4))
+
+    assert "6 earlier messages omitted" in payload[1]["content"]
+    assert len(payload) == 4
+    assert estimate_message_tokens(payload) <= 300
+
+
+class BigTool(SimpleTool):
+    def __init__(self) -> None:
+        super().__init__(name="big", description="Big output.")
+
+    def run(self, query: str) -> str:
+        return "y" * 4000
+
+
+class EchoToolBackend(LLMBackend):
+    def __init__(self, tool_turns: int) -> None:
+        self.remaining = tool_turns
+        self.sizes: list[int] = []
+
+    def generate(self, messages: List[Message]) -> str:
+        self.sizes.append(sum(len(message["content"]) for message in messages))
+        if self.remaining:
+            self.remaining -= 1
+            return json.dumps({"tool": "big", "input": ""})
+        return "done"
+
+
+def test_continued_conversation_pins_the_latest_prompt() -> None:
+    earlier: List[Message] = [
+        {"role": "user", "content": "old question " + "o" * 2000},
+        {"role": "assistant", "content": "old answer"},
+    ]
+    prompt = {"role": "user", "content": "new question " + "n" * 1000}
+    history = [{"role": "system", "content": "sys"}, *earlier, prompt, *_history(3)[2:]]
+
+    elided = HistoryManager(token_budget=3500, keep_turns=1, tool_output_chars=100).session().prepare(history)
+    assert elided[1]["content"].endswith("chars elided]")
+    assert elided[3] == prompt
+
+    dropped = HistoryManager(token_budget=1200, keep_turns=1, tool_output_chars=100).session().prepare(history)
+    assert [message["role"] for message in dropped] == ["system", "user", "assistant", "user"]
+    assert dropped[1]["content"].startswith(prompt["content"])
+    assert "6 earlier messages omitted" in dropped[1]["content"]
+
+
+def test_budget_is_a_soft_target_when_pinned_messages_exceed_it() -> None:
+    prompt = "p" * 8000
+    history = [{"role": "system", "content": "sys"}, {"role": "user", "content": prompt}, *_history(2)[2:]]
+
+    payload = HistoryManager(token_budget=500, keep_turns=1, tool_output_chars=100).session().prepare(history)
+
+    assert payload[1]["content"].startswith(prompt)
+    assert payload[-1]["content"].endswith("chars elided]")
+    assert estimate_message_tokens(payload) > 500
+
+
+def test_agent_payload_stays_bounded_across_turns() -> None:
+    stats: list[TurnStats] = []
+    backend = EchoToolBackend(tool_turns=8)
+    agent = SimpleAgent(
+        backend=backend,
+        tools=[BigTool()],
+        system_prompt="s",
+        history_manager=HistoryManager(token_budget=3000, keep_turns=1, on_turn=stats.append),
+    )
+
+    assert agent.run("go", max_turns=10) == "done"
+    assert [stat.turn for stat in stats] == list(range(1, 10))
+    assert max(stat.tokens for stat in stats) <= 3000
+    assert backend.sizes[-1] < 12_000
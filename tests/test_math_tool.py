@@ -0,0 +1,135 @@
+"""Tests for the compiled calculator tool."""
+
+from __future__ import annotations
+
+import gc
+import json
+import time
+
+import pytest
+
+from simple_agent.tools.math_tool import MathTool, compile_expression
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("2 * (3 + 4)", "14"),
+        ("-7 // 2 + 2 ** 10 % 7", "-2"),
+        ("sqrt(16) + floor(pi)", "7.0"),
+        ("max([1, 5, 3]) + sum((1, 2))", "8"),
+        ('{"expression": "hypot(x, y)", "variables": {"x": 3, "y": 4}}', "5.0"),
+    ],
+)
+def test_expressions(query: str, expected: str) -> None:
+    assert MathTool().run(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query, error",
+    [
+        ("__import__('os')", "Unknown function '__import__'"),
+        ("(1).real", "Unsupported expression"),
+        ("'a' * 3", "Unsupported expression"),
+        ("x + 1", "Missing values for x"),
+        ('{"expression": "x + 1", "variables": {"x": "1"}}', "must be a number"),
+    ],
+)
+def test_rejected_expressions(query: str, error: str) -> None:
+    result = MathTool().run(query)
+    assert result.startswith("Could not evaluate expression") and error in result
+
+
+def test_power_limit_counts_the_leading_bit_of_exact_powers() -> None:
+    tool = MathTool()
+
+    assert tool.run("log2(2 ** 9999)") == "9999.0"  # 10000 bits, exactly the limit
+    assert tool.run("2 ** 10000").startswith("Could not evaluate expression")
+    assert tool.run("(-2) ** 10000").startswith("Could not evaluate expression")
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "9 ** 9 ** 9",
+        "2 ** 10 ** 100",
+        "(-3) ** 99999999",
+        "10 ** 2000 * 10 ** 2000 * 10 ** 2000",
+        "prod([10 ** 2000, 10 ** 2000, 10 ** 2000, 10 ** 2000, 10 ** 2000, 10 ** 2000])",
+        "factorial(10 ** 9)",
+        "comb(10 ** 9, 10 ** 8) + perm(10 ** 6)",
+        "lcm(2 ** 9000 - 1, 3 ** 6000 - 1)",
+        "[1] * 10 ** 9",
+        "round(5, -10 ** 9)",
+        "1" + "0" * 4000,
+        "+".join(["1"] * 2000),
+        '{"expression": "x ** x", "variables": {"x": 99999}}',
+        '{"expression": "x * 2", "batch": {"x": ' + str(list(range(10_000))) + '}}',
+    ],
+)
+def test_adversarial_inputs_fail_fast(query: str) -> None:
+    tool = MathTool(max_steps=20_000)
+    gc.collect()  # keep a full collection of the test session's heap out of the timing
+    start = time.perf_counter()
+    result = tool.run(query)
+    elapsed = time.perf_counter() - start
+
+    assert result.startswith("Could not evaluate expression"), result
+    assert elapsed < 0.05
+
+
+def test_batch_timeout() -> None:
+    tool = MathTool(timeout=0.0)
+    assert "timed out" in tool.run(json.dumps({"expression": "log(x, 3)", "batch": {"x": [1, 2, 3]}}))
+
+
+def test_compiled_expressions_are_cached() -> None:
+    compile_expression.cache_clear()
+    tool = MathTool()
+    for value in range(3):
+        tool.run(json.dumps({"expression": "x * 2 + 1", "variables": {"x": value}}))
+    info = compile_expression.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+def test_batch_by_columns_or_rows() -> None:
+    tool = MathTool()
+    columns = tool.run(json.dumps({"expression": "max([x, y]) * k", "batch": {"x": [1, 5], "y": [4, 2], "k": 10}}))
+    rows = tool.run(json.dumps({"expression": "x - y", "batch": [{"x": 1, "y": 4}, {"x": 5, "y": 2}]}))
+
+    assert json.loads(columns) == [40, 50]
+    assert json.loads(rows) == [-3, 3]
+    assert "same length" in tool.run(json.dumps({"expression": "x + y", "batch": {"x": [1], "y": [1, 2]}}))
+
+
+def test_batch_is_vectorized_with_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    compiled = compile_expression("sqrt(x ** 2 + y ** 2) + atan2(y, x)")
+    values = list(range(1, 1001))
+
+    result = compiled.evaluate_batch({"x": values, "y": values})
+
+    assert compiled.vectorizable
+    assert result == pytest.approx((np.sqrt(2) * np.asarray(values) + np.pi / 4).tolist())
+    # Errors NumPy would turn into inf fall back to the row loop and surface as usual.
+    with pytest.raises(ZeroDivisionError):
+        compile_expression("1 / x").evaluate_batch({"x": [1, 0]})
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["x * y + 1", "x // y", "x % y", "floor(x / y)", "round(x)", "abs(x - y)", "sqrt(x) + y", "hypot(x, y) / 2"],
+)
+def test_vectorized_batches_match_the_row_loop(expression: str) -> None:
+    pytest.importorskip("numpy")
+    compiled = compile_expression(expression)
+    columns = [
+        {"x": [1, 7, 2**60], "y": [3, 2, 5]},
+        {"x": [1.0, 7.5, 2.25], "y": [0.1, 2.0, 0.5]},
+    ]
+
+    for batch in columns:
+        expected = [compiled.evaluate({"x": x, "y": y}) for x, y in zip(batch["x"], batch["y"])]
+        result = compiled.evaluate_batch(batch)
+        assert result == pytest.approx(expected)
+        assert [type(value) for value in result] == [type(value) for value in expected]
@@ -1,8 +1,20 @@
-"""Tests for the Python sandbox helper functions."""
+"""Tests for the Python sandbox tool and its helpers."""
 
 from __future__ import annotations
 
-from simple_agent.tools.python_tool import _find_disallowed_imports
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.tools.python_tool import PythonSandboxTool, _find_disallowed_imports
+from simple_agent.tools.run_context import CURRENT_RUN, RunContext
+from simple_agent.tools.sandbox_limits import SandboxLimits, run_limited
+from simple_agent.tools import sandbox_pool
+from simple_agent.tools.sandbox_pool import SandboxSession, SandboxWorkerPool
 
 
 def test_find_disallowed_imports_blocks_unknown_modules() -> None:
@@ -18,3 +30,201 @@ def test_find_disallowed_imports_marks_relative_imports() -> None:
     blocked = _find_disallowed_imports(code, {"json"})
 
     assert "<relative>" in blocked
+
+
+def _pool_tool(**pool_options: object) -> PythonSandboxTool:
+    pool = SandboxWorkerPool(1, warm_imports=["json"], **pool_options)  # type: ignore[arg-type]
+    return PythonSandboxTool(timeout=2, pool=pool)
+
+
+def test_pooled_tool_runs_code_in_warm_worker() -> None:
+    tool = _pool_tool()
+    try:
+        assert tool.run("import json\nprint(json.dumps([1, 2]))") == "[1, 2]"
+        assert tool.run("raise ValueError('boom')") == "[stderr]\n[Error] boom"
+        assert tool.run("x = 1") == "(no output)"
+    finally:
+        tool.close()
+
+
+def test_pooled_worker_is_replaced_after_max_runs() -> None:
+    tool = _pool_tool(max_runs=2)
+    try:
+        first = [tool.run("import os\nprint(os.getpid())") for _ in range(2)]
+        deadline = time.monotonic() + 10
+        replacement = first[0]
+        while replacement == first[0] and time.monotonic() < deadline:
+            replacement = tool.run("import os\nprint(os.getpid())")
+    finally:
+        tool.close()
+
+    assert first[0] == first[1]
+    assert replacement != first[0]
+
+
+def test_pooled_worker_timeout_recycles_and_recovers() -> None:
+    tool = _pool_tool()
+    tool.timeout = 0.2
+    try:
+        assert tool.run("while True: pass") == "Python execution timed out."
+        tool.timeout = 5
+        assert tool.run("print('back')") == "back"
+    finally:
+        tool.close()
+
+
+def test_pooled_namespace_does_not_leak_between_runs() -> None:
+    tool = _pool_tool()
+    try:
+        tool.run("secret = 42")
+        assert "not defined" in tool.run("print(secret)")
+    finally:
+        tool.close()
+
+
+def test_pooled_worker_forgets_modules_a_snippet_imported() -> None:
+    tool = _pool_tool()
+    try:
+        tool.run("import statistics\nstatistics.marker = 1")
+        assert tool.run("import statistics\nprint(hasattr(statistics, 'marker'))") == "False"
+    finally:
+        tool.close()
+
+
+def test_session_keeps_state_within_a_run_and_closes_with_it() -> None:
+    tool = PythonSandboxTool(timeout=5, sessions=True)
+    run = RunContext()
+    token = CURRENT_RUN.set(run)
+    try:
+        tool.run("import json\nrows = [{'v': i} for i in range(10)]")
+        assert tool.run("print(sum(row['v'] for row in rows), json.dumps(1))") == "45 1"
+        session = tool._session()
+        assert session is not None and session.pid is not None
+        process = session._worker.process  # type: ignore[union-attr]
+    finally:
+        CURRENT_RUN.reset(token)
+        run.close()
+
+    assert process.poll() is not None
+    # Outside an agent run the tool stays stateless.
+    assert "not defined" in tool.run("print(rows)")
+
+
+def test_session_resets_after_idle_timeout_and_memory_limit() -> None:
+    session = SandboxSession(idle_timeout=0.2)
+    try:
+        session.run("x = 1", timeout=5)
+        time.sleep(0.5)
+        result = session.run("print(x)", timeout=5)
+        assert result.stdout.startswith("[Session restarted because it was idle")
+        assert "not defined" in result.stderr
+    finally:
+        session.close()
+
+    session = SandboxSession(max_memory_mb=1)
+    try:
+        session.run("x = 1", timeout=5)
+        assert session.pid is None
+        assert "memory limit" in session.run("print('fresh')", timeout=5).stdout
+    finally:
+        session.close()
+
+
+def test_spawned_snippet_output_is_capped_while_streaming() -> None:
+    registry = MetricsRegistry()
+    tool = PythonSandboxTool(timeout=10, limits=SandboxLimits(output_bytes=1000), registry=registry)
+
+    start = time.perf_counter()
+    output = tool.run("while True: print('x' * 99)")
+
+    assert time.perf_counter() - start < 5
+    assert output.endswith("[output truncated at 1000 bytes]")
+    assert output.count("x") <= 1000
+    assert tool.cpu_seconds.count(mode="spawn") == 1
+    assert tool.max_rss.count(mode="spawn") == 1
+
+
+def test_spawned_snippet_that_closes_its_output_still_times_out() -> None:
+    code = "import os, time\nprint('bye', flush=True)\nos.close(1)\nos.close(2)\ntime.sleep(60)"
+
+    start = time.perf_counter()
+    result = run_limited([sys.executable, "-c", code], timeout=1, output_bytes=None)
+
+    assert time.perf_counter() - start < 5
+    assert result.timed_out
+    assert result.stdout == "bye\n"
+
+
+def test_spawned_snippet_hits_memory_and_file_size_limits(tmp_path: Path) -> None:
+    tool = PythonSandboxTool(timeout=10, limits=SandboxLimits(memory_mb=256, file_size_mb=1))
+
+    assert tool.run("data = bytearray(512 * 1024 * 1024)") == "[stderr]\n[Error] Memory limit of 256 MB exceeded"
+    target = tmp_path / "big.bin"
+    output = tool.run(f"open({str(target)!r}, 'wb').write(bytes(2 * 1024 * 1024))")
+    assert "File too large" in output
+    assert target.stat().st_size <= 1024 * 1024
+
+
+def test_closing_the_pool_releases_callers_waiting_for_a_worker() -> None:
+    pool = SandboxWorkerPool(1)
+    pool.start()
+    busy = threading.Thread(target=pool.run, args=("import time\ntime.sleep(1)", 5))
+    busy.start()
+    time.sleep(0.3)
+    errors: list[Exception] = []
+
+    def wait_for_worker() -> None:
+        try:
+            pool.run("print('late')", 5)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    waiter = threading.Thread(target=wait_for_worker)
+    waiter.start()
+    pool.close()
+    waiter.join(timeout=3)
+    busy.join(timeout=5)
+
+    assert not waiter.is_alive() and [str(error) for error in errors] == ["Sandbox pool is closed."]
+    assert pool._idle.empty()  # the busy worker was killed instead of returned
+    with pytest.raises(RuntimeError):
+        pool.run("print('closed')", 5)
+
+
+def test_pool_kills_and_retries_replacements_that_fail_to_start(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sandbox_pool, "RESPAWN_BACKOFF", 0.01)
+    pool = SandboxWorkerPool(1, python="false")
+    attempts: list[sandbox_pool.SandboxWorker] = []
+
+    def spawn() -> sandbox_pool.SandboxWorker:
+        if len(attempts) == 2:
+            pool.python = sys.executable
+        attempts.append(SandboxWorkerPool._spawn(pool))
+        return attempts[-1]
+
+    monkeypatch.setattr(pool, "_spawn", spawn)
+    pool._started = True
+    try:
+        pool._replenish()
+        assert len(attempts) == 3
+        assert all(worker.process.returncode is not None for worker in attempts[:2])
+        assert pool.run("print('ok')", 5).stdout == "ok\n"
+    finally:
+        pool.close()
+
+
+def test_pooled_worker_enforces_cpu_and_output_limits_per_snippet() -> None:
+    registry = MetricsRegistry()
+    pool = SandboxWorkerPool(1, limits=SandboxLimits(cpu_seconds=1, output_bytes=100))
+    tool = PythonSandboxTool(timeout=10, pool=pool, registry=registry)
+    try:
+        spin = "try:\n    while True: pass\nexcept Exception:\n    pass"
+        assert tool.run(spin) == "[stderr]\n[Error] CPU time limit of 1s exceeded"
+        # The budget is re-armed per snippet, so the same worker can run the loop again.
+        assert tool.run(spin) == "[stderr]\n[Error] CPU time limit of 1s exceeded"
+        assert tool.run("print('y' * 500)\nprint('unreachable')") == "y" * 100 + "\n[output truncated at 100 bytes]"
+        assert tool.run("print('ok')") == "ok"
+    finally:
+        tool.close()
+
+    assert tool.cpu_seconds.count(mode="pool") == 4
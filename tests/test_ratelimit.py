@@ -0,0 +1,139 @@
+"""Tests for client-side rate limiting of backends."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from simple_agent.backends.base import BackendError, LLMBackend, Message
+from simple_agent.backends.chatgpt import ChatGPTBackend
+from simple_agent.backends.factory import get_backend
+from simple_agent.backends.ratelimit import (
+    ConcurrencyLimit,
+    RateLimitedBackend,
+    RateLimiter,
+    TokenBucket,
+)
+from simple_agent.config import Settings
+from simple_agent.metrics import MetricsRegistry
+
+MESSAGES = [{"role": "user", "content": "x" * 400}]  # about 104 estimated tokens
+
+
+class SlowProvider(LLMBackend):
+    """Sleeps per call and records the highest number of overlapping calls."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate(self, messages: List[Message]) -> str:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return "ok"
+
+
+def test_token_bucket_queues_callers_instead_of_refusing_them() -> None:
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])  # one unit a second, a minute's burst
+
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)  # queued behind the previous caller
+    now[0] = 10.0
+    assert bucket.reserve(1) == 0.0
+
+    bucket.pause(5)
+    assert bucket.reserve(1) == pytest.approx(6.0)
+
+
+def test_file_backed_limits_are_shared_between_processes(tmp_path: Path) -> None:
+    path = tmp_path / "chatgpt.rpm"
+    other_process = (
+        "import sys; from simple_agent.backends.ratelimit import TokenBucket; "
+        "print(TokenBucket(60, path=sys.argv[1]).reserve(60))"
+    )
+    output = subprocess.run([sys.executable, "-c", other_process, str(path)], capture_output=True, text=True, check=True)
+    assert float(output.stdout) == 0.0
+    assert TokenBucket(60, path=path).reserve(1) > 0.5
+
+    first = ConcurrencyLimit(1, path=tmp_path / "slot")
+    second = ConcurrencyLimit(1, path=tmp_path / "slot")  # a separate open file, like another process
+    slot = first.acquire()
+    assert second.try_acquire() is None
+    first.release(slot)
+    assert second.try_acquire() == 0
+
+
+def test_rate_limited_backend_caps_concurrency_and_records_queue_wait() -> None:
+    registry = MetricsRegistry()
+    limiter = RateLimiter("chatgpt:test", max_concurrency=2, tokens_per_minute=100_000, registry=registry)
+    provider = SlowProvider()
+    backend = RateLimitedBackend(provider, limiter)
+
+    threads = [threading.Thread(target=backend.generate, args=(MESSAGES,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert provider.peak == 2
+    assert limiter.queue_wait.count(backend="chatgpt:test") == 8
+    assert "simple_agent_backend_queue_wait_seconds_bucket" in registry.render()
+
+
+def test_async_limit_waits_on_the_event_loop_and_429_slows_everyone_down() -> None:
+    limiter = RateLimiter("gemini:test", requests_per_minute=600, max_concurrency=1, registry=MetricsRegistry())
+
+    async def call(results: list[int], index: int) -> None:
+        async with limiter.alimit(10):
+            results.append(index)
+            await asyncio.sleep(0.01)
+
+    async def main() -> list[int]:
+        results: list[int] = []
+        await asyncio.gather(*(call(results, index) for index in range(4)))
+        return results
+
+    assert sorted(asyncio.run(main())) == [0, 1, 2, 3]
+
+    limiter.throttled(BackendError("slow down", status_code=429, retry_after=0.2))
+    start = time.perf_counter()
+    with limiter.limit():
+        pass
+    assert time.perf_counter() - start >= 0.15
+
+
+def test_get_backend_wraps_each_provider_when_limits_are_set(tmp_path: Path) -> None:
+    settings = Settings(
+        backend="chatgpt",
+        system_prompt="s",
+        openai_api_key="sk",
+        openai_model="gpt",
+        gemini_api_key="gm",
+        gemini_model="g",
+        request_timeout=5,
+        python_tool_imports=(),
+        backend_rpm=500,
+        backend_rate_limit_dir=str(tmp_path),
+    )
+
+    backend = get_backend(settings)
+
+    assert isinstance(backend, RateLimitedBackend)
+    assert isinstance(backend.backend, ChatGPTBackend)
+    assert backend.limiter.name == "chatgpt:gpt"
+    assert get_backend(settings).limiter is backend.limiter
@@ -0,0 +1,105 @@
+"""Tests for the HTTP server mode and metrics."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+from typing import Iterator, List
+
+import pytest
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.base import LLMBackend, Message
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.server import AgentServer
+
+
+class GatedBackend(LLMBackend):
+    """Echoes the prompt, optionally blocking until released."""
+
+    def __init__(self) -> None:
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def generate(self, messages: List[Message]) -> str:
+        self.entered.set()
+        self.release.wait(5)
+        return f"echo: {messages[-1]['content']}"
+
+
+@pytest.fixture
+def server() -> Iterator[AgentServer]:
+    agent = SimpleAgent(backend=GatedBackend(), tools=[], system_prompt="s")
+    with AgentServer(agent, port=0, max_concurrency=1, registry=MetricsRegistry()) as running:
+        yield running
+
+
+def _request(server: AgentServer, path: str, body: object | None = None) -> tuple[int, str]:
+    data = None if body is None else json.dumps(body).encode()
+    request = urllib.request.Request(server.url + path, data=data, method="GET" if data is None else "POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read().decode()
+
+
+def test_run_returns_agent_response(server: AgentServer) -> None:
+    status, body = _request(server, "/run", {"prompt": "hello"})
+
+    assert status == 200
+    assert json.loads(body)["response"] == "echo: hello"
+    assert _request(server, "/healthz") == (200, '{"status": "ok"}')
+
+
+def test_run_rejects_invalid_requests(server: AgentServer) -> None:
+    assert _request(server, "/run", {"text": "hello"})[0] == 400
+    assert _request(server, "/run", {"prompt": "hi", "max_turns": 0})[0] == 400
+    assert _request(server, "/missing", {"prompt": "hi"})[0] == 404
+
+
+def test_run_rejects_bad_or_oversized_bodies(server: AgentServer) -> None:
+    server.max_body_bytes = 64
+    host, port = server.server_address[:2]
+    for length, expected in (("abc", 400), ("-5", 400), ("65", 413)):
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.putrequest("POST", "/run")
+        connection.putheader("Content-Length", length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == expected, length
+        connection.close()
+    assert _request(server, "/run", {"prompt": "fits"})[0] == 200
+
+
+def test_saturated_server_returns_429(server: AgentServer) -> None:
+    backend = server.agent.backend
+    assert isinstance(backend, GatedBackend)
+    backend.release.clear()
+    first = threading.Thread(target=_request, args=(server, "/run", {"prompt": "slow"}))
+    first.start()
+    assert backend.entered.wait(5)
+
+    status, body = _request(server, "/run", {"prompt": "rejected"})
+    backend.release.set()
+    first.join(5)
+
+    assert status == 429
+    assert "capacity" in json.loads(body)["error"]
+    assert server.rejected.value() == 1
+
+
+def test_metrics_expose_latency_histogram(server: AgentServer) -> None:
+    _request(server, "/run", {"prompt": "hello"})
+
+    status, text = _request(server, "/metrics")
+
+    assert status == 200
+    assert '# TYPE simple_agent_http_request_duration_seconds histogram' in text
+    assert 'simple_agent_http_request_duration_seconds_count{path="/run",status="200"} 1' in text
+    assert 'simple_agent_http_request_duration_seconds_bucket{path="/run",status="200",le="+Inf"} 1' in text
+    assert "simple_agent_runs_in_flight 0" in text
@@ -0,0 +1,78 @@
+"""Tests for incremental tool-call detection on streamed replies."""
+
+from __future__ import annotations
+
+from simple_agent.streaming import StreamingResponseParser
+
+
+def _feed_all(parser: StreamingResponseParser, chunks: list[str]) -> list[str]:
+    emitted: list[str] = []
+    for chunk in chunks:
+        emitted.extend(parser.feed(chunk))
+    emitted.extend(parser.finish())
+    return emitted
+
+
+def test_plain_answer_is_released_from_first_chunk() -> None:
+    parser = StreamingResponseParser()
+
+    assert parser.feed("  Hel") == ["Hel"]
+    assert parser.is_answer
+    assert parser.feed("lo") == ["lo"]
+    assert parser.finish() == []
+
+
+def test_tool_call_is_detected_when_object_closes() -> None:
+    parser = StreamingResponseParser()
+
+    assert parser.feed('{"tool": "echo", "inp') == []
+    assert parser.tool_requests is None
+    assert parser.feed('ut": "a } b"}') == []
+    assert parser.tool_requests == [{"tool": "echo", "input": "a } b"}]
+
+
+def test_fenced_tool_call_is_detected() -> None:
+    parser = StreamingResponseParser()
+
+    _feed_all(parser, ["``", "`json\n", '{"tool": "time"}', "\n```"])
+
+    assert parser.tool_requests == [{"tool": "time"}]
+
+
+def test_array_of_tool_calls_is_detected() -> None:
+    parser = StreamingResponseParser()
+
+    _feed_all(parser, ['[{"tool": "time"}, ', '{"tool": "echo", "input": "[x]"}]'])
+
+    assert parser.tool_requests == [{"tool": "time"}, {"tool": "echo", "input": "[x]"}]
+
+
+def test_json_without_tool_key_is_flushed_as_answer() -> None:
+    parser = StreamingResponseParser()
+
+    emitted = _feed_all(parser, ['{"answer": ', "42}"])
+
+    assert parser.tool_requests is None
+    assert emitted == ['{"answer": 42}']
+
+
+def test_prose_is_held_from_its_first_brace_until_the_reply_ends() -> None:
+    parser = StreamingResponseParser()
+
+    assert parser.feed("Use a dict like ") == ["Use a dict like "]
+    assert parser.feed('{"a": 1} here') == []
+    assert parser.finish() == ['{"a": 1} here']
+    assert parser.tool_requests is None
+
+    parser = StreamingResponseParser()
+    emitted = _feed_all(parser, ["Sure.\n", '{"tool": "time", ', '"input": ""} done'])
+    assert emitted == ["Sure.\n"]
+    assert parser.tool_requests == [{"tool": "time", "input": ""}]
+
+
+def test_fence_with_non_json_body_is_answer() -> None:
+    parser = StreamingResponseParser()
+
+    emitted = _feed_all(parser, ["```python\n", "print(1)\n```"])
+
+    assert "".join(emitted) == "```python\nprint(1)\n```"
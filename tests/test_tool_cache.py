@@ -0,0 +1,120 @@
+"""Tests for memoized tool results."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from simple_agent.config import get_settings
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.tools import load_default_tools
+from simple_agent.tools.base import SimpleTool
+from simple_agent.tools.file_read_tool import FileReadTool
+from simple_agent.tools.math_tool import MathTool
+from simple_agent.tools.memo import MemoizedTool, memoize_tools
+from simple_agent.tools.python_tool import PythonSandboxTool
+from simple_agent.tools.registry import LazyTool, ToolInfo
+from simple_agent.tools.time_tool import TimeTool
+
+
+class CountingTool(SimpleTool):
+    cache_policy = "pure"
+
+    def __init__(self) -> None:
+        super().__init__(name="count", description="Counts calls.")
+        self.calls = 0
+
+    def run(self, query: str) -> str:
+        self.calls += 1
+        return f"{query} #{self.calls}"
+
+
+def test_pure_results_are_reused_with_lru_and_ttl_bounds() -> None:
+    now = [0.0]
+    tool = CountingTool()
+    registry = MetricsRegistry()
+    memo = MemoizedTool(tool, max_entries=2, ttl=10, registry=registry, clock=lambda: now[0])
+
+    assert memo.run("a") == memo.run("a") == "a #1"
+    memo.run("b")
+    memo.run("c")  # evicts "a", the least recently used entry
+    assert memo.run("a") == "a #4"
+
+    now[0] = 11.0
+    assert memo.run("a") == "a #5"
+    assert (memo.hits, memo.misses) == (1, 5)
+    assert memo.hit_rate == pytest.approx(1 / 6)
+    counter = registry.counter("simple_agent_tool_cache_requests_total", "", ("tool", "result"))
+    assert counter.value(tool="count", result="hit") == 1
+
+
+def test_file_reads_are_invalidated_when_the_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "notes.txt"
+    path.write_text("first\n", encoding="utf-8")
+    memo = MemoizedTool(FileReadTool(base_dir=tmp_path), registry=MetricsRegistry())
+
+    assert memo.run("notes.txt") == memo.run("notes.txt") == "notes.txt:\nfirst"
+    path.write_text("after\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))  # same size as before; only the mtime differs
+    assert memo.run("notes.txt") == "notes.txt:\nafter"
+
+    assert memo.run("later.txt") == "File not found: later.txt"
+    (tmp_path / "later.txt").write_text("now here\n", encoding="utf-8")
+    assert memo.run("later.txt") == "later.txt:\nnow here"
+    assert memo.hits == 1
+
+
+def test_uncacheable_tools_and_queries_bypass_the_cache() -> None:
+    time_memo = MemoizedTool(TimeTool(), registry=MetricsRegistry())
+    time_memo.run("")
+    time_memo.run("")
+    assert time_memo.bypassed == 2 and len(time_memo) == 0
+
+    python = PythonSandboxTool()
+    assert python.cacheable("import math\nprint(math.sqrt(2))")
+    assert not python.cacheable("import random\nprint(random.random())")
+    assert not python.cacheable("print(open('data.csv').read())")
+    assert not python.cacheable("print({'a', 'b'})")
+    assert not python.cacheable("print(sorted(set('ab')) and list(set('ab')))")
+    assert PythonSandboxTool(sessions=True).cache_policy == "never"
+
+    plugin = LazyTool(ToolInfo("plugin", "No policy.", "x:y"), factory=lambda: CountingTool())
+    memo = MemoizedTool(plugin, registry=MetricsRegistry())
+    memo.run("q")
+    memo.run("q")
+    assert memo.bypassed == 0 and memo.hits == 1  # the loaded tool declares "pure"
+
+
+def test_failed_runs_are_not_stored() -> None:
+    class FlakyTool(CountingTool):
+        def run(self, query: str) -> str:
+            return "Python execution timed out." if super().run(query).endswith("#1") else "42"
+
+        def cacheable_output(self, output: str) -> bool:
+            return "timed out" not in output
+
+    memo = MemoizedTool(FlakyTool(), registry=MetricsRegistry())
+
+    assert memo.run("slow") == "Python execution timed out."
+    assert memo.run("slow") == memo.run("slow") == "42"
+    assert (memo.hits, memo.misses) == (1, 2)
+    python = PythonSandboxTool()
+    assert python.cacheable_output("1.4142135623730951")
+    assert not python.cacheable_output("Python execution timed out.")
+    assert not python.cacheable_output("[stderr]\n[Error] CPU time limit of 10s exceeded")
+    assert not MathTool().cacheable_output(MathTool(timeout=0).run('{"expression": "x", "batch": {"x": [1, 2]}}'))
+
+
+def test_tool_cache_setting_selects_tools() -> None:
+    settings = replace(get_settings(), tool_cache=("calculator", "time"), tool_plugins=False)
+
+    tools = {tool.name: tool for tool in load_default_tools(settings)}
+
+    assert isinstance(tools["calculator"], MemoizedTool)
+    assert isinstance(tools["time"], LazyTool) and not tools["time"].loaded
+    assert isinstance(tools["file_reader"], LazyTool)
+    assert isinstance(tools["time"].load(), TimeTool)
+    assert all(isinstance(tool, MemoizedTool) for tool in memoize_tools([MathTool(), CountingTool()], ["*"]))
@@ -0,0 +1,138 @@
+"""Tests for plugin tool discovery and prompt memoization."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.tools import load_default_tools
+from simple_agent.tools.base import SimpleTool
+from simple_agent.config import Settings
+from simple_agent.tools.registry import LazyTool, ToolInfo, ToolRegistry, _path_fingerprint
+
+from benchmarks.fake_backend import ScriptedBackend
+
+PLUGIN_SOURCE = '''
+from simple_agent.tools.base import SimpleTool
+
+created = 0
+
+
+class Shout(SimpleTool):
+    def __init__(self):
+        global created
+        created += 1
+        super().__init__(name="shout", description="Upper-cases the input.")
+
+    def run(self, query):
+        return query.upper()
+'''
+
+
+def _install_plugin(site: Path, version: str) -> None:
+    (site / "demo_shout.py").write_text(PLUGIN_SOURCE)
+    for old in site.glob("demo_shout-*.dist-info"):
+        for child in old.iterdir():
+            child.unlink()
+        old.rmdir()
+    dist_info = site / f"demo_shout-{version}.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: demo-shout\nVersion: {version}\n")
+    (dist_info / "entry_points.txt").write_text("[simple_agent.tools]\nshout = demo_shout:Shout\n")
+
+
+@pytest.fixture
+def site(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    directory = tmp_path / "site"
+    directory.mkdir()
+    monkeypatch.syspath_prepend(str(directory))
+    yield directory
+    sys.modules.pop("demo_shout", None)
+
+
+def test_plugin_is_described_once_and_imported_on_first_run(site: Path, tmp_path: Path) -> None:
+    _install_plugin(site, "1.0")
+    cache = tmp_path / "tools.json"
+
+    (first,) = ToolRegistry(cache).tools()
+    assert (first.name, first.description) == ("shout", "Upper-cases the input.")
+    assert sys.modules["demo_shout"].created == 1  # instantiated once to read its metadata
+
+    # A later process reads the metadata from the cache and does not import the plugin.
+    sys.modules.pop("demo_shout")
+    (tool,) = ToolRegistry(cache).tools()
+    assert isinstance(tool, LazyTool) and not tool.loaded
+    assert "demo_shout" not in sys.modules
+
+    assert tool.run("hi") == "HI"
+    assert tool.loaded and sys.modules["demo_shout"].created == 1
+
+
+def test_plugin_metadata_is_refreshed_when_its_version_changes(site: Path, tmp_path: Path) -> None:
+    cache = tmp_path / "tools.json"
+    _install_plugin(site, "1.0")
+    ToolRegistry(cache).tools()
+    sys.modules.pop("demo_shout")
+
+    _install_plugin(site, "2.0")
+    (site / "demo_shout.py").write_text(PLUGIN_SOURCE.replace("Upper-cases", "Shouts"))
+    (tool,) = ToolRegistry(cache).tools()
+
+    assert tool.description == "Shouts the input."
+
+
+def test_cache_stays_out_of_the_working_directory_and_needs_a_plugin(
+    site: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    cache = Settings.from_env().tool_metadata_cache
+    assert cache == str(tmp_path / "xdg" / "simple-agent" / "tool-metadata.json")
+
+    assert ToolRegistry(cache).tools() == []
+    assert not Path(cache).exists()  # nothing worth caching without plugins
+    _install_plugin(site, "1.0")
+    assert [tool.name for tool in ToolRegistry(cache).tools()] == ["shout"]
+    assert Path(cache).exists()
+
+    work = tmp_path / "work"
+    (work / "pkg.dist-info").mkdir(parents=True)
+    monkeypatch.chdir(work)
+    monkeypatch.syspath_prepend(str(work))
+    fingerprint = _path_fingerprint()
+    (work / ".cache").mkdir()
+    assert _path_fingerprint() == fingerprint
+    assert str(work) not in [entry for entry, _ in fingerprint]
+    assert str(site) in [entry for entry, _ in fingerprint]
+
+
+def test_registered_tools_are_shared_and_agents_reuse_the_prepared_prompt() -> None:
+    registry = ToolRegistry(group="simple_agent.tests.none")
+    registry.register(ToolInfo("echo", "Echoes the input.", "unused:Echo"), lambda: SimpleTool("echo", "Echoes."))
+    tools = registry.tools()
+    assert registry.tools() == tools
+
+    first = SimpleAgent(backend=ScriptedBackend(["a"]), tools=tools, system_prompt="Be brief.")
+    second = SimpleAgent(backend=ScriptedBackend(["b"]), tools=list(tools), system_prompt="Be brief.")
+
+    assert "- echo: Echoes the input." in first._prepared_system_prompt
+    assert second._prepared_system_prompt is first._prepared_system_prompt
+    assert second._tool_specs is first._tool_specs
+
+
+def test_built_in_tools_are_described_without_importing_them() -> None:
+    code = (
+        "import sys\n"
+        "from simple_agent.tools import load_default_tools\n"
+        "tools = load_default_tools()\n"
+        "print(sorted(name for name in sys.modules if name.startswith('simple_agent.tools.') and name.endswith('_tool')))\n"
+        "print(any(tool.loaded for tool in tools))"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert completed.stdout.split("\n")[:2] == ["[]", "False"]
+    for tool in load_default_tools():
+        assert tool.load().description == tool.description
@@ -0,0 +1,43 @@
+"""Tests for the single-pass tool-call extractor."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from simple_agent import toolcalls
+from simple_agent.toolcalls import extract_tool_requests
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ('  {"tool": "time", "input": ""}\n', [{"tool": "time", "input": ""}]),
+        ('{"tool": "time"} and then some trailing words', [{"tool": "time"}]),
+        ("Let me check. {\"tool\": \"time\", \"input\": \"\"} One moment.", [{"tool": "time", "input": ""}]),
+        ("Running both:\n```json\n[{\"tool\": \"a\"},\n {\"tool\": \"b\"}]\n```", [{"tool": "a"}, {"tool": "b"}]),
+        ('Nested: {"input": {"path": {"x": 1}}, "tool": "file"}', [{"input": {"path": {"x": 1}}, "tool": "file"}]),
+        ('{"tool": "python", "input": "print({\\"tool\\": 1})"}', [{"tool": "python", "input": 'print({"tool": 1})'}]),
+        ('[1, 2] first, then {"tool": "late"}', [{"tool": "late"}]),
+        ('A config like {"name": "tool"} is not a call.', None),
+        ('Mention the "tool" key, e.g. {"tool": ...}', None),
+        ("Plain answer with `{braces}` in code.", None),
+        ("", None),
+    ],
+)
+def test_extract_tool_requests(text: str, expected: list | None) -> None:
+    assert extract_tool_requests(text) == expected
+
+
+def test_plain_answers_are_rejected_without_decoding(monkeypatch: pytest.MonkeyPatch) -> None:
+    class NoDecoding(json.JSONDecoder):
+        def raw_decode(self, s: str, idx: int = 0):  # type: ignore[override]
+            raise AssertionError("decoded a plain answer")
+
+    monkeypatch.setattr(toolcalls, "_DECODER", NoDecoding())
+    prose = "The report is ready; revenue grew 4% on the quarter. " * 5000
+    markdown = "Run:\n```bash\npython main.py --list-tools\n```\nand look for `{name}` lines.\n" * 100
+
+    assert extract_tool_requests(prose) is None
+    assert extract_tool_requests(markdown) is None
@@ -0,0 +1,82 @@
+"""Tests for run tracing and span exporters."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from simple_agent.agent import SimpleAgent
+from simple_agent.backends.base import LLMBackend, Message
+from simple_agent.metrics import MetricsRegistry
+from simple_agent.tools.base import SimpleTool
+from simple_agent.tracing import InMemoryExporter, JsonLinesExporter, PrometheusExporter, Tracer
+
+
+class ScriptBackend(LLMBackend):
+    def __init__(self, responses: List[str]) -> None:
+        self.responses = responses
+
+    def generate(self, messages: List[Message]) -> str:
+        return self.responses.pop(0)
+
+
+class UpperTool(SimpleTool):
+    def __init__(self) -> None:
+        super().__init__(name="upper", description="Uppercases text.")
+
+    def run(self, query: str) -> str:
+        return query.upper()
+
+
+def _agent(responses: List[str], tracer: Tracer) -> SimpleAgent:
+    return SimpleAgent(backend=ScriptBackend(responses), tools=[UpperTool()], system_prompt="s", tracer=tracer)
+
+
+def test_spans_cover_turns_backend_parse_and_tools() -> None:
+    collector = InMemoryExporter()
+    agent = _agent(['[{"tool": "upper", "input": "a"}, {"tool": "upper", "input": "b"}]', "done"], Tracer([collector]))
+
+    assert agent.run("go") == "done"
+    agent.close()
+
+    (run,) = collector.spans("run")
+    turns = collector.spans("turn")
+    tools = collector.spans("tool")
+    assert [turn.attributes["turn"] for turn in turns] == [1, 2]
+    assert all(turn.parent_id == run.span_id for turn in turns)
+    assert len(collector.spans("backend")) == len(collector.spans("parse")) == 2
+    assert sorted(span.attributes["tool"] for span in tools) == ["upper", "upper"]
+    assert all(span.parent_id == turns[0].span_id for span in tools)
+    assert {span.trace_id for span in collector.finished} == {run.trace_id}
+    assert turns[1].attributes["history_messages"] == 4
+    assert run.duration >= sum(turn.duration for turn in turns)
+
+
+def test_failed_run_marks_span_error() -> None:
+    collector = InMemoryExporter()
+    agent = _agent(['{"tool": "upper", "input": "a"}'], Tracer([collector]))
+
+    with pytest.raises(RuntimeError):
+        agent.run("go", max_turns=1)
+
+    assert collector.spans("run")[0].attributes["error"] == "RuntimeError"
+
+
+def test_json_lines_and_prometheus_exporters(tmp_path: Path) -> None:
+    trace_file = tmp_path / "trace.jsonl"
+    registry = MetricsRegistry()
+    tracer = Tracer([JsonLinesExporter(trace_file), PrometheusExporter(registry)])
+    agent = _agent(['{"tool": "upper", "input": "a"}', "done"], tracer)
+
+    agent.run("go")
+    agent.close()
+
+    records = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    assert records[-1]["name"] == "run"
+    assert {record["name"] for record in records} == {"run", "turn", "backend", "parse", "tool"}
+    text = registry.render()
+    assert 'simple_agent_span_duration_seconds_count{span="tool",tool="upper"} 1' in text
+    assert 'simple_agent_span_duration_seconds_count{span="turn",tool=""} 2' in text